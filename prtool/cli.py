@@ -1,17 +1,29 @@
 from __future__ import annotations
 
 import argparse
+import functools
+import hashlib
 import json
 import re
 import os
 import shutil
+import sqlite3
 import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, fields
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import chain, groupby
+from operator import itemgetter
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Callable, Iterable, Iterator, Mapping, Sequence
 
-from prtool.audit import create_audit_sample
 from prtool.config import (
+    PartialSettings,
     Settings,
+    clear_settings_cache,
     load_dotenv,
     load_partial_settings,
     load_settings,
@@ -31,9 +43,7 @@ from prtool.enrich import (
 )
 from prtool.export import export_csv, export_jsonl, export_memory_csv, export_memory_jsonl
 from prtool.gitlab_client import GitLabSourceClient
-from prtool.pipeline import classify_project, sync_backfill, sync_refresh
-from prtool.seed_data import seed_demo_data
-from prtool.viewer import run_viewer
+from prtool.pipeline import classify_merge_requests, classify_project, sync_backfill, sync_refresh
 from prtool.memory import (
     BaselineBuildOptions,
     MRBuildOptions,
@@ -44,25 +54,181 @@ from prtool.memory import (
     materialize_project_markdown_from_db,
 )
 
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None
+
 REPO_ROOT = Path(__file__).resolve().parent.parent
 DEFAULT_EXPORT_DIR = str(REPO_ROOT / "exports")
 DEFAULT_QODO_OUTPUT_ROOT = str(REPO_ROOT / "outputs" / "qodo")
 DEFAULT_MEMORY_OUTPUT_ROOT = str(REPO_ROOT / "outputs" / "memory")
 DEFAULT_MR_CONTEXT_OUTPUT_ROOT = str(REPO_ROOT / "outputs" / "mr_context")
+_FILENAME_TAG_UNSAFE_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+# Memoized lookups for a single CLI invocation; main() clears it so env/.env changes are always honoured.
+_INVOCATION_CACHE: dict[tuple[Any, ...], Any] = {}
+
+
+@dataclass(frozen=True, slots=True)
+class _EnvDefaults:
+    qodo_inline_enabled: bool
+    qodo_trigger_min_conf: float
+    qodo_trigger_max_conf: float
+    qodo_trigger_reasons: str
+    qodo_require_empty_description: bool
+    qodo_inline_tools: str
+    qodo_inline_concurrency: int
+    qodo_inline_timeout_sec: int
+    qodo_inline_only_missing: bool
+
+
+def _parse_env_bool(name: str, default: bool) -> bool:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _load_env_defaults() -> _EnvDefaults:
+    return _EnvDefaults(
+        qodo_inline_enabled=_parse_env_bool("QODO_INLINE_ENABLED", False),
+        qodo_trigger_min_conf=float(os.getenv("QODO_TRIGGER_MIN_CONF", "0.70")),
+        qodo_trigger_max_conf=float(os.getenv("QODO_TRIGGER_MAX_CONF", "0.75")),
+        qodo_trigger_reasons=os.getenv("QODO_TRIGGER_REASONS", "missing_description,low_top2_margin"),
+        qodo_require_empty_description=_parse_env_bool("QODO_REQUIRE_EMPTY_DESCRIPTION", False),
+        qodo_inline_tools=os.getenv("QODO_INLINE_TOOLS", "describe"),
+        qodo_inline_concurrency=int(os.getenv("QODO_INLINE_CONCURRENCY", "5")),
+        qodo_inline_timeout_sec=int(os.getenv("QODO_INLINE_TIMEOUT_SEC", "180")),
+        qodo_inline_only_missing=_parse_env_bool("QODO_INLINE_ONLY_MISSING", True),
+    )
+
+
+def _env_defaults() -> _EnvDefaults:
+    # Snapshotted once per invocation (after load_dotenv) rather than at import, so .env values apply.
+    return _memoized(("env_defaults",), _load_env_defaults)
+
+
+def _dumps(payload: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(payload).decode("utf-8")
+    return json.dumps(payload, separators=(",", ":"))
+
+
+def _print_json(payload: Any) -> None:
+    # With orjson, hand the encoded bytes straight to the binary stream (no str round-trip).
+    buffer = getattr(sys.stdout, "buffer", None)
+    if orjson is None or buffer is None:
+        sys.stdout.write(_dumps(payload) + "\n")
+        return
+    sys.stdout.flush()
+    buffer.write(orjson.dumps(payload) + b"\n")
+    buffer.flush()
+
+
+def _write_rows(header: str, rows: Iterable[str]) -> None:
+    # One write per listing instead of a print (lock + line flush) per row.
+    sys.stdout.write("\n".join(chain((header,), rows)) + "\n")
+
+
+def _loads(raw: str | bytes) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # orjson is stricter than json (e.g. NaN/Infinity); keep stdlib semantics for stored blobs.
+            pass
+    return json.loads(raw)
+
+
+@dataclass(frozen=True, slots=True)
+class _LazyEnv:
+    # Parser default that names an _EnvDefaults field; resolved only if the flag was not given.
+    field: str
+
+    def __str__(self) -> str:
+        # Only reached when help text renders %(default)s.
+        return str(getattr(_env_defaults(), self.field))
 
 
-def build_parser() -> argparse.ArgumentParser:
-    parser = argparse.ArgumentParser(prog="prtool")
+class _PrtoolParser(argparse.ArgumentParser):
+    def parse_known_args(self, args: Any = None, namespace: Any = None) -> tuple[argparse.Namespace, list[str]]:
+        parsed, extras = super().parse_known_args(args, namespace)
+        env: _EnvDefaults | None = None
+        for name, value in vars(parsed).items():
+            if isinstance(value, _LazyEnv):
+                if env is None:
+                    env = _env_defaults()
+                setattr(parsed, name, getattr(env, value.field))
+        return parsed, extras
+
+
+class _FastParser(_PrtoolParser):
+    # Python 3.14 builds throwaway HelpFormatters (each probing colour env vars/isatty) on every
+    # add_argument just to validate metavars and help strings; reuse one while registering.
+    _registering = False
+
+    def add_argument(self, *args: Any, **kwargs: Any) -> argparse.Action:
+        self._registering = True
+        try:
+            return super().add_argument(*args, **kwargs)
+        finally:
+            self._registering = False
+
+    def _get_formatter(self) -> argparse.HelpFormatter:
+        if not self._registering:
+            return super()._get_formatter()
+        formatter = self.__dict__.get("_validation_formatter")
+        if formatter is None:
+            formatter = self._validation_formatter = super()._get_formatter()
+        return formatter
+
+
+# Subparsers inherit the class via add_subparsers(), which defaults parser_class to type(parser).
+_PARSER_CLASS = _FastParser if sys.version_info >= (3, 14) else _PrtoolParser
+
+
+def _add_project_id_arguments(cmd: argparse.ArgumentParser) -> None:
+    # --project-ids takes a space-separated list in one flag instead of one argparse dispatch per id.
+    cmd.add_argument("--project-id", type=int, action="append")
+    cmd.add_argument("--project-ids", dest="project_id", type=int, nargs="+", action="extend")
+
+
+def _add_group_id_arguments(cmd: argparse.ArgumentParser) -> None:
+    cmd.add_argument("--group-id", action="append")
+    cmd.add_argument("--group-ids", dest="group_id", nargs="+", action="extend")
+
+
+def build_parser(argv: list[str] | None = None) -> argparse.ArgumentParser:
+    parser = _PARSER_CLASS(prog="prtool")
     sub = parser.add_subparsers(dest="command", required=True)
+    # Only the requested subcommand's arguments are registered; help/unknown commands get the full tree.
+    command = _requested_command(argv)
+    if command in _PARSER_BUILDERS:
+        _PARSER_BUILDERS[command](sub)
+    else:
+        for add_command_parser in _PARSER_BUILDERS.values():
+            add_command_parser(sub)
+    return parser
 
+
+def _requested_command(argv: list[str] | None) -> str | None:
+    if not argv or argv[0].startswith("-"):
+        return None
+    return argv[0]
+
+
+def _add_init_db_parser(sub: argparse._SubParsersAction) -> None:
     sub.add_parser("init-db")
 
+
+def _add_sync_parser(sub: argparse._SubParsersAction) -> None:
     sync = sub.add_parser("sync")
     sync_sub = sync.add_subparsers(dest="sync_command", required=True)
 
     backfill = sync_sub.add_parser("backfill")
-    backfill.add_argument("--project-id", type=int, action="append")
-    backfill.add_argument("--group-id", action="append")
+    _add_project_id_arguments(backfill)
+    _add_group_id_arguments(backfill)
     backfill.add_argument("--all-projects", action="store_true")
     backfill.add_argument("--project-start-index", type=int, default=1)
     backfill.add_argument("--project-count", type=int)
@@ -71,24 +237,28 @@ def build_parser() -> argparse.ArgumentParser:
     backfill.add_argument("--light-mode", action="store_true")
 
     refresh = sync_sub.add_parser("refresh")
-    refresh.add_argument("--project-id", type=int, action="append")
-    refresh.add_argument("--group-id", action="append")
+    _add_project_id_arguments(refresh)
+    _add_group_id_arguments(refresh)
     refresh.add_argument("--all-projects", action="store_true")
     refresh.add_argument("--project-start-index", type=int, default=1)
     refresh.add_argument("--project-count", type=int)
     refresh.add_argument("--concurrency", type=int, default=5)
     refresh.add_argument("--light-mode", action="store_true")
 
+
+def _add_classify_parser(sub: argparse._SubParsersAction) -> None:
     classify_cmd = sub.add_parser("classify")
-    classify_cmd.add_argument("--project-id", type=int, action="append")
-    classify_cmd.add_argument("--group-id", action="append")
+    _add_project_id_arguments(classify_cmd)
+    _add_group_id_arguments(classify_cmd)
     classify_cmd.add_argument("--all-projects", action="store_true")
     classify_cmd.add_argument("--project-start-index", type=int, default=1)
     classify_cmd.add_argument("--project-count", type=int)
 
+
+def _add_reclassify_parser(sub: argparse._SubParsersAction) -> None:
     reclassify_cmd = sub.add_parser("reclassify")
-    reclassify_cmd.add_argument("--project-id", type=int, action="append")
-    reclassify_cmd.add_argument("--group-id", action="append")
+    _add_project_id_arguments(reclassify_cmd)
+    _add_group_id_arguments(reclassify_cmd)
     reclassify_cmd.add_argument("--all-projects", action="store_true")
     reclassify_cmd.add_argument("--project-start-index", type=int, default=1)
     reclassify_cmd.add_argument("--project-count", type=int)
@@ -97,28 +267,30 @@ def build_parser() -> argparse.ArgumentParser:
     reclassify_cmd.add_argument(
         "--qodo-inline",
         action=argparse.BooleanOptionalAction,
-        default=os.getenv("QODO_INLINE_ENABLED", "false").strip().lower() in {"1", "true", "yes", "on"},
+        default=_LazyEnv("qodo_inline_enabled"),
         help="Run threshold-based Qodo enrichment inline before reclassification",
     )
-    reclassify_cmd.add_argument("--qodo-min-confidence", type=float, default=float(os.getenv("QODO_TRIGGER_MIN_CONF", "0.70")))
-    reclassify_cmd.add_argument("--qodo-max-confidence", type=float, default=float(os.getenv("QODO_TRIGGER_MAX_CONF", "0.75")))
-    reclassify_cmd.add_argument("--qodo-reasons", default=os.getenv("QODO_TRIGGER_REASONS", "missing_description,low_top2_margin"))
+    reclassify_cmd.add_argument("--qodo-min-confidence", type=float, default=_LazyEnv("qodo_trigger_min_conf"))
+    reclassify_cmd.add_argument("--qodo-max-confidence", type=float, default=_LazyEnv("qodo_trigger_max_conf"))
+    reclassify_cmd.add_argument("--qodo-reasons", default=_LazyEnv("qodo_trigger_reasons"))
     reclassify_cmd.add_argument(
         "--qodo-require-empty-description",
         action=argparse.BooleanOptionalAction,
-        default=os.getenv("QODO_REQUIRE_EMPTY_DESCRIPTION", "false").strip().lower() in {"1", "true", "yes", "on"},
+        default=_LazyEnv("qodo_require_empty_description"),
     )
     reclassify_cmd.add_argument("--qodo-mr-limit", type=int)
-    reclassify_cmd.add_argument("--qodo-tools", default=os.getenv("QODO_INLINE_TOOLS", "describe"))
-    reclassify_cmd.add_argument("--qodo-concurrency", type=int, default=int(os.getenv("QODO_INLINE_CONCURRENCY", "5")))
-    reclassify_cmd.add_argument("--qodo-timeout-sec", type=int, default=int(os.getenv("QODO_INLINE_TIMEOUT_SEC", "180")))
+    reclassify_cmd.add_argument("--qodo-tools", default=_LazyEnv("qodo_inline_tools"))
+    reclassify_cmd.add_argument("--qodo-concurrency", type=int, default=_LazyEnv("qodo_inline_concurrency"))
+    reclassify_cmd.add_argument("--qodo-timeout-sec", type=int, default=_LazyEnv("qodo_inline_timeout_sec"))
     reclassify_cmd.add_argument(
         "--qodo-only-missing",
         action=argparse.BooleanOptionalAction,
-        default=os.getenv("QODO_INLINE_ONLY_MISSING", "true").strip().lower() in {"1", "true", "yes", "on"},
+        default=_LazyEnv("qodo_inline_only_missing"),
     )
     reclassify_cmd.add_argument("--qodo-output-root", default=DEFAULT_QODO_OUTPUT_ROOT)
 
+
+def _add_mr_context_parser(sub: argparse._SubParsersAction) -> None:
     mr_context_cmd = sub.add_parser("mr-context")
     mr_context_cmd.add_argument("--project-id", type=int)
     mr_context_cmd.add_argument("--mr-iid", type=int)
@@ -134,7 +306,7 @@ def build_parser() -> argparse.ArgumentParser:
     )
     mr_context_cmd.add_argument("--qodo-tools", default="describe", help="Comma-separated tools: describe,review,improve")
     mr_context_cmd.add_argument("--qodo-concurrency", type=int, default=1)
-    mr_context_cmd.add_argument("--qodo-timeout-sec", type=int, default=int(os.getenv("QODO_INLINE_TIMEOUT_SEC", "180")))
+    mr_context_cmd.add_argument("--qodo-timeout-sec", type=int, default=_LazyEnv("qodo_inline_timeout_sec"))
     mr_context_cmd.add_argument(
         "--qodo-only-missing",
         action=argparse.BooleanOptionalAction,
@@ -149,35 +321,45 @@ def build_parser() -> argparse.ArgumentParser:
         help="Re-run classifier for this MR after optional Qodo run",
     )
 
+
+def _add_export_parser(sub: argparse._SubParsersAction) -> None:
     export_cmd = sub.add_parser("export")
     export_cmd.add_argument("--format", choices=["csv", "jsonl", "both"], default="both")
-    export_cmd.add_argument("--project-id", type=int, action="append")
-    export_cmd.add_argument("--group-id", action="append")
+    _add_project_id_arguments(export_cmd)
+    _add_group_id_arguments(export_cmd)
     export_cmd.add_argument("--all-projects", action="store_true")
     export_cmd.add_argument("--project-start-index", type=int, default=1)
     export_cmd.add_argument("--project-count", type=int)
     export_cmd.add_argument("--out-dir", default=DEFAULT_EXPORT_DIR)
 
+
+def _add_audit_parser(sub: argparse._SubParsersAction) -> None:
     audit_cmd = sub.add_parser("audit")
     audit_sub = audit_cmd.add_subparsers(dest="audit_command", required=True)
     sample = audit_sub.add_parser("sample")
     sample.add_argument("--size", type=int, default=50)
 
+
+def _add_demo_parser(sub: argparse._SubParsersAction) -> None:
     demo_cmd = sub.add_parser("demo")
     demo_sub = demo_cmd.add_subparsers(dest="demo_command", required=True)
     seed = demo_sub.add_parser("seed")
     seed.add_argument("--project-id", type=int, default=999)
     seed.add_argument("--no-classify", action="store_true")
 
+
+def _add_seed_parser(sub: argparse._SubParsersAction) -> None:
     seed_cmd = sub.add_parser("seed")
     seed_cmd.add_argument("--project-id", type=int, default=999)
     seed_cmd.add_argument("--no-classify", action="store_true")
 
+
+def _add_batch_parser(sub: argparse._SubParsersAction) -> None:
     batch_cmd = sub.add_parser("batch")
     batch_sub = batch_cmd.add_subparsers(dest="batch_command", required=True)
     run = batch_sub.add_parser("run")
-    run.add_argument("--project-id", type=int, action="append")
-    run.add_argument("--group-id", action="append")
+    _add_project_id_arguments(run)
+    _add_group_id_arguments(run)
     run.add_argument("--all-projects", action="store_true")
     run.add_argument("--project-start-index", type=int, default=1)
     run.add_argument("--project-count", type=int)
@@ -186,27 +368,34 @@ def build_parser() -> argparse.ArgumentParser:
     run.add_argument("--concurrency", type=int, default=5)
     run.add_argument("--light-mode", action="store_true")
 
+
+def _add_projects_parser(sub: argparse._SubParsersAction) -> None:
     projects_cmd = sub.add_parser("projects")
     projects_sub = projects_cmd.add_subparsers(dest="projects_command", required=True)
     list_cmd = projects_sub.add_parser("list")
-    list_cmd.add_argument("--project-id", type=int, action="append")
+    _add_project_id_arguments(list_cmd)
     list_cmd.add_argument("--all-projects", action="store_true")
-    list_cmd.add_argument("--group-id", action="append")
+    _add_group_id_arguments(list_cmd)
     list_cmd.add_argument("--project-start-index", type=int, default=1)
     list_cmd.add_argument("--project-count", type=int)
     list_cmd.add_argument("--with-mr-count", action="store_true", default=True)
+    list_cmd.add_argument("--mr-count-concurrency", type=int)
     list_cmd.add_argument("--format", choices=["text", "json"], default="text")
     count_cmd = projects_sub.add_parser("count")
     count_cmd.add_argument("--all-projects", action="store_true")
-    count_cmd.add_argument("--group-id", action="append")
+    _add_group_id_arguments(count_cmd)
     count_cmd.add_argument("--format", choices=["text", "json"], default="text")
     count_cmd.add_argument("--include-ids", action="store_true")
+    for cmd in (list_cmd, count_cmd):
+        cmd.add_argument("--no-cache", action="store_true", help="Bypass the on-disk project discovery cache")
+
 
+def _add_enrich_parser(sub: argparse._SubParsersAction) -> None:
     enrich_cmd = sub.add_parser("enrich")
     enrich_sub = enrich_cmd.add_subparsers(dest="enrich_command", required=True)
     qodo_cmd = enrich_sub.add_parser("qodo")
-    qodo_cmd.add_argument("--project-id", type=int, action="append")
-    qodo_cmd.add_argument("--group-id", action="append")
+    _add_project_id_arguments(qodo_cmd)
+    _add_group_id_arguments(qodo_cmd)
     qodo_cmd.add_argument("--all-projects", action="store_true")
     qodo_cmd.add_argument("--project-start-index", type=int, default=1)
     qodo_cmd.add_argument("--project-count", type=int)
@@ -227,24 +416,25 @@ def build_parser() -> argparse.ArgumentParser:
     qodo_cmd.add_argument("--candidate-type-balance", choices=["soft", "hard", "none"], default="soft")
     qodo_cmd.add_argument("--candidate-data-source", choices=["production", "test", "all"], default="production")
     qodo_cmd.add_argument("--candidate-preview", action="store_true")
+    qodo_cmd.add_argument("--project-concurrency", type=int, default=1)
 
     qodo_threshold_cmd = enrich_sub.add_parser("qodo-threshold")
-    qodo_threshold_cmd.add_argument("--project-id", type=int, action="append")
-    qodo_threshold_cmd.add_argument("--group-id", action="append")
+    _add_project_id_arguments(qodo_threshold_cmd)
+    _add_group_id_arguments(qodo_threshold_cmd)
     qodo_threshold_cmd.add_argument("--all-projects", action="store_true")
     qodo_threshold_cmd.add_argument("--project-start-index", type=int, default=1)
     qodo_threshold_cmd.add_argument("--project-count", type=int)
-    qodo_threshold_cmd.add_argument("--min-confidence", type=float, default=float(os.getenv("QODO_TRIGGER_MIN_CONF", "0.70")))
-    qodo_threshold_cmd.add_argument("--max-confidence", type=float, default=float(os.getenv("QODO_TRIGGER_MAX_CONF", "0.75")))
+    qodo_threshold_cmd.add_argument("--min-confidence", type=float, default=_LazyEnv("qodo_trigger_min_conf"))
+    qodo_threshold_cmd.add_argument("--max-confidence", type=float, default=_LazyEnv("qodo_trigger_max_conf"))
     qodo_threshold_cmd.add_argument(
         "--reasons",
-        default=os.getenv("QODO_TRIGGER_REASONS", "missing_description,low_top2_margin"),
+        default=_LazyEnv("qodo_trigger_reasons"),
         help="Comma-separated why_needs_review reasons to include; empty means no reason filter",
     )
     qodo_threshold_cmd.add_argument(
         "--require-empty-description",
         action=argparse.BooleanOptionalAction,
-        default=os.getenv("QODO_REQUIRE_EMPTY_DESCRIPTION", "false").strip().lower() in {"1", "true", "yes", "on"},
+        default=_LazyEnv("qodo_require_empty_description"),
     )
     qodo_threshold_cmd.add_argument("--mr-limit", type=int)
     qodo_threshold_cmd.add_argument("--concurrency", type=int, default=5)
@@ -260,30 +450,36 @@ def build_parser() -> argparse.ArgumentParser:
     qodo_threshold_cmd.add_argument("--dry-run", action="store_true")
 
     status_cmd = enrich_sub.add_parser("status")
-    status_cmd.add_argument("--project-id", type=int, action="append")
-    status_cmd.add_argument("--group-id", action="append")
+    _add_project_id_arguments(status_cmd)
+    _add_group_id_arguments(status_cmd)
     status_cmd.add_argument("--all-projects", action="store_true")
     status_cmd.add_argument("--project-start-index", type=int, default=1)
     status_cmd.add_argument("--project-count", type=int)
     status_cmd.add_argument("--data-source", choices=["production", "test", "all"], default="production")
     status_cmd.add_argument("--format", choices=["text", "json"], default="text")
 
+
+def _add_list_projects_parser(sub: argparse._SubParsersAction) -> None:
     list_projects_cmd = sub.add_parser("list-projects")
-    list_projects_cmd.add_argument("--group-id", action="append")
+    _add_group_id_arguments(list_projects_cmd)
     list_projects_cmd.add_argument("--project-start-index", type=int, default=1)
     list_projects_cmd.add_argument("--project-count", type=int)
+    list_projects_cmd.add_argument("--no-cache", action="store_true", help="Bypass the on-disk project discovery cache")
 
+
+def _add_view_parser(sub: argparse._SubParsersAction) -> None:
     view_cmd = sub.add_parser("view")
     view_cmd.add_argument("--host", default="127.0.0.1")
     view_cmd.add_argument("--port", type=int, default=8765)
 
 
+def _add_memory_parser(sub: argparse._SubParsersAction) -> None:
     memory_cmd = sub.add_parser("memory")
     memory_sub = memory_cmd.add_subparsers(dest="memory_command", required=True)
 
     baseline_cmd = memory_sub.add_parser("baseline-build")
-    baseline_cmd.add_argument("--project-id", type=int, action="append")
-    baseline_cmd.add_argument("--group-id", action="append")
+    _add_project_id_arguments(baseline_cmd)
+    _add_group_id_arguments(baseline_cmd)
     baseline_cmd.add_argument("--all-projects", action="store_true")
     baseline_cmd.add_argument("--project-start-index", type=int, default=1)
     baseline_cmd.add_argument("--project-count", type=int)
@@ -291,10 +487,11 @@ def build_parser() -> argparse.ArgumentParser:
     baseline_cmd.add_argument("--data-source", choices=["production", "test", "all"], default="production")
     baseline_cmd.add_argument("--history-window-months", type=int, default=12)
     baseline_cmd.add_argument("--db-only", action="store_true")
+    baseline_cmd.add_argument("--project-concurrency", type=int, default=1)
 
     runtime_cmd = memory_sub.add_parser("mr-build")
-    runtime_cmd.add_argument("--project-id", type=int, action="append")
-    runtime_cmd.add_argument("--group-id", action="append")
+    _add_project_id_arguments(runtime_cmd)
+    _add_group_id_arguments(runtime_cmd)
     runtime_cmd.add_argument("--all-projects", action="store_true")
     runtime_cmd.add_argument("--project-start-index", type=int, default=1)
     runtime_cmd.add_argument("--project-count", type=int)
@@ -307,10 +504,11 @@ def build_parser() -> argparse.ArgumentParser:
     runtime_cmd.add_argument("--force", action="store_true")
     runtime_cmd.add_argument("--db-only", action="store_true")
     runtime_cmd.add_argument("--outcome-mode", choices=["template", "semantic-local"], default="template")
+    runtime_cmd.add_argument("--project-concurrency", type=int, default=1)
 
     memory_status_cmd = memory_sub.add_parser("status")
-    memory_status_cmd.add_argument("--project-id", type=int, action="append")
-    memory_status_cmd.add_argument("--group-id", action="append")
+    _add_project_id_arguments(memory_status_cmd)
+    _add_group_id_arguments(memory_status_cmd)
     memory_status_cmd.add_argument("--all-projects", action="store_true")
     memory_status_cmd.add_argument("--project-start-index", type=int, default=1)
     memory_status_cmd.add_argument("--project-count", type=int)
@@ -318,8 +516,8 @@ def build_parser() -> argparse.ArgumentParser:
     memory_status_cmd.add_argument("--format", choices=["text", "json"], default="text")
 
     memory_export_cmd = memory_sub.add_parser("export")
-    memory_export_cmd.add_argument("--project-id", type=int, action="append")
-    memory_export_cmd.add_argument("--group-id", action="append")
+    _add_project_id_arguments(memory_export_cmd)
+    _add_group_id_arguments(memory_export_cmd)
     memory_export_cmd.add_argument("--all-projects", action="store_true")
     memory_export_cmd.add_argument("--project-start-index", type=int, default=1)
     memory_export_cmd.add_argument("--project-count", type=int)
@@ -327,8 +525,8 @@ def build_parser() -> argparse.ArgumentParser:
     memory_export_cmd.add_argument("--out-dir", default=DEFAULT_EXPORT_DIR)
 
     memory_materialize_cmd = memory_sub.add_parser("materialize")
-    memory_materialize_cmd.add_argument("--project-id", type=int, action="append")
-    memory_materialize_cmd.add_argument("--group-id", action="append")
+    _add_project_id_arguments(memory_materialize_cmd)
+    _add_group_id_arguments(memory_materialize_cmd)
     memory_materialize_cmd.add_argument("--all-projects", action="store_true")
     memory_materialize_cmd.add_argument("--project-start-index", type=int, default=1)
     memory_materialize_cmd.add_argument("--project-count", type=int)
@@ -338,15 +536,36 @@ def build_parser() -> argparse.ArgumentParser:
     memory_materialize_cmd.add_argument("--compose", action=argparse.BooleanOptionalAction, default=True)
     memory_materialize_cmd.add_argument("--only-missing", action="store_true", default=True)
     memory_materialize_cmd.add_argument("--force", action="store_true")
+    memory_materialize_cmd.add_argument("--project-concurrency", type=int, default=1)
+
 
+def _add_cleanup_parser(sub: argparse._SubParsersAction) -> None:
     cleanup_cmd = sub.add_parser("cleanup")
     cleanup_cmd.add_argument("--data-source", choices=["test", "production"], default="test")
-    cleanup_cmd.add_argument("--project-id", type=int)
+    _add_project_id_arguments(cleanup_cmd)
     cleanup_cmd.add_argument("--artifacts", action="store_true", help="Delete generated artifact directories")
     cleanup_cmd.add_argument("--target", choices=["outputs", "exports", "all"], default="outputs")
     cleanup_cmd.add_argument("--yes", action="store_true", help="Confirm deletion when --artifacts is used")
 
-    return parser
+
+_PARSER_BUILDERS: dict[str, Callable[[argparse._SubParsersAction], None]] = {
+    "init-db": _add_init_db_parser,
+    "sync": _add_sync_parser,
+    "classify": _add_classify_parser,
+    "reclassify": _add_reclassify_parser,
+    "mr-context": _add_mr_context_parser,
+    "export": _add_export_parser,
+    "audit": _add_audit_parser,
+    "demo": _add_demo_parser,
+    "seed": _add_seed_parser,
+    "batch": _add_batch_parser,
+    "projects": _add_projects_parser,
+    "enrich": _add_enrich_parser,
+    "list-projects": _add_list_projects_parser,
+    "view": _add_view_parser,
+    "memory": _add_memory_parser,
+    "cleanup": _add_cleanup_parser,
+}
 
 
 def _slice_project_ids(project_ids: list[int], start_index: int = 1, count: int | None = None) -> list[int]:
@@ -374,6 +593,72 @@ def _resolve_concurrency(args: argparse.Namespace) -> int:
     return value
 
 
+def _resolve_page_concurrency() -> int:
+    return max(1, int(os.getenv("PRTOOL_PAGE_CONCURRENCY", "1")))
+
+
+def _resolve_mr_count_concurrency(args: argparse.Namespace) -> int:
+    cli_value = getattr(args, "mr_count_concurrency", None)
+    if cli_value is not None:
+        value = int(cli_value)
+    else:
+        value = int(os.getenv("PRTOOL_MR_COUNT_CONCURRENCY", "16"))
+    if value < 1:
+        raise ValueError("--mr-count-concurrency must be >= 1")
+    return value
+
+
+def _resolve_project_concurrency(args: argparse.Namespace) -> int:
+    value = int(getattr(args, "project_concurrency", 1) or 1)
+    if value < 1:
+        raise ValueError("--project-concurrency must be >= 1")
+    return value
+
+
+def _map_projects(
+    fn: Callable[[int], Any],
+    project_ids: list[int],
+    max_workers: int,
+) -> Iterator[tuple[int, Any]]:
+    # Results are yielded in project order so per-project output stays deterministic.
+    if max_workers <= 1 or len(project_ids) <= 1:
+        for project_id in project_ids:
+            yield project_id, fn(project_id)
+        return
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(project_ids))) as executor:
+        yield from zip(project_ids, executor.map(fn, project_ids))
+
+
+def _scan_artifact_tree(root: Path) -> tuple[list[str], list[str]]:
+    files: list[str] = []
+    dirs: list[str] = []
+    stack = [str(root)]
+    while stack:
+        current = stack.pop()
+        dirs.append(current)
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    files.append(entry.path)
+    return files, dirs
+
+
+def _scan_artifact_root(path: Path) -> tuple[Path, list[str], list[str]] | None:
+    if path.is_dir():
+        return (path, *_scan_artifact_tree(path))
+    if path.exists():
+        return (path, [str(path)], [])
+    return None
+
+
+def _prune_artifact_dirs(dirs: list[str]) -> None:
+    # Directories were collected parents-first, so reversing removes children before their parents.
+    for directory in reversed(dirs[1:]):
+        os.rmdir(directory)
+
+
 def _cleanup_artifacts(target: str, yes: bool) -> int:
     if not yes:
         print("Error: --yes is required with --artifacts to confirm deletion", file=sys.stderr)
@@ -387,42 +672,99 @@ def _cleanup_artifacts(target: str, yes: bool) -> int:
     else:
         targets = [Path(DEFAULT_QODO_OUTPUT_ROOT), Path(DEFAULT_MEMORY_OUTPUT_ROOT)]
 
-    seen: set[Path] = set()
-    normalized_targets: list[Path] = []
-    for p in targets:
-        p = p.resolve()
-        if p not in seen:
-            seen.add(p)
-            normalized_targets.append(p)
-
-    deleted_paths: list[str] = []
+    # Resolve each distinct spelling once; the second pass catches different spellings of one directory.
+    unique = dict.fromkeys(map(os.fspath, targets))
+    normalized_targets = list(dict.fromkeys(Path(raw).resolve(strict=False) for raw in unique))
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        # Roots are independent trees, so scanning, unlinking and pruning all fan out across the pool.
+        scans = [scan for scan in executor.map(_scan_artifact_root, normalized_targets) if scan is not None]
+        file_count = sum(len(files) for _, files, _ in scans)
+        list(executor.map(os.unlink, (f for _, files, _ in scans for f in files)))
+        list(executor.map(_prune_artifact_dirs, (dirs for _, _, dirs in scans)))
+    deleted_paths = [str(path) for path, _, _ in scans]
     for path in normalized_targets:
-        if path.exists():
-            shutil.rmtree(path)
-            deleted_paths.append(str(path))
         path.mkdir(parents=True, exist_ok=True)
 
     if deleted_paths:
-        print("Deleted artifact roots:")
+        print(f"Deleted artifact roots ({file_count} files):")
         for path in deleted_paths:
             print(f"- {path}")
     else:
         print("No artifact roots existed; created empty target directories.")
     return 0
 
+
 def _collect_group_projects(
     client: GitLabSourceClient,
     group_ids: list[str],
 ) -> list[dict[str, Any]]:
-    projects: dict[int, dict[str, Any]] = {}
+    seen: set[int] = set()
+    projects: list[dict[str, Any]] = []
     for group_id in group_ids:
         for project in client.list_group_projects(group_id):
-            projects[int(project["id"])] = project
-    return [projects[pid] for pid in sorted(projects.keys())]
+            project_id = int(project["id"])
+            if project_id not in seen:
+                seen.add(project_id)
+                projects.append(project)
+    projects.sort(key=lambda p: int(p["id"]))
+    return projects
+
+
+def _gitlab_client(settings: Settings) -> GitLabSourceClient:
+    # The cached client keeps `settings` alive, so its id stays a valid key for the invocation.
+    return _memoized(("gitlab_client", id(settings)), lambda: GitLabSourceClient(settings))
 
 
 def _resolve_discovery_projects(args: argparse.Namespace, settings: Settings) -> list[dict[str, Any]]:
-    client = GitLabSourceClient(settings)
+    key = (
+        "discovery",
+        tuple(getattr(args, "group_id", None) or ()),
+        bool(getattr(args, "all_projects", False)),
+        id(settings),
+    )
+    scope = (tuple(resolve_group_ids(getattr(args, "group_id", None))), bool(getattr(args, "all_projects", False)))
+    return list(
+        _memoized(
+            key,
+            lambda: tuple(_disk_cached_projects(args, settings, scope, lambda: _compute_discovery_projects(args, settings))),
+        )
+    )
+
+
+def _disk_cached_projects(
+    args: argparse.Namespace,
+    settings: Settings,
+    scope: tuple[Any, ...],
+    fetch: Callable[[], list[dict[str, Any]]],
+) -> list[dict[str, Any]]:
+    # Only the listing commands (which expose --no-cache) reuse project lists across invocations.
+    if getattr(args, "no_cache", True):
+        return fetch()
+    ttl = int(os.getenv("PRTOOL_DISCOVERY_CACHE_TTL_SEC", "600"))
+    # Keyed on instance + token so a different PAT never sees another's project visibility.
+    digest = hashlib.blake2b(
+        repr((settings.gitlab_base_url, settings.gitlab_token, scope)).encode("utf-8"), digest_size=16
+    ).hexdigest()
+    path = _cache_dir() / f"projects-{digest}.json"
+    try:
+        cached = _loads(path.read_bytes())
+        if time.time() - float(cached["fetched_at"]) < ttl:
+            return cached["projects"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    projects = fetch()
+    if projects:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(_dumps({"fetched_at": time.time(), "projects": projects}), encoding="utf-8")
+        except OSError:
+            pass
+    return projects
+
+
+def _compute_discovery_projects(args: argparse.Namespace, settings: Settings) -> list[dict[str, Any]]:
+    client = _gitlab_client(settings)
     group_ids = resolve_group_ids(getattr(args, "group_id", None))
     if group_ids:
         projects = _collect_group_projects(client, group_ids)
@@ -430,29 +772,53 @@ def _resolve_discovery_projects(args: argparse.Namespace, settings: Settings) ->
             raise ValueError(f"No projects found for groups: {group_ids}")
         return projects
     if getattr(args, "all_projects", False):
-        projects = client.list_accessible_projects()
+        projects = client.list_accessible_projects(page_concurrency=_resolve_page_concurrency())
         if not projects:
             raise ValueError("No accessible projects found for current PAT")
         return projects
     return []
 
 
+def _discovered_project_ids(discovered: list[dict[str, Any]]) -> list[int]:
+    # Discovery output is already ascending by id (group projects are sorted in _collect_group_projects,
+    # the accessible-projects listing is ordered by id), so an order-preserving dedupe suffices.
+    return list(dict.fromkeys(int(p["id"]) for p in discovered))
+
+
 def _resolve_count_scope(args: argparse.Namespace, settings: Settings) -> tuple[str, list[int], list[str]]:
     explicit_group_ids = getattr(args, "group_id", None)
     if explicit_group_ids:
         discovered = _resolve_discovery_projects(args, settings)
         group_ids = sorted(set(str(g).strip() for g in explicit_group_ids if str(g).strip()))
-        project_ids = sorted({int(p["id"]) for p in discovered})
+        project_ids = _discovered_project_ids(discovered)
         return "groups", project_ids, group_ids
     if getattr(args, "all_projects", False):
         discovered = _resolve_discovery_projects(args, settings)
-        project_ids = sorted({int(p["id"]) for p in discovered})
+        project_ids = _discovered_project_ids(discovered)
         return "all-projects", project_ids, []
     project_ids = sorted(set(resolve_project_ids()))
     return "configured-project-ids", project_ids, []
 
 
+def _memoized(key: tuple[Any, ...], compute: Callable[[], Any]) -> Any:
+    if key not in _INVOCATION_CACHE:
+        _INVOCATION_CACHE[key] = compute()
+    return _INVOCATION_CACHE[key]
+
+
 def _resolve_project_scope_ids(args: argparse.Namespace) -> list[int]:
+    key = (
+        "project_scope",
+        tuple(getattr(args, "project_id", None) or ()),
+        tuple(getattr(args, "group_id", None) or ()),
+        bool(getattr(args, "all_projects", False)),
+        getattr(args, "project_start_index", 1),
+        getattr(args, "project_count", None),
+    )
+    return list(_memoized(key, lambda: tuple(_compute_project_scope_ids(args))))
+
+
+def _compute_project_scope_ids(args: argparse.Namespace) -> list[int]:
     explicit_project_ids = getattr(args, "project_id", None)
     if explicit_project_ids:
         ids = resolve_project_ids(explicit_project_ids)
@@ -466,11 +832,11 @@ def _resolve_project_scope_ids(args: argparse.Namespace) -> list[int]:
     if group_ids or getattr(args, "all_projects", False):
         settings = load_settings()
         discovered = _resolve_discovery_projects(args, settings)
-        ids = [int(p["id"]) for p in discovered]
+        ids = _discovered_project_ids(discovered)
     else:
-        ids = resolve_project_ids(getattr(args, "project_id", None))
+        ids = sorted(set(resolve_project_ids(getattr(args, "project_id", None))))
     return _slice_project_ids(
-        sorted(set(ids)),
+        ids,
         start_index=getattr(args, "project_start_index", 1),
         count=getattr(args, "project_count", None),
     )
@@ -480,16 +846,21 @@ def _rank_projects_with_mr_counts(
     projects: list[dict[str, Any]],
     client: GitLabSourceClient,
     with_mr_count: bool = True,
-) -> list[dict[str, Any]]:
-    rows: list[dict[str, Any]] = []
-    for p in projects:
-        row = dict(p)
-        row["mr_count_all_states"] = client.get_project_mr_count_all_states(int(p["id"])) if with_mr_count else None
-        rows.append(row)
-    rows.sort(key=lambda x: (-(x["mr_count_all_states"] or 0), int(x["id"])))
-    for idx, row in enumerate(rows, start=1):
-        row["rank"] = idx
-    return rows
+    concurrency: int = 1,
+) -> Iterator[dict[str, Any]]:
+    ids = [int(p["id"]) for p in projects]
+    counts: list[int | None]
+    if with_mr_count:
+        # One count request per project; these are I/O bound so they are fanned out across threads.
+        counts = [count for _, count in _map_projects(client.get_project_mr_count_all_states, ids, concurrency)]
+    else:
+        counts = [None] * len(ids)
+    # Rank by index so project records are only merged with their derived fields as rows are emitted.
+    order = sorted(range(len(ids)), key=lambda i: (-(counts[i] or 0), ids[i]))
+    return (
+        {**projects[i], "mr_count_all_states": counts[i], "rank": rank}
+        for rank, i in enumerate(order, start=1)
+    )
 
 
 def _resolve_sync_project_ids(args: argparse.Namespace, settings: Settings) -> list[int]:
@@ -518,11 +889,16 @@ def _parse_tools(raw: str) -> tuple[str, ...]:
     bad = [t for t in tokens if t not in QODO_TOOLS]
     if bad:
         raise ValueError(f"Invalid --tools values: {bad}. Allowed: {','.join(QODO_TOOLS)}")
-    deduped: list[str] = []
-    for t in tokens:
-        if t not in deduped:
-            deduped.append(t)
-    return tuple(deduped)
+    return tuple(dict.fromkeys(tokens))
+
+
+def _ingested_project_ids(db: Database) -> list[int]:
+    # Per-invocation rather than per-process, so a later run (or a sync in between) sees new projects.
+    def _load() -> tuple[int, ...]:
+        with db.connect_read() as conn:
+            return tuple(db.list_ingested_project_ids(conn))
+
+    return list(_memoized(("ingested_project_ids", str(db.path)), _load))
 
 
 def _resolve_classify_project_ids(args: argparse.Namespace, db: Database) -> list[int]:
@@ -538,8 +914,7 @@ def _resolve_classify_project_ids(args: argparse.Namespace, db: Database) -> lis
             if not project_ids:
                 raise ValueError("No projects found for classify scope.")
         elif getattr(args, "all_projects", False):
-            with db.connect() as conn:
-                project_ids = db.list_ingested_project_ids(conn)
+            project_ids = _ingested_project_ids(db)
             if not project_ids:
                 raise ValueError("No projects found in DB. Run sync first.")
         else:
@@ -553,7 +928,7 @@ def _resolve_classify_project_ids(args: argparse.Namespace, db: Database) -> lis
 
 
 def _safe_filename_tag(raw: str) -> str:
-    tag = re.sub(r"[^A-Za-z0-9._-]+", "_", (raw or "").strip())
+    tag = _FILENAME_TAG_UNSAFE_RE.sub("_", (raw or "").strip())
     return tag.strip("_") or "scope"
 
 
@@ -573,18 +948,14 @@ def _resolve_export_stem(args: argparse.Namespace) -> str:
 
 def _parse_reason_filter(raw: str) -> tuple[str, ...]:
     parts = [p.strip() for p in (raw or "").split(",") if p.strip()]
-    deduped: list[str] = []
-    for p in parts:
-        if p not in deduped:
-            deduped.append(p)
-    return tuple(deduped)
+    return tuple(dict.fromkeys(parts))
 
 
 def _parse_json_array(raw: str | None) -> list[Any]:
     if not raw:
         return []
     try:
-        data = json.loads(raw)
+        data = _loads(raw)
     except Exception:
         return []
     return data if isinstance(data, list) else []
@@ -594,27 +965,64 @@ def _parse_json_object(raw: str | None) -> dict[str, Any]:
     if not raw:
         return {}
     try:
-        data = json.loads(raw)
+        data = _loads(raw)
     except Exception:
         return {}
     return data if isinstance(data, dict) else {}
 
 
+# Rendering only reads these blobs, and identical label/tag sets repeat across MRs, so parse each once.
+@functools.lru_cache(maxsize=4096)
+def _parse_json_array_cached(raw: str) -> tuple[Any, ...]:
+    return tuple(_parse_json_array(raw))
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_json_object_cached(raw: str) -> Mapping[str, Any]:
+    return MappingProxyType(_parse_json_object(raw))
+
+
+_EMPTY_JSON_OBJECT_VIEW: Mapping[str, Any] = MappingProxyType({})
+
+
+def _json_array_view(raw: Any) -> Sequence[Any]:
+    # NULL/empty columns are the common case; answer them without touching the LRU or the decoder.
+    if not raw:
+        return ()
+    return _parse_json_array_cached(raw) if isinstance(raw, str) else _parse_json_array(raw)
+
+
+def _json_object_view(raw: Any) -> Mapping[str, Any]:
+    if not raw:
+        return _EMPTY_JSON_OBJECT_VIEW
+    return _parse_json_object_cached(raw) if isinstance(raw, str) else _parse_json_object(raw)
+
+
+_DIFF_PREFIXES = ("@@ ", "diff --git", "+++ ", "--- ", "+", "-")
+# Labels/descriptions repeat across MRs; only reasonably small texts are worth keeping in the LRU.
+_DIFF_SNIFF_CACHE_MAX_CHARS = 64_000
+
+
 def _looks_like_diff_text(text: str) -> bool:
     t = (text or "").strip()
     if not t:
         return False
-    prefixes = ("@@ ", "diff --git", "+++ ", "--- ", "+", "-")
+    if len(t) < _DIFF_SNIFF_CACHE_MAX_CHARS:
+        return _sniff_diff_lines_cached(t)
+    return _sniff_diff_lines(t)
+
+
+def _sniff_diff_lines(t: str) -> bool:
     first_lines = [ln.strip() for ln in t.splitlines()[:6] if ln.strip()]
     if not first_lines:
         return False
-    hits = 0
-    for ln in first_lines:
-        if any(ln.startswith(p) for p in prefixes):
-            hits += 1
+    hits = sum(1 for ln in first_lines if ln.startswith(_DIFF_PREFIXES))
     return hits >= max(2, len(first_lines) // 2)
 
 
+_sniff_diff_lines_cached = functools.lru_cache(maxsize=1024)(_sniff_diff_lines)
+
+
 def _resolve_single_mr(db: Database, args: argparse.Namespace) -> dict[str, Any]:
     has_pair = args.project_id is not None or args.mr_iid is not None
     has_url = bool((args.mr_url or "").strip())
@@ -672,288 +1080,388 @@ def _resolve_single_mr(db: Database, args: argparse.Namespace) -> dict[str, Any]
     return dict(row)
 
 
+# One round trip per MR: child rows are folded into JSON arrays by correlated subqueries.
+_SINGLE_MR_BUNDLE_SQL = """
+SELECT
+  m.*,
+  -- Numeric columns are coalesced here so the renderer can format them without Python-side coercion.
+  COALESCE(f.files_changed, 0) AS files_changed, COALESCE(f.additions, 0) AS additions,
+  COALESCE(f.deletions, 0) AS deletions, COALESCE(f.churn, 0) AS churn,
+  COALESCE(f.commit_count, 0) AS commit_count, COALESCE(f.review_comment_count, 0) AS review_comment_count,
+  COALESCE(f.review_thread_count, 0) AS review_thread_count,
+  COALESCE(f.unresolved_thread_count, 0) AS unresolved_thread_count,
+  f.infra_signal_level, COALESCE(f.infra_signal_score, 0.0) AS infra_signal_score, f.feature_json,
+  c.base_type, c.final_type, c.complexity_level, COALESCE(c.complexity_score, 0.0) AS complexity_score,
+  COALESCE(c.is_infra_related, 0) AS is_infra_related, COALESCE(c.infra_override_applied, 0) AS infra_override_applied,
+  COALESCE(c.classification_confidence, 0.0) AS classification_confidence,
+  c.confidence_band, COALESCE(c.needs_review, 0) AS needs_review, c.classifier_version,
+  c.capability_tags_json, c.risk_tags_json, c.classification_rationale_json, c.classified_at,
+  COALESCE(p.pipeline_count, 0) AS pipeline_count, COALESCE(p.failed_count, 0) AS failed_count,
+  COALESCE(p.success_count, 0) AS success_count, COALESCE(p.retry_count, 0) AS retry_count,
+  r.mr_outcome, r.mr_achieved_outcome, r.mr_achieved_outcome_bullets_json,
+  r.outcome_source, r.outcome_mode, COALESCE(r.outcome_quality_score, 0.0) AS outcome_quality_score, r.topic_labels_json,
+  COALESCE(r.regression_probability, 0.0) AS regression_probability,
+  r.review_depth_required, r.assessment_json, r.similar_mrs_json,
+  r.addendum_markdown_path, r.context_markdown_path, r.updated_at AS memory_updated_at,
+  (
+    SELECT json_group_array(json_object('path', path, 'additions', additions, 'deletions', deletions, 'churn', churn))
+    FROM (
+      SELECT path, additions, deletions, (additions + deletions) AS churn
+      FROM mr_files
+      WHERE mr_id = m.id
+      ORDER BY churn DESC, path ASC
+      LIMIT 25
+    )
+  ) AS bundle_files_json,
+  (
+    SELECT json_group_array(json_object('commit_sha', commit_sha, 'title', title, 'authored_date', authored_date))
+    FROM (
+      SELECT commit_sha, title, authored_date
+      FROM mr_commits
+      WHERE mr_id = m.id
+      ORDER BY authored_date DESC
+      LIMIT 10
+    )
+  ) AS bundle_commits_json,
+  (
+    SELECT json_group_array(
+      json_object(
+        'tool', tool, 'qodo_title', qodo_title, 'qodo_type', qodo_type, 'qodo_summary', qodo_summary,
+        'qodo_sections_json', qodo_sections_json, 'qodo_labels_json', qodo_labels_json,
+        'quality_status', quality_status, 'reviewer_summary', reviewer_summary,
+        'reviewer_summary_status', reviewer_summary_status, 'context_quality_score', context_quality_score,
+        'prompt_leak_count', prompt_leak_count, 'updated_at', updated_at, 'markdown_path', markdown_path,
+        'structured_payload_json', structured_payload_json
+      )
+    )
+    FROM (
+      SELECT *
+      FROM mr_qodo_artifacts
+      WHERE mr_id = m.id
+      ORDER BY tool_rank, updated_at DESC
+    )
+  ) AS bundle_qodo_json
+FROM merge_requests m
+LEFT JOIN mr_features f ON f.mr_id = m.id
+LEFT JOIN mr_classifications c ON c.mr_id = m.id
+LEFT JOIN mr_pipelines p ON p.mr_id = m.id
+LEFT JOIN mr_memory_runtime r ON r.mr_id = m.id
+WHERE m.id = ?
+LIMIT 1
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class _MrContextRow:
+    # The bundle columns the MR context renderer reads, copied once so rendering is plain attribute access.
+    id: int
+    project_id: int
+    iid: int
+    title: str
+    description: str | None
+    state: str | None
+    author_username: str | None
+    labels_json: str | None
+    web_url: str | None
+    created_at: str | None
+    updated_at: str | None
+    merged_at: str | None
+    source_branch: str | None
+    target_branch: str | None
+    files_changed: int
+    additions: int
+    deletions: int
+    churn: int
+    commit_count: int
+    review_comment_count: int
+    review_thread_count: int
+    unresolved_thread_count: int
+    infra_signal_level: str | None
+    infra_signal_score: float
+    base_type: str | None
+    final_type: str | None
+    complexity_level: str | None
+    complexity_score: float
+    is_infra_related: int
+    infra_override_applied: int
+    classification_confidence: float
+    confidence_band: str | None
+    needs_review: int
+    classifier_version: str | None
+    capability_tags_json: str | None
+    risk_tags_json: str | None
+    classification_rationale_json: str | None
+    pipeline_count: int
+    failed_count: int
+    success_count: int
+    retry_count: int
+    mr_outcome: str | None
+    mr_achieved_outcome: str | None
+    mr_achieved_outcome_bullets_json: str | None
+    outcome_source: str | None
+    outcome_mode: str | None
+    outcome_quality_score: float
+    topic_labels_json: str | None
+    regression_probability: float
+    review_depth_required: str | None
+    memory_updated_at: str | None
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> _MrContextRow:
+        return cls(**{name: row[name] for name in _MR_CONTEXT_FIELDS})
+
+
+_MR_CONTEXT_FIELDS = tuple(f.name for f in fields(_MrContextRow))
+
+
 def _load_single_mr_bundle(db: Database, mr_id: int) -> dict[str, Any]:
     with db.connect() as conn:
-        mr = conn.execute(
-            """
-            SELECT
-              m.*,
-              f.files_changed, f.additions, f.deletions, f.churn, f.commit_count,
-              f.review_comment_count, f.review_thread_count, f.unresolved_thread_count,
-              f.pipeline_failed_count, f.infra_signal_level, f.infra_signal_score, f.feature_json,
-              c.base_type, c.final_type, c.complexity_level, c.complexity_score,
-              c.is_infra_related, c.infra_override_applied, c.classification_confidence,
-              c.confidence_band, c.needs_review, c.classifier_version,
-              c.capability_tags_json, c.risk_tags_json, c.classification_rationale_json, c.classified_at,
-              d.thread_count, d.note_count, d.unresolved_count,
-              p.pipeline_count, p.failed_count, p.success_count, p.retry_count,
-              r.mr_outcome, r.mr_achieved_outcome, r.mr_achieved_outcome_bullets_json,
-              r.outcome_source, r.outcome_mode, r.outcome_quality_score, r.topic_labels_json,
-              r.regression_probability, r.review_depth_required, r.assessment_json, r.similar_mrs_json,
-              r.addendum_markdown_path, r.context_markdown_path, r.updated_at AS memory_updated_at
-            FROM merge_requests m
-            LEFT JOIN mr_features f ON f.mr_id = m.id
-            LEFT JOIN mr_classifications c ON c.mr_id = m.id
-            LEFT JOIN mr_discussions d ON d.mr_id = m.id
-            LEFT JOIN mr_pipelines p ON p.mr_id = m.id
-            LEFT JOIN mr_memory_runtime r ON r.mr_id = m.id
-            WHERE m.id = ?
-            LIMIT 1
-            """,
-            (mr_id,),
-        ).fetchone()
-        if not mr:
-            raise ValueError(f"MR id={mr_id} no longer exists")
-
-        files = conn.execute(
-            """
-            SELECT path, additions, deletions, (additions + deletions) AS churn
-            FROM mr_files
-            WHERE mr_id = ?
-            ORDER BY churn DESC, path ASC
-            LIMIT 25
-            """,
-            (mr_id,),
-        ).fetchall()
-        commits = conn.execute(
-            """
-            SELECT commit_sha, title, authored_date
-            FROM mr_commits
-            WHERE mr_id = ?
-            ORDER BY authored_date DESC
-            LIMIT 10
-            """,
-            (mr_id,),
-        ).fetchall()
-        qodo = conn.execute(
-            """
-            SELECT
-              tool, qodo_title, qodo_type, qodo_summary, qodo_sections_json, qodo_labels_json,
-              quality_status, reviewer_summary, reviewer_summary_status, context_quality_score,
-              prompt_leak_count, updated_at, markdown_path, structured_payload_json
-            FROM mr_qodo_artifacts
-            WHERE mr_id = ?
-            ORDER BY CASE tool
-                WHEN 'describe' THEN 1
-                WHEN 'review' THEN 2
-                WHEN 'improve' THEN 3
-                ELSE 4
-              END, updated_at DESC
-            """,
-            (mr_id,),
-        ).fetchall()
+        row = conn.execute(_SINGLE_MR_BUNDLE_SQL, (mr_id,)).fetchone()
+    if not row:
+        raise ValueError(f"MR id={mr_id} no longer exists")
+    # The renderer reads each column once, so hand it the Row itself rather than a copied dict.
     return {
-        "mr": dict(mr),
-        "files": [dict(r) for r in files],
-        "commits": [dict(r) for r in commits],
-        "qodo": [dict(r) for r in qodo],
+        "mr": row,
+        "files": _loads(row["bundle_files_json"]),
+        "commits": _loads(row["bundle_commits_json"]),
+        "qodo": _loads(row["bundle_qodo_json"]),
     }
 
 
+def _mr_context_signature(bundle: dict[str, Any]) -> str:
+    # Everything the renderer reads comes from the bundle row; the module mtime covers template changes.
+    payload = repr((os.stat(__file__).st_mtime_ns, tuple(bundle["mr"].keys()), tuple(bundle["mr"])))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
 def _default_mr_context_path(output_root: str, project_id: int, mr_iid: int) -> Path:
     return Path(output_root) / f"mr_context_{project_id}_{mr_iid}.md"
 
 
+def _join_or_none(values: Sequence[Any]) -> str:
+    return ", ".join(str(x) for x in values) if values else "(none)"
+
+
+def _f3(value: Any) -> str:
+    return format(float(value) if value else 0.0, ".3f")
+
+
+_QUALITY_OK_STATUSES = frozenset({"pass", "ok", "clean"})
+
+
+def _render_qodo_context_block(row: dict[str, Any]) -> tuple[str, bool]:
+    # Also reports whether the row should raise the qodo_low_quality_or_prompt_leak flag.
+    q_labels = _json_array_view(row.get("qodo_labels_json"))
+    reviewer_summary = str(row.get("reviewer_summary") or "").strip()
+    reviewer_summary_status = str(row.get("reviewer_summary_status") or "missing").strip().lower()
+    quality_status = str(row.get("quality_status") or "").strip().lower()
+    prompt_leaks = int(row.get("prompt_leak_count") or 0)
+    flagged = quality_status not in _QUALITY_OK_STATUSES or prompt_leaks > 0
+    quality_ok = not flagged and reviewer_summary_status == "clean" and bool(reviewer_summary)
+    if quality_ok:
+        clean_labels = [str(x).strip() for x in q_labels if str(x).strip() and not _looks_like_diff_text(str(x))]
+        labels_line = f"- labels: {', '.join(clean_labels) if clean_labels else '(none)'}"
+        summary_line = f"- summary: {reviewer_summary}"
+    else:
+        labels_line = "- labels: (suppressed due to low-quality/parsing artifacts)"
+        summary_line = "- summary: (suppressed due to low-quality/parsing artifacts)"
+    block = f"""### {str(row.get('tool') or '').upper()}
+- title: {row.get('qodo_title') or ''}
+- type: {row.get('qodo_type') or ''}
+- quality_status: {row.get('quality_status') or ''}
+- reviewer_summary_status: {reviewer_summary_status}
+- context_quality_score: {_f3(row.get('context_quality_score'))}
+- prompt_leak_count: {prompt_leaks}
+- updated_at: {row.get('updated_at') or ''}
+{labels_line}
+{summary_line}"""
+    return block, flagged
+
+
+def _render_memory_context_section(mr: _MrContextRow, topic_labels: Sequence[Any], achieved_bullets: Sequence[Any]) -> str:
+    if mr.mr_outcome is None:
+        return "- (no memory runtime row)"
+    bullets = ""
+    if achieved_bullets:
+        bullets = "- achieved_outcome_bullets:\n" + "".join(f"  - {bullet}\n" for bullet in achieved_bullets[:8])
+    return f"""- mr_outcome: {mr.mr_outcome or ''}
+- achieved_outcome: {mr.mr_achieved_outcome or ''}
+- achieved_outcome_quality: {mr.outcome_quality_score:.2f}
+- outcome_source/mode: {mr.outcome_source or ''}/{mr.outcome_mode or ''}
+- regression_probability: {mr.regression_probability:.2f}
+- review_depth_required: {mr.review_depth_required or ''}
+- topic_labels: {_join_or_none(topic_labels)}
+{bullets}- memory_updated_at: {mr.memory_updated_at or ''}"""
+
+
 def _render_single_mr_context(bundle: dict[str, Any]) -> str:
-    mr = bundle["mr"]
+    mr = _MrContextRow.from_row(bundle["mr"])
     files = bundle["files"]
     commits = bundle["commits"]
     qodo_rows = bundle["qodo"]
 
-    labels = _parse_json_array(mr.get("labels_json"))
-    capability_tags = _parse_json_array(mr.get("capability_tags_json"))
-    risk_tags = _parse_json_array(mr.get("risk_tags_json"))
-    rationale = _parse_json_object(mr.get("classification_rationale_json"))
+    labels = _json_array_view(mr.labels_json)
+    capability_tags = _json_array_view(mr.capability_tags_json)
+    risk_tags = _json_array_view(mr.risk_tags_json)
+    rationale = _json_object_view(mr.classification_rationale_json)
     why_review = rationale.get("why_needs_review") if isinstance(rationale.get("why_needs_review"), list) else []
 
-    achieved_bullets = _parse_json_array(mr.get("mr_achieved_outcome_bullets_json"))
-    topic_labels = _parse_json_array(mr.get("topic_labels_json"))
-
-    lines: list[str] = []
-    lines.append(f"# MR Context: !{mr.get('iid')} {mr.get('title') or ''}")
-    lines.append("")
-    lines.append("## Overview")
-    lines.append(f"- project_id: {mr.get('project_id')}")
-    lines.append(f"- mr_id: {mr.get('id')}")
-    lines.append(f"- mr_iid: {mr.get('iid')}")
-    lines.append(f"- web_url: {mr.get('web_url') or ''}")
-    lines.append(f"- state: {mr.get('state') or ''}")
-    lines.append(f"- author: {mr.get('author_username') or ''}")
-    lines.append(f"- source -> target: {mr.get('source_branch') or ''} -> {mr.get('target_branch') or ''}")
-    lines.append(f"- created_at: {mr.get('created_at') or ''}")
-    lines.append(f"- updated_at: {mr.get('updated_at') or ''}")
-    lines.append(f"- merged_at: {mr.get('merged_at') or ''}")
-    lines.append(f"- labels: {', '.join(str(x) for x in labels) if labels else '(none)'}")
-    lines.append("")
-
-    lines.append("## Description")
-    desc = str(mr.get("description") or "").strip()
-    lines.append(desc if desc else "(empty)")
-    lines.append("")
-
-    lines.append("## Classification Snapshot")
-    lines.append(f"- classifier_version: {mr.get('classifier_version') or ''}")
-    lines.append(f"- final_type: {mr.get('final_type') or ''} (base_type={mr.get('base_type') or ''})")
-    lines.append(f"- confidence: {float(mr.get('classification_confidence') or 0.0):.3f} ({mr.get('confidence_band') or ''})")
-    lines.append(f"- needs_review: {int(mr.get('needs_review') or 0)}")
-    lines.append(f"- complexity: {mr.get('complexity_level') or ''} ({float(mr.get('complexity_score') or 0.0):.2f})")
-    lines.append(f"- infra_related: {int(mr.get('is_infra_related') or 0)}")
-    lines.append(f"- infra_override_applied: {int(mr.get('infra_override_applied') or 0)}")
-    lines.append(f"- capability_tags: {', '.join(str(x) for x in capability_tags) if capability_tags else '(none)'}")
-    lines.append(f"- risk_tags: {', '.join(str(x) for x in risk_tags) if risk_tags else '(none)'}")
-    lines.append(f"- why_needs_review: {', '.join(str(x) for x in why_review) if why_review else '(none)'}")
-    lines.append("")
-
-    lines.append("## Engineering Signals")
-    lines.append(
-        f"- files_changed={int(mr.get('files_changed') or 0)} additions={int(mr.get('additions') or 0)} "
-        f"deletions={int(mr.get('deletions') or 0)} churn={int(mr.get('churn') or 0)}"
-    )
-    lines.append(
-        f"- commits={int(mr.get('commit_count') or 0)} review_comments={int(mr.get('review_comment_count') or 0)} "
-        f"review_threads={int(mr.get('review_thread_count') or 0)} unresolved_threads={int(mr.get('unresolved_thread_count') or 0)}"
-    )
-    lines.append(
-        f"- pipeline_count={int(mr.get('pipeline_count') or 0)} failed={int(mr.get('failed_count') or 0)} "
-        f"success={int(mr.get('success_count') or 0)} retries={int(mr.get('retry_count') or 0)}"
-    )
-    lines.append(
-        f"- infra_signal={mr.get('infra_signal_level') or ''} ({float(mr.get('infra_signal_score') or 0.0):.2f})"
-    )
-    lines.append("")
-
-    lines.append("## Changed Files (Top by Churn)")
-    if files:
-        for row in files:
-            lines.append(
-                f"- `{row.get('path')}` (+{int(row.get('additions') or 0)} / -{int(row.get('deletions') or 0)}, churn={int(row.get('churn') or 0)})"
-            )
-    else:
-        lines.append("- (no file-level rows)")
-    lines.append("")
-
-    lines.append("## Recent Commits")
-    if commits:
-        for row in commits:
-            sha = str(row.get("commit_sha") or "")[:10]
-            lines.append(f"- `{sha}` {row.get('title') or ''} ({row.get('authored_date') or ''})")
-    else:
-        lines.append("- (no commit rows)")
-    lines.append("")
-
-    lines.append("## Qodo / LLM Artifacts")
-    if qodo_rows:
-        for row in qodo_rows:
-            q_labels = _parse_json_array(row.get("qodo_labels_json"))
-            reviewer_summary = str(row.get("reviewer_summary") or "").strip()
-            reviewer_summary_status = str(row.get("reviewer_summary_status") or "missing").strip().lower()
-            quality_status = str(row.get("quality_status") or "").strip().lower()
-            prompt_leaks = int(row.get("prompt_leak_count") or 0)
-            clean_labels = [str(x).strip() for x in q_labels if str(x).strip() and not _looks_like_diff_text(str(x))]
-            quality_ok = (
-                quality_status in {"pass", "ok", "clean"}
-                and prompt_leaks == 0
-                and reviewer_summary_status == "clean"
-                and bool(reviewer_summary)
-            )
-            lines.append(f"### {str(row.get('tool') or '').upper()}")
-            lines.append(f"- title: {row.get('qodo_title') or ''}")
-            lines.append(f"- type: {row.get('qodo_type') or ''}")
-            lines.append(f"- quality_status: {row.get('quality_status') or ''}")
-            lines.append(f"- reviewer_summary_status: {reviewer_summary_status}")
-            lines.append(f"- context_quality_score: {float(row.get('context_quality_score') or 0.0):.3f}")
-            lines.append(f"- prompt_leak_count: {prompt_leaks}")
-            lines.append(f"- updated_at: {row.get('updated_at') or ''}")
-            if quality_ok:
-                lines.append(f"- labels: {', '.join(clean_labels) if clean_labels else '(none)'}")
-                lines.append(f"- summary: {reviewer_summary}")
-            else:
-                lines.append("- labels: (suppressed due to low-quality/parsing artifacts)")
-                lines.append("- summary: (suppressed due to low-quality/parsing artifacts)")
-            lines.append("")
-    else:
-        lines.append("- (no qodo artifacts)")
-        lines.append("")
-
-    lines.append("## Runtime Memory (If Available)")
-    if mr.get("mr_outcome") is not None:
-        lines.append(f"- mr_outcome: {mr.get('mr_outcome') or ''}")
-        lines.append(f"- achieved_outcome: {mr.get('mr_achieved_outcome') or ''}")
-        lines.append(f"- achieved_outcome_quality: {float(mr.get('outcome_quality_score') or 0.0):.2f}")
-        lines.append(f"- outcome_source/mode: {mr.get('outcome_source') or ''}/{mr.get('outcome_mode') or ''}")
-        lines.append(f"- regression_probability: {float(mr.get('regression_probability') or 0.0):.2f}")
-        lines.append(f"- review_depth_required: {mr.get('review_depth_required') or ''}")
-        lines.append(f"- topic_labels: {', '.join(str(x) for x in topic_labels) if topic_labels else '(none)'}")
-        if achieved_bullets:
-            lines.append("- achieved_outcome_bullets:")
-            for bullet in achieved_bullets[:8]:
-                lines.append(f"  - {bullet}")
-        lines.append(f"- memory_updated_at: {mr.get('memory_updated_at') or ''}")
-    else:
-        lines.append("- (no memory runtime row)")
-    lines.append("")
+    achieved_bullets = _json_array_view(mr.mr_achieved_outcome_bullets_json)
+    topic_labels = _json_array_view(mr.topic_labels_json)
+
+    desc = str(mr.description or "").strip()
+    files_section = "\n".join(
+        f"- `{row.get('path')}` (+{row['additions']} / -{row['deletions']}, churn={row['churn']})"
+        for row in files
+    ) or "- (no file-level rows)"
+    commits_section = "\n".join(
+        f"- `{str(row.get('commit_sha') or '')[:10]}` {row.get('title') or ''} ({row.get('authored_date') or ''})"
+        for row in commits
+    ) or "- (no commit rows)"
+    qodo_blocks: list[str] = []
+    qodo_flagged = False
+    for row in qodo_rows:
+        block, flagged = _render_qodo_context_block(row)
+        qodo_blocks.append(block)
+        qodo_flagged = qodo_flagged or flagged
+    qodo_section = "\n\n".join(qodo_blocks) or "- (no qodo artifacts)"
+    memory_section = _render_memory_context_section(mr, topic_labels, achieved_bullets)
 
     data_quality_flags: list[str] = []
-    files_changed = int(mr.get("files_changed") or 0)
-    adds = int(mr.get("additions") or 0)
-    dels = int(mr.get("deletions") or 0)
+    files_changed = mr.files_changed
+    adds = mr.additions
+    dels = mr.deletions
     if files_changed > 0 and (adds + dels) == 0:
         data_quality_flags.append("zero_churn_with_files_changed")
-    if any((str(r.get("quality_status") or "").strip().lower() not in {"pass", "ok", "clean"}) or int(r.get("prompt_leak_count") or 0) > 0 for r in qodo_rows):
+    if qodo_flagged:
         data_quality_flags.append("qodo_low_quality_or_prompt_leak")
-    final_type = str(mr.get("final_type") or "").strip().lower()
+    final_type = str(mr.final_type or "").strip().lower()
     if final_type and any(str(t).strip().lower() == "chore" for t in topic_labels) and final_type != "chore":
         data_quality_flags.append("classifier_memory_type_mismatch")
-
-    lines.append("## Data Quality Flags")
-    if data_quality_flags:
-        for flag in data_quality_flags:
-            lines.append(f"- {flag}")
-    else:
-        lines.append("- none")
-    lines.append("")
-
-    lines.append("## Reviewer Focus")
-    lines.append("- Verify intent aligns with changed files and branch target.")
-    lines.append("- Validate high-churn files and unresolved threads first.")
-    lines.append("- Confirm pipeline failures/retries are explained or resolved.")
-    lines.append("- If Qodo output exists, compare summary against actual diff for drift.")
-    lines.append("- For `needs_review=1`, resolve listed reasons before merge approval.")
-    lines.append("")
-
-    return "\n".join(lines).strip() + "\n"
-
-
-def _needs_review_stats(
+    flags_section = "\n".join(f"- {flag}" for flag in data_quality_flags) or "- none"
+
+    return f"""# MR Context: !{mr.iid} {mr.title or ''}
+
+## Overview
+- project_id: {mr.project_id}
+- mr_id: {mr.id}
+- mr_iid: {mr.iid}
+- web_url: {mr.web_url or ''}
+- state: {mr.state or ''}
+- author: {mr.author_username or ''}
+- source -> target: {mr.source_branch or ''} -> {mr.target_branch or ''}
+- created_at: {mr.created_at or ''}
+- updated_at: {mr.updated_at or ''}
+- merged_at: {mr.merged_at or ''}
+- labels: {_join_or_none(labels)}
+
+## Description
+{desc or "(empty)"}
+
+## Classification Snapshot
+- classifier_version: {mr.classifier_version or ''}
+- final_type: {mr.final_type or ''} (base_type={mr.base_type or ''})
+- confidence: {mr.classification_confidence:.3f} ({mr.confidence_band or ''})
+- needs_review: {mr.needs_review}
+- complexity: {mr.complexity_level or ''} ({mr.complexity_score:.2f})
+- infra_related: {mr.is_infra_related}
+- infra_override_applied: {mr.infra_override_applied}
+- capability_tags: {_join_or_none(capability_tags)}
+- risk_tags: {_join_or_none(risk_tags)}
+- why_needs_review: {_join_or_none(why_review)}
+
+## Engineering Signals
+- files_changed={files_changed} additions={adds} deletions={dels} churn={mr.churn}
+- commits={mr.commit_count} review_comments={mr.review_comment_count} \
+review_threads={mr.review_thread_count} unresolved_threads={mr.unresolved_thread_count}
+- pipeline_count={mr.pipeline_count} failed={mr.failed_count} \
+success={mr.success_count} retries={mr.retry_count}
+- infra_signal={mr.infra_signal_level or ''} ({mr.infra_signal_score:.2f})
+
+## Changed Files (Top by Churn)
+{files_section}
+
+## Recent Commits
+{commits_section}
+
+## Qodo / LLM Artifacts
+{qodo_section}
+
+## Runtime Memory (If Available)
+{memory_section}
+
+## Data Quality Flags
+{flags_section}
+
+## Reviewer Focus
+- Verify intent aligns with changed files and branch target.
+- Validate high-churn files and unresolved threads first.
+- Confirm pipeline failures/retries are explained or resolved.
+- If Qodo output exists, compare summary against actual diff for drift.
+- For `needs_review=1`, resolve listed reasons before merge approval.
+"""
+
+
+_THRESHOLD_SNAPSHOT_SQL = """
+SELECT
+  COUNT(*) AS total,
+  SUM(CASE WHEN c.needs_review = 1 THEN 1 ELSE 0 END) AS needs_review,
+  SUM(CASE WHEN c.classification_confidence > t.before_confidence THEN 1 ELSE 0 END) AS improved,
+  SUM(CASE WHEN t.before_needs_review = 1 AND c.needs_review = 0 THEN 1 ELSE 0 END) AS promoted,
+  TOTAL(c.classification_confidence - t.before_confidence) AS conf_delta
+FROM mr_classifications c
+JOIN merge_requests m ON m.id = c.mr_id
+LEFT JOIN _qodo_threshold_cand t ON t.mr_id = c.mr_id
+WHERE m.project_id IN (SELECT value FROM json_each(?))
+  AND (? = 'all' OR m.data_source = ?)
+"""
+
+
+_CANDIDATE_STATE_COLUMNS = itemgetter("id", "classification_confidence", "needs_review")
+
+
+def _threshold_snapshot(
     db: Database,
     project_ids: list[int],
     data_source: str,
+    candidates: list[dict[str, Any]],
 ) -> dict[str, float]:
+    # Scope needs_review stats plus candidate movement against their selection-time state, from one scan.
     if not project_ids:
-        return {"total": 0, "needs_review": 0, "needs_review_pct": 0.0}
+        return {"total": 0, "needs_review": 0, "needs_review_pct": 0.0, "improved": 0, "promoted": 0, "conf_delta": 0.0}
     with db.connect() as conn:
-        pid_placeholders = ",".join(["?"] * len(project_ids))
-        params: list[Any] = [int(v) for v in project_ids]
-        source_filter = ""
-        if data_source != "all":
-            source_filter = " AND m.data_source = ?"
-            params.append(data_source)
-        row = conn.execute(
-            f"""
-            SELECT
-              COUNT(*) AS total,
-              SUM(CASE WHEN c.needs_review = 1 THEN 1 ELSE 0 END) AS needs_review
-            FROM mr_classifications c
-            JOIN merge_requests m ON m.id = c.mr_id
-            WHERE m.project_id IN ({pid_placeholders})
-              {source_filter}
-            """,
-            tuple(params),
-        ).fetchone()
-    total = int((row["total"] if row else 0) or 0)
-    needs_review = int((row["needs_review"] if row else 0) or 0)
-    pct = round((100.0 * needs_review / total), 2) if total > 0 else 0.0
-    return {"total": total, "needs_review": needs_review, "needs_review_pct": pct}
+        # Join against a temp table of candidates rather than binding one placeholder per candidate.
+        conn.execute(
+            """
+            CREATE TEMP TABLE IF NOT EXISTS _qodo_threshold_cand (
+              mr_id INTEGER PRIMARY KEY,
+              before_confidence REAL NOT NULL,
+              before_needs_review INTEGER NOT NULL
+            )
+            """
+        )
+        try:
+            conn.executemany(
+                "INSERT OR IGNORE INTO _qodo_threshold_cand VALUES (?, ?, ?)",
+                # The selector already CASTs these columns, so a C-level itemgetter feeds rows as tuples.
+                map(_CANDIDATE_STATE_COLUMNS, candidates),
+            )
+            row = conn.execute(
+                _THRESHOLD_SNAPSHOT_SQL,
+                (json.dumps([int(v) for v in project_ids]), data_source, data_source),
+            ).fetchone()
+        finally:
+            conn.execute("DROP TABLE _qodo_threshold_cand")
+    total = int(row["total"] or 0)
+    needs_review = int(row["needs_review"] or 0)
+    return {
+        "total": total,
+        "needs_review": needs_review,
+        "needs_review_pct": round((100.0 * needs_review / total), 2) if total > 0 else 0.0,
+        "improved": int(row["improved"] or 0),
+        "promoted": int(row["promoted"] or 0),
+        "conf_delta": float(row["conf_delta"] or 0.0),
+    }
 
 
 def _select_qodo_threshold_candidates(
@@ -971,11 +1479,11 @@ def _select_qodo_threshold_candidates(
 ) -> list[dict[str, Any]]:
     if not project_ids:
         return []
+    # IN-lists are bound as JSON arrays so one statement text serves every list length.
     with db.connect() as conn:
-        pid_placeholders = ",".join(["?"] * len(project_ids))
-        params: list[Any] = [int(v) for v in project_ids]
+        params: list[Any] = [json.dumps([int(v) for v in project_ids])]
         clauses = [
-            f"m.project_id IN ({pid_placeholders})",
+            "m.project_id IN (SELECT value FROM json_each(?))",
             "m.web_url IS NOT NULL",
             "m.web_url != ''",
             "c.needs_review = 1",
@@ -987,79 +1495,110 @@ def _select_qodo_threshold_candidates(
             clauses.append("m.data_source = ?")
             params.append(data_source)
         if require_empty_description:
-            clauses.append("TRIM(COALESCE(m.description, '')) = ''")
+            clauses.append("m.description_empty = 1")
         if reasons:
-            r_placeholders = ",".join(["?"] * len(reasons))
             clauses.append(
-                f"""EXISTS (
+                """EXISTS (
                     SELECT 1
                     FROM json_each(c.classification_rationale_json, '$.why_needs_review') j
-                    WHERE j.value IN ({r_placeholders})
+                    WHERE j.value IN (SELECT value FROM json_each(?))
                 )"""
             )
-            params.extend(list(reasons))
+            params.append(json.dumps(list(reasons)))
+        cte_sql = ""
+        join_sql = ""
+        cte_params: list[Any] = []
         if only_missing and not force:
-            t_placeholders = ",".join(["?"] * len(tools))
-            clauses.append(
-                f"""(
-                    SELECT COUNT(*)
-                    FROM mr_qodo_artifacts qa
-                    WHERE qa.mr_id = m.id AND qa.tool IN ({t_placeholders})
-                ) < {len(tools)}"""
-            )
-            params.extend(list(tools))
+            # Aggregate artifact counts once instead of a correlated COUNT per MR row.
+            cte_sql = """
+            WITH qa_counts AS (
+              SELECT mr_id, COUNT(*) AS n
+              FROM mr_qodo_artifacts
+              WHERE tool IN (SELECT value FROM json_each(?))
+              GROUP BY mr_id
+            )"""
+            cte_params.append(json.dumps(list(tools)))
+            join_sql = "LEFT JOIN qa_counts qc ON qc.mr_id = m.id"
+            clauses.append("COALESCE(qc.n, 0) < ?")
+            params.append(len(tools))
 
         where = " AND ".join(clauses)
-        limit_sql = ""
+        # Rows come back grouped by project (best confidence first within each) so callers can
+        # bucket them with groupby; a limit still takes the global top-N before regrouping.
+        order_sql = "ORDER BY m.project_id, c.classification_confidence DESC, m.updated_at DESC"
+        outer_open = outer_close = ""
         if mr_limit is not None:
-            limit_sql = " LIMIT ?"
+            order_sql = "ORDER BY c.classification_confidence DESC, m.updated_at DESC LIMIT ?"
             params.append(int(mr_limit))
-        rows = conn.execute(
-            f"""
-            SELECT
+            outer_open = "SELECT * FROM ("
+            outer_close = ") ORDER BY project_id, classification_confidence DESC, updated_at DESC"
+        cur = conn.execute(
+            f"""{cte_sql}
+            {outer_open}SELECT
               m.id,
               m.project_id,
               m.iid,
               m.web_url,
               m.updated_at,
               c.final_type,
-              c.classification_confidence,
-              c.needs_review,
+              CAST(c.classification_confidence AS REAL) AS classification_confidence,
+              CAST(c.needs_review AS INTEGER) AS needs_review,
               c.classifier_version,
-              TRIM(COALESCE(m.description, '')) = '' AS has_empty_description
+              m.description_empty AS has_empty_description
             FROM mr_classifications c
             JOIN merge_requests m ON m.id = c.mr_id
+            {join_sql}
             WHERE {where}
-            ORDER BY c.classification_confidence DESC, m.updated_at DESC
-            {limit_sql}
+            {order_sql}{outer_close}
             """,
-            tuple(params),
-        ).fetchall()
-    return [dict(r) for r in rows]
-def main(argv: list[str] | None = None) -> int:
-    load_dotenv()
-    parser = build_parser()
-    args = parser.parse_args(argv)
+            tuple(cte_params + params),
+        )
+        # Drain the cursor straight into dicts rather than materialising a list of Rows first.
+        return [dict(r) for r in cur]
 
-    partial = load_partial_settings()
-    db = Database(partial.db_path)
 
-    if args.command == "init-db":
-        db.init_schema()
-        print(f"Initialized SQLite schema at {partial.db_path}")
-        return 0
+def _enrich_and_compact_projects(
+    db: Database,
+    project_ids: Sequence[int],
+    selected_by_project: dict[int, list[dict[str, Any]]],
+    opts: EnrichOptions,
+) -> Iterator[tuple[int, dict[str, Any], dict[str, Any]]]:
+    # Yields (project_id, enrich result, compaction) following project_ids, skipping projects with no candidates.
+    # Compaction of project N runs on a worker thread while project N+1 is being enriched.
+    pending: tuple[int, dict[str, Any], Future[dict[str, Any]]] | None = None
+    with ThreadPoolExecutor(max_workers=1) as compactor:
+        for project_id in [*project_ids, None]:
+            if project_id is not None:
+                bucket = selected_by_project.get(project_id)
+                if not bucket:
+                    continue
+                result = enrich_qodo_project(db, project_id, opts, candidates=bucket)
+            if pending is not None:
+                done_project_id, done_result, comp_future = pending
+                pending = None
+                yield done_project_id, done_result, comp_future.result()
+            if project_id is not None:
+                pending = (project_id, result, compactor.submit(compact_project_qodo, db, project_id, opts))
+
+
+def _cmd_init_db(args: argparse.Namespace, db: Database, partial: PartialSettings) -> int:
+    db.init_schema()
+    print(f"Initialized SQLite schema at {partial.db_path}")
+    return 0
 
-    if args.command == "sync":
-        settings = load_settings()
-        project_ids = _resolve_sync_project_ids(args, settings)
-        concurrency = _resolve_concurrency(args)
-        db.init_schema()
-        if args.sync_command == "backfill":
-            print(
-                f"Selected projects ({len(project_ids)}): {project_ids} | "
-                f"concurrency={concurrency} | light_mode={args.light_mode}"
-            )
-            total = 0
+
+def _cmd_sync(args: argparse.Namespace, db: Database, partial: PartialSettings) -> int:
+    settings = load_settings()
+    project_ids = _resolve_sync_project_ids(args, settings)
+    concurrency = _resolve_concurrency(args)
+    db.init_schema()
+    if args.sync_command == "backfill":
+        print(
+            f"Selected projects ({len(project_ids)}): {project_ids} | "
+            f"concurrency={concurrency} | light_mode={args.light_mode}"
+        )
+        total = 0
+        with db.session():
             for project_id in project_ids:
                 count = sync_backfill(
                     db,
@@ -1071,14 +1610,15 @@ def main(argv: list[str] | None = None) -> int:
                 )
                 total += count
                 print(f"[project {project_id}] Backfill complete: {count} merge requests ingested")
-            print(f"Backfill total across projects: {total}")
-            return 0
-        if args.sync_command == "refresh":
-            print(
-                f"Selected projects ({len(project_ids)}): {project_ids} | "
-                f"concurrency={concurrency} | light_mode={args.light_mode}"
-            )
-            total = 0
+        print(f"Backfill total across projects: {total}")
+        return 0
+    if args.sync_command == "refresh":
+        print(
+            f"Selected projects ({len(project_ids)}): {project_ids} | "
+            f"concurrency={concurrency} | light_mode={args.light_mode}"
+        )
+        total = 0
+        with db.session():
             for project_id in project_ids:
                 count = sync_refresh(
                     db,
@@ -1089,29 +1629,37 @@ def main(argv: list[str] | None = None) -> int:
                 )
                 total += count
                 print(f"[project {project_id}] Refresh complete: {count} merge requests ingested")
-            print(f"Refresh total across projects: {total}")
-            return 0
+        print(f"Refresh total across projects: {total}")
+        return 0
+    raise ValueError(f"Unsupported sync command: {args.sync_command}")
 
-    if args.command == "classify":
-        db.init_schema()
-        project_ids = _resolve_classify_project_ids(args, db)
-        print(f"Selected projects ({len(project_ids)}): {project_ids}")
-        total = 0
+
+def _cmd_classify(args: argparse.Namespace, db: Database, partial: PartialSettings) -> int:
+    db.init_schema()
+    project_ids = _resolve_classify_project_ids(args, db)
+    print(f"Selected projects ({len(project_ids)}): {project_ids}")
+    total = 0
+    with db.session():
         for project_id in project_ids:
             count = classify_project(db, partial, project_id)
             total += count
             print(f"[project {project_id}] Classification complete: {count} merge requests processed")
-        print(f"Classification total across projects: {total}")
-        return 0
+    print(f"Classification total across projects: {total}")
+    return 0
+
+
+_RUN_TOTAL_KEYS = ("eligible", "success", "failed", "skipped")
+
 
-    if args.command == "reclassify":
-        db.init_schema()
-        project_ids = _resolve_classify_project_ids(args, db)
-        only_stale = False if args.force else bool(args.only_stale)
-        mode = f"only-stale (version={CLASSIFIER_VERSION})" if only_stale else "force-all"
-        qodo_inline = bool(args.qodo_inline)
-        print(f"Selected projects ({len(project_ids)}): {project_ids} | mode={mode} | qodo_inline={qodo_inline}")
+def _cmd_reclassify(args: argparse.Namespace, db: Database, partial: PartialSettings) -> int:
+    db.init_schema()
+    project_ids = _resolve_classify_project_ids(args, db)
+    only_stale = False if args.force else bool(args.only_stale)
+    mode = f"only-stale (version={CLASSIFIER_VERSION})" if only_stale else "force-all"
+    qodo_inline = bool(args.qodo_inline)
+    print(f"Selected projects ({len(project_ids)}): {project_ids} | mode={mode} | qodo_inline={qodo_inline}")
 
+    with db.session():
         if qodo_inline:
             if not (0.0 <= float(args.qodo_min_confidence) < float(args.qodo_max_confidence) <= 1.0):
                 raise ValueError("--qodo-min-confidence and --qodo-max-confidence must satisfy 0 <= min < max <= 1")
@@ -1152,22 +1700,15 @@ def main(argv: list[str] | None = None) -> int:
                 f"require_empty_description={bool(args.qodo_require_empty_description)}"
             )
             if qodo_candidates:
-                selected_by_project: dict[int, list[dict[str, Any]]] = {}
-                for row in qodo_candidates:
-                    selected_by_project.setdefault(int(row["project_id"]), []).append(row)
-                q_eligible = 0
-                q_success = 0
-                q_failed = 0
-                q_skipped = 0
-                for project_id in sorted(selected_by_project.keys()):
-                    result = enrich_qodo_project(db, project_id, qodo_opts, candidates=selected_by_project[project_id])
-                    compact_project_qodo(db, project_id, qodo_opts)
-                    q_eligible += int(result["eligible"])
-                    q_success += int(result["success"])
-                    q_failed += int(result["failed"])
-                    q_skipped += int(result["skipped"])
+                selected_by_project = {
+                    pid: list(rows) for pid, rows in groupby(qodo_candidates, key=itemgetter("project_id"))
+                }
+                q_totals: Counter[str] = Counter()
+                for _, result, _ in _enrich_and_compact_projects(db, project_ids, selected_by_project, qodo_opts):
+                    q_totals.update({key: int(result[key]) for key in _RUN_TOTAL_KEYS})
                 print(
-                    f"[qodo-inline] total eligible={q_eligible} success={q_success} failed={q_failed} skipped={q_skipped}"
+                    f"[qodo-inline] total eligible={q_totals['eligible']} success={q_totals['success']} "
+                    f"failed={q_totals['failed']} skipped={q_totals['skipped']}"
                 )
             else:
                 print("[qodo-inline] No eligible candidates; proceeding to reclassification.")
@@ -1183,125 +1724,135 @@ def main(argv: list[str] | None = None) -> int:
             )
             total += count
             print(f"[project {project_id}] Reclassification complete: {count} merge requests processed")
-        print(f"Reclassification total across projects: {total}")
-        return 0
+    print(f"Reclassification total across projects: {total}")
+    return 0
 
-    if args.command == "mr-context":
-        db.init_schema()
-        target = _resolve_single_mr(db, args)
-        mr_id = int(target["id"])
-        project_id = int(target["project_id"])
-        mr_iid = int(target["iid"])
-        print(f"Target MR: project_id={project_id} mr_iid={mr_iid} mr_id={mr_id}")
-
-        qodo_tools = _parse_tools(args.qodo_tools)
-        if bool(args.qodo_inline):
-            if not (target.get("web_url") or "").strip():
-                print("[mr-context] skipped qodo-inline: MR has no web_url")
-            else:
-                qodo_opts = EnrichOptions(
-                    output_root=args.qodo_output_root,
-                    concurrency=max(1, int(args.qodo_concurrency)),
-                    mr_limit=1,
-                    only_missing=bool(args.qodo_only_missing),
-                    force=False,
-                    data_source=args.data_source,
-                    timeout_sec=int(args.qodo_timeout_sec),
-                    compact_max_tokens=3000,
-                    include_mermaid=True,
-                    tools=qodo_tools,
-                    progress=True,
-                )
-                qodo_result = enrich_qodo_project(
-                    db,
-                    project_id,
-                    qodo_opts,
-                    candidates=[
-                        {
-                            "id": mr_id,
-                            "project_id": project_id,
-                            "iid": mr_iid,
-                            "web_url": target.get("web_url"),
-                        }
-                    ],
-                )
-                compact_project_qodo(db, project_id, qodo_opts)
-                print(
-                    f"[mr-context] qodo tools={','.join(qodo_tools)} "
-                    f"eligible={qodo_result['eligible']} success={qodo_result['success']} "
-                    f"failed={qodo_result['failed']} skipped={qodo_result['skipped']}"
-                )
 
-        if bool(args.reclassify):
-            reclassified = classify_project(
+def _cmd_mr_context(args: argparse.Namespace, db: Database, partial: PartialSettings) -> int:
+    db.init_schema()
+    target = _resolve_single_mr(db, args)
+    mr_id = int(target["id"])
+    project_id = int(target["project_id"])
+    mr_iid = int(target["iid"])
+    print(f"Target MR: project_id={project_id} mr_iid={mr_iid} mr_id={mr_id}")
+
+    qodo_tools = _parse_tools(args.qodo_tools)
+    if bool(args.qodo_inline):
+        if not (target.get("web_url") or "").strip():
+            print("[mr-context] skipped qodo-inline: MR has no web_url")
+        else:
+            qodo_opts = EnrichOptions(
+                output_root=args.qodo_output_root,
+                concurrency=max(1, int(args.qodo_concurrency)),
+                mr_limit=1,
+                only_missing=bool(args.qodo_only_missing),
+                force=False,
+                data_source=args.data_source,
+                timeout_sec=int(args.qodo_timeout_sec),
+                compact_max_tokens=3000,
+                include_mermaid=True,
+                tools=qodo_tools,
+                progress=True,
+            )
+            qodo_result = enrich_qodo_project(
                 db,
-                partial,
                 project_id,
-                only_stale=False,
-                target_classifier_version=CLASSIFIER_VERSION,
-                mr_ids=[mr_id],
+                qodo_opts,
+                candidates=[
+                    {
+                        "id": mr_id,
+                        "project_id": project_id,
+                        "iid": mr_iid,
+                        "web_url": target.get("web_url"),
+                    }
+                ],
+            )
+            compact_project_qodo(db, project_id, qodo_opts)
+            print(
+                f"[mr-context] qodo tools={','.join(qodo_tools)} "
+                f"eligible={qodo_result['eligible']} success={qodo_result['success']} "
+                f"failed={qodo_result['failed']} skipped={qodo_result['skipped']}"
             )
-            print(f"[mr-context] reclassified={reclassified}")
-
-        bundle = _load_single_mr_bundle(db, mr_id)
-        rendered = _render_single_mr_context(bundle)
-        out_path = Path(args.out_path) if args.out_path else _default_mr_context_path(args.output_root, project_id, mr_iid)
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        out_path.write_text(rendered, encoding="utf-8")
-        print(f"MR context written: {out_path}")
-        return 0
 
-    if args.command == "export":
-        db.init_schema()
-        project_ids: list[int] | None = None
-        if getattr(args, "project_id", None) or getattr(args, "group_id", None) or getattr(args, "all_projects", False):
-            project_ids = _resolve_project_scope_ids(args)
-        filename_stem = _resolve_export_stem(args)
-        outputs: list[str] = []
-        if args.format in ("csv", "both"):
-            outputs.append(str(export_csv(db, out_dir=args.out_dir, project_ids=project_ids, filename_stem=filename_stem)))
-        if args.format in ("jsonl", "both"):
-            outputs.append(str(export_jsonl(db, out_dir=args.out_dir, project_ids=project_ids, filename_stem=filename_stem)))
-        print("Exported:\n" + "\n".join(outputs))
-        return 0
+    if bool(args.reclassify):
+        reclassified = classify_project(
+            db,
+            partial,
+            project_id,
+            only_stale=False,
+            target_classifier_version=CLASSIFIER_VERSION,
+            mr_ids=[mr_id],
+        )
+        print(f"[mr-context] reclassified={reclassified}")
 
-    if args.command == "audit" and args.audit_command == "sample":
-        db.init_schema()
-        output = create_audit_sample(db, args.size)
-        print(f"Audit sample written: {output}")
-        return 0
+    bundle = _load_single_mr_bundle(db, mr_id)
+    out_path = Path(args.out_path) if args.out_path else _default_mr_context_path(args.output_root, project_id, mr_iid)
+    sig_line = f"<!-- mr-context-sig: {_mr_context_signature(bundle)} -->\n"
+    try:
+        with out_path.open(encoding="utf-8") as existing:
+            if existing.readline() == sig_line:
+                print(f"MR context unchanged: {out_path}")
+                return 0
+    except OSError:
+        pass
+    rendered = _render_single_mr_context(bundle)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(sig_line + rendered, encoding="utf-8")
+    print(f"MR context written: {out_path}")
+    return 0
 
-    if args.command == "demo" and args.demo_command == "seed":
-        count = seed_demo_data(
-            db=db,
-            project_id=args.project_id,
-            settings=partial,
-            run_classify=not args.no_classify,
-        )
-        print(f"Seeded {count} demo merge requests for project {args.project_id}")
-        return 0
 
-    if args.command == "seed":
+def _cmd_export(args: argparse.Namespace, db: Database, partial: PartialSettings) -> int:
+    db.init_schema()
+    project_ids: list[int] | None = None
+    if getattr(args, "project_id", None) or getattr(args, "group_id", None) or getattr(args, "all_projects", False):
+        project_ids = _resolve_project_scope_ids(args)
+    filename_stem = _resolve_export_stem(args)
+    outputs: list[Path] = []
+    if args.format in ("csv", "both"):
+        outputs.append(export_csv(db, out_dir=args.out_dir, project_ids=project_ids, filename_stem=filename_stem))
+    if args.format in ("jsonl", "both"):
+        outputs.append(export_jsonl(db, out_dir=args.out_dir, project_ids=project_ids, filename_stem=filename_stem))
+    print("Exported:\n" + "\n".join(map(os.fspath, outputs)))
+    return 0
+
+
+def _cmd_audit_sample(args: argparse.Namespace, db: Database, partial: PartialSettings) -> int:
+    from prtool.audit import create_audit_sample
+
+    db.init_schema()
+    output = create_audit_sample(db, args.size)
+    print(f"Audit sample written: {output}")
+    return 0
+
+
+def _cmd_seed(args: argparse.Namespace, db: Database, partial: PartialSettings) -> int:
+    from prtool.seed_data import seed_demo_data
+
+    with db.session():
         count = seed_demo_data(
             db=db,
             project_id=args.project_id,
             settings=partial,
             run_classify=not args.no_classify,
         )
-        print(f"Seeded {count} demo merge requests for project {args.project_id}")
-        return 0
+    print(f"Seeded {count} demo merge requests for project {args.project_id}")
+    return 0
 
-    if args.command == "batch" and args.batch_command == "run":
-        settings = load_settings()
-        db.init_schema()
-        project_ids = _resolve_sync_project_ids(args, settings)
-        concurrency = _resolve_concurrency(args)
-        print(
-            f"Selected projects ({len(project_ids)}): {project_ids} | "
-            f"concurrency={concurrency} | light_mode={args.light_mode}"
-        )
 
-        sync_total = 0
+def _cmd_batch_run(args: argparse.Namespace, db: Database, partial: PartialSettings) -> int:
+    settings = load_settings()
+    db.init_schema()
+    project_ids = _resolve_sync_project_ids(args, settings)
+    concurrency = _resolve_concurrency(args)
+    print(
+        f"Selected projects ({len(project_ids)}): {project_ids} | "
+        f"concurrency={concurrency} | light_mode={args.light_mode}"
+    )
+
+    sync_total = 0
+    classify_total = 0
+    with db.session():
         for project_id in project_ids:
             if args.since:
                 count = sync_backfill(
@@ -1323,498 +1874,613 @@ def main(argv: list[str] | None = None) -> int:
                 )
                 print(f"[project {project_id}] Refresh complete: {count} merge requests ingested")
             sync_total += count
-        print(f"Sync total across projects: {sync_total}")
 
-        classify_total = 0
-        for project_id in project_ids:
             count = classify_project(db, partial, project_id)
             classify_total += count
             print(f"[project {project_id}] Classification complete: {count} merge requests processed")
-        print(f"Classification total across projects: {classify_total}")
-
-        outputs: list[str] = []
-        if args.format in ("csv", "both"):
-            outputs.append(str(export_csv(db)))
-        if args.format in ("jsonl", "both"):
-            outputs.append(str(export_jsonl(db)))
-        print("Exported:\n" + "\n".join(outputs))
-        return 0
+    print(f"Sync total across projects: {sync_total}")
+    print(f"Classification total across projects: {classify_total}")
+
+    outputs: list[Path] = []
+    if args.format in ("csv", "both"):
+        outputs.append(export_csv(db))
+    if args.format in ("jsonl", "both"):
+        outputs.append(export_jsonl(db))
+    print("Exported:\n" + "\n".join(map(os.fspath, outputs)))
+    return 0
 
-    if args.command == "projects" and args.projects_command == "list":
-        settings = load_settings()
-        projects = _resolve_discovery_projects(args, settings)
-        if not projects:
-            if getattr(args, "project_id", None):
-                projects = [{"id": int(pid), "path_with_namespace": "", "name": ""} for pid in args.project_id]
-            else:
-                client = GitLabSourceClient(settings)
-                projects = client.list_accessible_projects()
-        all_ids = sorted({int(p["id"]) for p in projects})
-        selected_ids = _slice_project_ids(all_ids, start_index=args.project_start_index, count=args.project_count)
-        selected_set = set(selected_ids)
-        selected_projects = [p for p in projects if int(p["id"]) in selected_set]
-        client = GitLabSourceClient(settings)
-        ranked = _rank_projects_with_mr_counts(selected_projects, client, with_mr_count=args.with_mr_count)
-
-        if args.format == "json":
-            print(json.dumps(ranked))
-            return 0
 
-        print(f"Project window: start={args.project_start_index}, count={args.project_count or 'ALL'}")
-        print("rank\tproject_id\tmr_count_all_states\tpath_with_namespace\tname")
-        for project in ranked:
-            print(
-                f"{project['rank']}\t{int(project['id'])}\t{project.get('mr_count_all_states', 0) or 0}\t"
-                f"{project.get('path_with_namespace','')}\t{project.get('name','')}"
+def _cmd_projects_list(args: argparse.Namespace, db: Database, partial: PartialSettings) -> int:
+    settings = load_settings()
+    projects = _resolve_discovery_projects(args, settings)
+    if not projects:
+        if getattr(args, "project_id", None):
+            projects = [{"id": int(pid), "path_with_namespace": "", "name": ""} for pid in args.project_id]
+        else:
+            projects = _disk_cached_projects(
+                args,
+                settings,
+                ((), True),
+                lambda: _gitlab_client(settings).list_accessible_projects(page_concurrency=_resolve_page_concurrency()),
             )
+    id_to_project = {int(p["id"]): p for p in projects}
+    selected_ids = _slice_project_ids(sorted(id_to_project), start_index=args.project_start_index, count=args.project_count)
+    selected_projects = [id_to_project[pid] for pid in selected_ids]
+    client = _gitlab_client(settings)
+    ranked = _rank_projects_with_mr_counts(
+        selected_projects,
+        client,
+        with_mr_count=args.with_mr_count,
+        concurrency=_resolve_mr_count_concurrency(args),
+    )
+
+    if args.format == "json":
+        _print_json(list(ranked))
         return 0
 
-    if args.command == "projects" and args.projects_command == "count":
-        settings = load_settings()
-        scope, project_ids, groups = _resolve_count_scope(args, settings)
-        if args.format == "json":
-            payload: dict[str, Any] = {
-                "total_projects": len(project_ids),
-                "scope": scope,
-            }
-            if scope == "groups":
-                payload["groups"] = groups
-            if args.include_ids:
-                payload["project_ids"] = project_ids
-            print(json.dumps(payload))
-            return 0
+    print(f"Project window: start={args.project_start_index}, count={args.project_count or 'ALL'}")
+    _write_rows(
+        "rank\tproject_id\tmr_count_all_states\tpath_with_namespace\tname",
+        (
+            f"{project['rank']}\t{int(project['id'])}\t{project.get('mr_count_all_states', 0) or 0}\t"
+            f"{project.get('path_with_namespace','')}\t{project.get('name','')}"
+            for project in ranked
+        ),
+    )
+    return 0
+
 
-        print(f"total_projects: {len(project_ids)}")
-        print(f"scope: {scope}")
+def _cmd_projects_count(args: argparse.Namespace, db: Database, partial: PartialSettings) -> int:
+    settings = load_settings()
+    scope, project_ids, groups = _resolve_count_scope(args, settings)
+    if args.format == "json":
+        payload: dict[str, Any] = {
+            "total_projects": len(project_ids),
+            "scope": scope,
+        }
         if scope == "groups":
-            print(f"groups: {','.join(groups)}")
+            payload["groups"] = groups
         if args.include_ids:
-            print(f"project_ids: {','.join(str(pid) for pid in project_ids)}")
+            payload["project_ids"] = project_ids
+        _print_json(payload)
         return 0
 
-    if args.command == "list-projects":
-        settings = load_settings()
-        projects = _resolve_discovery_projects(args, settings)
-        if not projects:
-            client = GitLabSourceClient(settings)
-            projects = client.list_accessible_projects()
-        all_ids = [int(p["id"]) for p in projects]
-        selected_ids = _slice_project_ids(
-            all_ids,
-            start_index=args.project_start_index,
-            count=args.project_count,
+    print(f"total_projects: {len(project_ids)}")
+    print(f"scope: {scope}")
+    if scope == "groups":
+        print(f"groups: {','.join(groups)}")
+    if args.include_ids:
+        print(f"project_ids: {','.join(str(pid) for pid in project_ids)}")
+    return 0
+
+
+def _cmd_list_projects(args: argparse.Namespace, db: Database, partial: PartialSettings) -> int:
+    settings = load_settings()
+    projects = _resolve_discovery_projects(args, settings)
+    if not projects:
+        projects = _disk_cached_projects(
+            args,
+            settings,
+            ((), True),
+            lambda: _gitlab_client(settings).list_accessible_projects(page_concurrency=_resolve_page_concurrency()),
         )
-        selected_set = set(selected_ids)
-        print(f"Project window: start={args.project_start_index}, count={args.project_count or 'ALL'}")
-        print("index\tproject_id\tpath_with_namespace\tname")
-        for idx, project in enumerate(projects, start=1):
-            pid = int(project["id"])
-            if pid in selected_set:
-                print(f"{idx}\t{pid}\t{project.get('path_with_namespace','')}\t{project.get('name','')}")
-        return 0
+    all_ids = [int(p["id"]) for p in projects]
+    selected_ids = _slice_project_ids(
+        all_ids,
+        start_index=args.project_start_index,
+        count=args.project_count,
+    )
+    # The window is positional, so index straight into it rather than filtering every project.
+    start = args.project_start_index - 1
+    window = projects[start : start + len(selected_ids)]
+    print(f"Project window: start={args.project_start_index}, count={args.project_count or 'ALL'}")
+    _write_rows(
+        "index\tproject_id\tpath_with_namespace\tname",
+        (
+            f"{idx}\t{int(project['id'])}\t{project.get('path_with_namespace','')}\t{project.get('name','')}"
+            for idx, project in enumerate(window, start=args.project_start_index)
+        ),
+    )
+    return 0
 
-    if args.command == "view":
-        db.init_schema()
-        run_viewer(db_path=partial.db_path, host=args.host, port=args.port)
-        return 0
 
-    if args.command == "enrich" and args.enrich_command == "qodo-threshold":
-        if not (0.0 <= float(args.min_confidence) < float(args.max_confidence) <= 1.0):
-            raise ValueError("--min-confidence and --max-confidence must satisfy 0 <= min < max <= 1")
+def _cmd_view(args: argparse.Namespace, db: Database, partial: PartialSettings) -> int:
+    from prtool.viewer import run_viewer
 
-        db.init_schema()
-        project_ids = _resolve_project_scope_ids(args)
-        reasons = _parse_reason_filter(args.reasons)
-        tools = _parse_tools(args.tools)
-        if "describe" not in tools:
-            tools = ("describe",) + tuple(t for t in tools if t != "describe")
-
-        opts = EnrichOptions(
-            output_root=args.output_root,
-            concurrency=args.concurrency,
-            mr_limit=args.mr_limit,
-            only_missing=args.only_missing,
-            force=args.force,
-            data_source=args.data_source,
-            timeout_sec=args.timeout_sec,
-            compact_max_tokens=args.compact_max_tokens,
-            include_mermaid=args.include_mermaid,
-            tools=tools,
-            progress=not args.no_progress,
-        )
+    db.init_schema()
+    run_viewer(db_path=partial.db_path, host=args.host, port=args.port)
+    return 0
 
-        before_scope = _needs_review_stats(db, project_ids, data_source=args.data_source)
-        candidates = _select_qodo_threshold_candidates(
-            db,
-            project_ids=project_ids,
-            min_confidence=float(args.min_confidence),
-            max_confidence=float(args.max_confidence),
-            reasons=reasons,
-            require_empty_description=bool(args.require_empty_description),
-            data_source=args.data_source,
-            tools=tools,
-            only_missing=args.only_missing,
-            force=args.force,
-            mr_limit=args.mr_limit,
-        )
-        print(
-            f"Threshold selection: projects={len(project_ids)} min_conf={float(args.min_confidence):.3f} "
-            f"max_conf={float(args.max_confidence):.3f} reasons={','.join(reasons) if reasons else 'ALL'} "
-            f"require_empty_description={bool(args.require_empty_description)} selected={len(candidates)}"
-        )
 
-        if not candidates:
-            print("No eligible candidates in threshold band. Nothing to run.")
-            return 0
+def _cmd_enrich_qodo_threshold(args: argparse.Namespace, db: Database, partial: PartialSettings) -> int:
+    if not (0.0 <= float(args.min_confidence) < float(args.max_confidence) <= 1.0):
+        raise ValueError("--min-confidence and --max-confidence must satisfy 0 <= min < max <= 1")
+
+    db.init_schema()
+    project_ids = _resolve_project_scope_ids(args)
+    reasons = _parse_reason_filter(args.reasons)
+    tools = _parse_tools(args.tools)
+    if "describe" not in tools:
+        tools = ("describe",) + tuple(t for t in tools if t != "describe")
+
+    opts = EnrichOptions(
+        output_root=args.output_root,
+        concurrency=args.concurrency,
+        mr_limit=args.mr_limit,
+        only_missing=args.only_missing,
+        force=args.force,
+        data_source=args.data_source,
+        timeout_sec=args.timeout_sec,
+        compact_max_tokens=args.compact_max_tokens,
+        include_mermaid=args.include_mermaid,
+        tools=tools,
+        progress=not args.no_progress,
+    )
 
-        print("project_id\tmr_iid\tmr_id\tconfidence\tfinal_type\tempty_description\tupdated_at\tweb_url")
-        for row in candidates:
-            print(
-                f"{row['project_id']}\t{row['iid']}\t{row['id']}\t{float(row['classification_confidence']):.3f}\t"
-                f"{row.get('final_type') or ''}\t{int(row.get('has_empty_description') or 0)}\t"
-                f"{row.get('updated_at') or ''}\t{row.get('web_url') or ''}"
-            )
+    candidates = _select_qodo_threshold_candidates(
+        db,
+        project_ids=project_ids,
+        min_confidence=float(args.min_confidence),
+        max_confidence=float(args.max_confidence),
+        reasons=reasons,
+        require_empty_description=bool(args.require_empty_description),
+        data_source=args.data_source,
+        tools=tools,
+        only_missing=args.only_missing,
+        force=args.force,
+        mr_limit=args.mr_limit,
+    )
+    print(
+        f"Threshold selection: projects={len(project_ids)} min_conf={float(args.min_confidence):.3f} "
+        f"max_conf={float(args.max_confidence):.3f} reasons={','.join(reasons) if reasons else 'ALL'} "
+        f"require_empty_description={bool(args.require_empty_description)} selected={len(candidates)}"
+    )
 
-        if args.dry_run:
-            print("Dry-run only; skipped enrichment and reclassification.")
-            return 0
+    if not candidates:
+        print("No eligible candidates in threshold band. Nothing to run.")
+        return 0
 
-        candidate_ids = [int(r["id"]) for r in candidates]
-        before_candidate_state = {int(r["id"]): (float(r["classification_confidence"]), int(r["needs_review"])) for r in candidates}
-
-        selected_by_project: dict[int, list[dict[str, Any]]] = {}
-        candidate_ids_by_project: dict[int, list[int]] = {}
-        for row in candidates:
-            pid = int(row["project_id"])
-            selected_by_project.setdefault(pid, []).append(row)
-            candidate_ids_by_project.setdefault(pid, []).append(int(row["id"]))
-
-        total_eligible = 0
-        total_success = 0
-        total_failed = 0
-        total_skipped = 0
-        for project_id in sorted(selected_by_project.keys()):
-            project_candidates = selected_by_project[project_id]
-            result = enrich_qodo_project(db, project_id, opts, candidates=project_candidates)
-            comp = compact_project_qodo(db, project_id, opts)
-            total_eligible += result["eligible"]
-            total_success += result["success"]
-            total_failed += result["failed"]
-            total_skipped += result["skipped"]
-            print(
-                f"[project {project_id}] tools={','.join(tools)} eligible={result['eligible']} success={result['success']} "
-                f"failed={result['failed']} skipped={result['skipped']} compact={comp['compact_markdown_path']}"
-            )
+    _write_rows(
+        "project_id\tmr_iid\tmr_id\tconfidence\tfinal_type\tempty_description\tupdated_at\tweb_url",
+        (
+            f"{row['project_id']}\t{row['iid']}\t{row['id']}\t{row['classification_confidence']:.3f}\t"
+            f"{row.get('final_type') or ''}\t{row.get('has_empty_description') or 0}\t"
+            f"{row.get('updated_at') or ''}\t{row.get('web_url') or ''}"
+            for row in candidates
+        ),
+    )
 
-        reclassified_total = 0
-        for project_id in sorted(candidate_ids_by_project.keys()):
-            count = classify_project(
-                db,
-                partial,
-                project_id,
-                only_stale=False,
-                target_classifier_version=CLASSIFIER_VERSION,
-                mr_ids=candidate_ids_by_project[project_id],
-            )
-            reclassified_total += count
-            print(f"[project {project_id}] Reclassification complete: {count} targeted merge requests processed")
-
-        after_scope = _needs_review_stats(db, project_ids, data_source=args.data_source)
-
-        after_candidate_state: dict[int, tuple[float, int]] = {}
-        with db.connect() as conn:
-            id_placeholders = ",".join(["?"] * len(candidate_ids))
-            rows = conn.execute(
-                f"""
-                SELECT mr_id, classification_confidence, needs_review
-                FROM mr_classifications
-                WHERE mr_id IN ({id_placeholders})
-                """,
-                tuple(candidate_ids),
-            ).fetchall()
-            after_candidate_state = {
-                int(r["mr_id"]): (float(r["classification_confidence"]), int(r["needs_review"]))
-                for r in rows
-            }
-
-        promoted = 0
-        improved = 0
-        total_conf_delta = 0.0
-        for mr_id, (before_conf, before_nr) in before_candidate_state.items():
-            after_conf, after_nr = after_candidate_state.get(mr_id, (before_conf, before_nr))
-            if after_conf > before_conf:
-                improved += 1
-            if before_nr == 1 and after_nr == 0:
-                promoted += 1
-            total_conf_delta += after_conf - before_conf
-        avg_delta = round(total_conf_delta / len(before_candidate_state), 4) if before_candidate_state else 0.0
+    if args.dry_run:
+        print("Dry-run only; skipped enrichment and reclassification.")
+        return 0
 
+    before_scope = _threshold_snapshot(db, project_ids, args.data_source, candidates)
+
+    # Candidates arrive ordered by project_id.
+    selected_by_project = {pid: list(rows) for pid, rows in groupby(candidates, key=itemgetter("project_id"))}
+
+    totals: Counter[str] = Counter()
+    for done_project_id, done_result, comp in _enrich_and_compact_projects(db, project_ids, selected_by_project, opts):
+        totals.update({key: int(done_result[key]) for key in _RUN_TOTAL_KEYS})
         print(
-            f"Threshold enrich total: eligible={total_eligible} success={total_success} "
-            f"failed={total_failed} skipped={total_skipped} reclassified={reclassified_total}"
-        )
-        print(
-            f"Candidate impact: promoted_above_threshold={promoted} improved_confidence={improved}/{len(before_candidate_state)} "
-            f"avg_conf_delta={avg_delta:+.4f}"
-        )
-        print(
-            f"Scope needs_review: before={before_scope['needs_review']}/{before_scope['total']} ({before_scope['needs_review_pct']:.2f}%) "
-            f"after={after_scope['needs_review']}/{after_scope['total']} ({after_scope['needs_review_pct']:.2f}%) "
-            f"delta={(after_scope['needs_review_pct'] - before_scope['needs_review_pct']):+.2f}pp"
+            f"[project {done_project_id}] tools={','.join(tools)} eligible={done_result['eligible']} "
+            f"success={done_result['success']} failed={done_result['failed']} "
+            f"skipped={done_result['skipped']} compact={comp['compact_markdown_path']}"
         )
-        return 0
 
-    if args.command == "enrich" and args.enrich_command == "qodo":
-        project_ids = _resolve_project_scope_ids(args)
-        tools = _parse_tools(args.tools)
-        opts = EnrichOptions(
-            output_root=args.output_root,
-            concurrency=args.concurrency,
-            mr_limit=args.mr_limit,
-            only_missing=args.only_missing,
-            force=args.force,
-            data_source=args.data_source,
-            timeout_sec=args.timeout_sec,
-            compact_max_tokens=args.compact_max_tokens,
-            include_mermaid=args.include_mermaid,
-            tools=tools,
-            progress=not args.no_progress,
-        )
-        candidate_opts = CandidateOptions(
-            mode=args.candidate_mode,
-            count=args.candidate_count,
-            scope=args.candidate_scope,
-            type_balance=args.candidate_type_balance,
-            data_source=args.candidate_data_source,
-            preview=args.candidate_preview,
-        )
-        selected: list[dict[str, Any]] | None = None
-        if candidate_opts.mode == "stratified":
-            selected = select_enrich_candidates(db, project_ids, opts, candidate_opts)
-            requested = max(1, int(candidate_opts.count))
+    reclassified = classify_merge_requests(
+        db,
+        partial,
+        {project_id: [int(r["id"]) for r in bucket] for project_id, bucket in selected_by_project.items()},
+    )
+    reclassified_total = 0
+    for project_id in project_ids:
+        count = reclassified.get(project_id)
+        if count is None:
+            continue
+        reclassified_total += count
+        print(f"[project {project_id}] Reclassification complete: {count} targeted merge requests processed")
+
+    after_scope = _threshold_snapshot(db, project_ids, args.data_source, candidates)
+    avg_delta = round(after_scope["conf_delta"] / len(candidates), 4)
+
+    print(
+        f"Threshold enrich total: eligible={totals['eligible']} success={totals['success']} "
+        f"failed={totals['failed']} skipped={totals['skipped']} reclassified={reclassified_total}"
+    )
+    print(
+        f"Candidate impact: promoted_above_threshold={after_scope['promoted']} "
+        f"improved_confidence={after_scope['improved']}/{len(candidates)} "
+        f"avg_conf_delta={avg_delta:+.4f}"
+    )
+    print(
+        f"Scope needs_review: before={before_scope['needs_review']}/{before_scope['total']} ({before_scope['needs_review_pct']:.2f}%) "
+        f"after={after_scope['needs_review']}/{after_scope['total']} ({after_scope['needs_review_pct']:.2f}%) "
+        f"delta={(after_scope['needs_review_pct'] - before_scope['needs_review_pct']):+.2f}pp"
+    )
+    return 0
+
+
+def _cmd_enrich_qodo(args: argparse.Namespace, db: Database, partial: PartialSettings) -> int:
+    project_ids = _resolve_project_scope_ids(args)
+    tools = _parse_tools(args.tools)
+    opts = EnrichOptions(
+        output_root=args.output_root,
+        concurrency=args.concurrency,
+        mr_limit=args.mr_limit,
+        only_missing=args.only_missing,
+        force=args.force,
+        data_source=args.data_source,
+        timeout_sec=args.timeout_sec,
+        compact_max_tokens=args.compact_max_tokens,
+        include_mermaid=args.include_mermaid,
+        tools=tools,
+        progress=not args.no_progress,
+    )
+    candidate_opts = CandidateOptions(
+        mode=args.candidate_mode,
+        count=args.candidate_count,
+        scope=args.candidate_scope,
+        type_balance=args.candidate_type_balance,
+        data_source=args.candidate_data_source,
+        preview=args.candidate_preview,
+    )
+    selected: list[dict[str, Any]] | None = None
+    if candidate_opts.mode == "stratified":
+        selected = select_enrich_candidates(db, project_ids, opts, candidate_opts)
+        requested = max(1, int(candidate_opts.count))
+        if selected:
+            if len(selected) < requested:
+                print(
+                    f"Candidate selection warning: requested={requested}, selected={len(selected)} "
+                    f"(fewer eligible MRs than requested)"
+                )
+            print(f"Candidate selection: selected={len(selected)}/{requested}")
+        else:
+            print("Candidate selection: selected=0")
+
+        if candidate_opts.preview:
             if selected:
-                if len(selected) < requested:
+                print("project_id\tmr_iid\tmr_id\tfinal_type\tcomplexity_score\tupdated_at\tweb_url")
+                for row in selected:
                     print(
-                        f"Candidate selection warning: requested={requested}, selected={len(selected)} "
-                        f"(fewer eligible MRs than requested)"
+                        f"{row['project_id']}\t{row['mr_iid']}\t{row['mr_id']}\t{row.get('final_type') or ''}\t"
+                        f"{row.get('complexity_score')}\t{row.get('updated_at') or ''}\t{row.get('web_url') or ''}"
                     )
-                print(f"Candidate selection: selected={len(selected)}/{requested}")
-            else:
-                print("Candidate selection: selected=0")
-
-            if candidate_opts.preview:
-                if selected:
-                    print("project_id\tmr_iid\tmr_id\tfinal_type\tcomplexity_score\tupdated_at\tweb_url")
-                    for row in selected:
-                        print(
-                            f"{row['project_id']}\t{row['mr_iid']}\t{row['mr_id']}\t{row.get('final_type') or ''}\t"
-                            f"{row.get('complexity_score')}\t{row.get('updated_at') or ''}\t{row.get('web_url') or ''}"
-                        )
-                return 0
+            return 0
 
-        total_eligible = 0
-        total_success = 0
-        total_failed = 0
-        total_skipped = 0
-        global_total_runs = (len(selected) * len(tools)) if selected is not None else None
-        global_runs_done = 0
-
-        selected_by_project: dict[int, list[dict[str, Any]]] = {}
-        if selected is not None:
-            for row in selected:
-                selected_by_project.setdefault(int(row["project_id"]), []).append(row)
-            run_project_ids = sorted(selected_by_project.keys())
-        else:
-            run_project_ids = project_ids
+    totals: Counter[str] = Counter()
+    global_total_runs = (len(selected) * len(tools)) if selected is not None else None
+    global_runs_done = 0
 
-        def _global_progress(_res: dict[str, Any], _project_done: int, _project_total: int) -> None:
-            nonlocal global_runs_done
-            if global_total_runs is None or args.no_progress:
-                return
+    selected_by_project: dict[int, list[dict[str, Any]]] = {}
+    if selected is not None:
+        for row in selected:
+            selected_by_project.setdefault(int(row["project_id"]), []).append(row)
+        run_project_ids = [pid for pid in project_ids if pid in selected_by_project]
+    else:
+        run_project_ids = project_ids
+
+    progress_lock = threading.Lock()
+
+    def _global_progress(_res: dict[str, Any], _project_done: int, _project_total: int) -> None:
+        nonlocal global_runs_done
+        if global_total_runs is None or args.no_progress:
+            return
+        # Projects may run on pool threads; keep the shared counter and its line in step.
+        with progress_lock:
             global_runs_done += 1
             print(f"[enrich] tool-run progress {global_runs_done}/{global_total_runs}")
 
-        for project_id in run_project_ids:
-            project_candidates = selected_by_project.get(project_id) if selected is not None else None
-            result = enrich_qodo_project(db, project_id, opts, candidates=project_candidates, on_result=_global_progress)
-            comp = compact_project_qodo(db, project_id, opts)
-            total_eligible += result["eligible"]
-            total_success += result["success"]
-            total_failed += result["failed"]
-            total_skipped += result["skipped"]
-            print(
-                f"[project {project_id}] tools={','.join(tools)} eligible={result['eligible']} success={result['success']} "
-                f"failed={result['failed']} skipped={result['skipped']} compact={comp['compact_markdown_path']}"
-            )
+    def _run_project(project_id: int) -> tuple[dict[str, Any], dict[str, Any]]:
+        project_candidates = selected_by_project.get(project_id) if selected is not None else None
+        result = enrich_qodo_project(db, project_id, opts, candidates=project_candidates, on_result=_global_progress)
+        return result, compact_project_qodo(db, project_id, opts)
+
+    for project_id, (result, comp) in _map_projects(_run_project, run_project_ids, _resolve_project_concurrency(args)):
+        totals.update({key: int(result[key]) for key in _RUN_TOTAL_KEYS})
         print(
-            f"Enrich total: eligible={total_eligible} success={total_success} failed={total_failed} skipped={total_skipped}"
+            f"[project {project_id}] tools={','.join(tools)} eligible={result['eligible']} success={result['success']} "
+            f"failed={result['failed']} skipped={result['skipped']} compact={comp['compact_markdown_path']}"
         )
-        return 0
+    print(
+        f"Enrich total: eligible={totals['eligible']} success={totals['success']} "
+        f"failed={totals['failed']} skipped={totals['skipped']}"
+    )
+    return 0
 
-    if args.command == "enrich" and args.enrich_command == "status":
-        project_ids = _resolve_project_scope_ids(args)
-        rows = get_enrich_status(db, project_ids, data_source=args.data_source)
-        if args.format == "json":
-            print(json.dumps(rows))
-            return 0
-        print("project_id\teligible\tenriched\tfailed\tcompact_markdown_path\toverview_mermaid_path\tcompacted_at")
-        for row in rows:
-            print(
-                f"{row['project_id']}\t{row['eligible']}\t{row['enriched']}\t{row['failed']}\t"
-                f"{row.get('compact_markdown_path') or ''}\t{row.get('overview_mermaid_path') or ''}\t"
-                f"{row.get('compacted_at') or ''}"
-            )
-        return 0
 
+def _cmd_enrich_status(args: argparse.Namespace, db: Database, partial: PartialSettings) -> int:
+    project_ids = _resolve_project_scope_ids(args)
+    rows = get_enrich_status(db, project_ids, data_source=args.data_source)
+    if args.format == "json":
+        _print_json(rows)
+        return 0
+    _write_rows(
+        "project_id\teligible\tenriched\tfailed\tcompact_markdown_path\toverview_mermaid_path\tcompacted_at",
+        (
+            f"{row['project_id']}\t{row['eligible']}\t{row['enriched']}\t{row['failed']}\t"
+            f"{row.get('compact_markdown_path') or ''}\t{row.get('overview_mermaid_path') or ''}\t"
+            f"{row.get('compacted_at') or ''}"
+            for row in rows
+        ),
+    )
+    return 0
 
 
-    if args.command == "memory" and args.memory_command == "baseline-build":
-        db.init_schema()
-        project_ids = _resolve_project_scope_ids(args)
-        print(f"Selected projects ({len(project_ids)}): {project_ids}")
-        total = 0
-        for project_id in project_ids:
-            row = build_project_baseline(
-                db,
-                project_id,
-                BaselineBuildOptions(
-                    output_root=args.output_root,
-                    data_source=args.data_source,
-                    history_window_months=args.history_window_months,
-                    db_only=args.db_only,
-                ),
-            )
+def _cmd_memory_baseline_build(args: argparse.Namespace, db: Database, partial: PartialSettings) -> int:
+    db.init_schema()
+    project_ids = _resolve_project_scope_ids(args)
+    print(f"Selected projects ({len(project_ids)}): {project_ids}")
+    opts = BaselineBuildOptions(
+        output_root=args.output_root,
+        data_source=args.data_source,
+        history_window_months=args.history_window_months,
+        db_only=args.db_only,
+    )
+    total = 0
+    with db.session():
+        results = _map_projects(
+            lambda project_id: build_project_baseline(db, project_id, opts),
+            project_ids,
+            _resolve_project_concurrency(args),
+        )
+        for project_id, row in results:
             total += 1
             print(
                 f"[project {project_id}] Baseline built: sample_size={row['sample_size']} path={row['markdown_path']}"
             )
-        print(f"Baseline total across projects: {total}")
-        return 0
+    print(f"Baseline total across projects: {total}")
+    return 0
 
-    if args.command == "memory" and args.memory_command == "mr-build":
-        db.init_schema()
-        project_ids = _resolve_project_scope_ids(args)
-        print(f"Selected projects ({len(project_ids)}): {project_ids}")
-        total_eligible = 0
-        total_success = 0
-        total_failed = 0
-        total_skipped = 0
-        for project_id in project_ids:
-            result = build_runtime_for_project(
-                db,
-                project_id,
-                MRBuildOptions(
-                    output_root=args.output_root,
-                    data_source=args.data_source,
-                    include_similar_limit=args.include_similar_limit,
-                    compose=args.compose,
-                    only_missing=args.only_missing and not args.force,
-                    force=args.force,
-                    mr_limit=args.mr_limit,
-                    db_only=args.db_only,
-                    outcome_mode=args.outcome_mode,
-                ),
-            )
-            total_eligible += int(result['eligible'])
-            total_success += int(result['success'])
-            total_failed += int(result['failed'])
-            total_skipped += int(result['skipped'])
+
+def _cmd_memory_mr_build(args: argparse.Namespace, db: Database, partial: PartialSettings) -> int:
+    db.init_schema()
+    project_ids = _resolve_project_scope_ids(args)
+    print(f"Selected projects ({len(project_ids)}): {project_ids}")
+    totals: Counter[str] = Counter()
+    opts = MRBuildOptions(
+        output_root=args.output_root,
+        data_source=args.data_source,
+        include_similar_limit=args.include_similar_limit,
+        compose=args.compose,
+        only_missing=args.only_missing and not args.force,
+        force=args.force,
+        mr_limit=args.mr_limit,
+        db_only=args.db_only,
+        outcome_mode=args.outcome_mode,
+    )
+    with db.session():
+        results = _map_projects(
+            lambda project_id: build_runtime_for_project(db, project_id, opts),
+            project_ids,
+            _resolve_project_concurrency(args),
+        )
+        for project_id, result in results:
+            totals.update({key: int(result[key]) for key in _RUN_TOTAL_KEYS})
             print(
                 f"[project {project_id}] Memory runtime complete: "
                 f"eligible={result['eligible']} success={result['success']} "
                 f"failed={result['failed']} skipped={result['skipped']}"
             )
-        print(
-            f"Memory runtime total: eligible={total_eligible} success={total_success} "
-            f"failed={total_failed} skipped={total_skipped}"
-        )
-        return 0
+    print(
+        f"Memory runtime total: eligible={totals['eligible']} success={totals['success']} "
+        f"failed={totals['failed']} skipped={totals['skipped']}"
+    )
+    return 0
 
-    if args.command == "memory" and args.memory_command == "status":
-        db.init_schema()
-        project_ids = _resolve_project_scope_ids(args)
-        rows = get_memory_status(db, project_ids, data_source=args.data_source)
-        if args.format == "json":
-            print(json.dumps(rows))
-            return 0
-        print("project_id	eligible	scored	memory_updated_at	baseline_sample_size	baseline_markdown_path	baseline_updated_at")
-        for row in rows:
-            print(
-                f"{row['project_id']}	{row['eligible']}	{row['scored']}	"
-                f"{row.get('memory_updated_at') or ''}	{row.get('baseline_sample_size') or 0}	"
-                f"{row.get('baseline_markdown_path') or ''}	{row.get('baseline_updated_at') or ''}"
-            )
-        return 0
 
+def _cmd_memory_status(args: argparse.Namespace, db: Database, partial: PartialSettings) -> int:
+    db.init_schema()
+    project_ids = _resolve_project_scope_ids(args)
+    rows = get_memory_status(db, project_ids, data_source=args.data_source)
+    if args.format == "json":
+        _print_json(rows)
+        return 0
+    _write_rows(
+        "project_id\teligible\tscored\tmemory_updated_at\tbaseline_sample_size\tbaseline_markdown_path\tbaseline_updated_at",
+        (
+            f"{row['project_id']}\t{row['eligible']}\t{row['scored']}\t"
+            f"{row.get('memory_updated_at') or ''}\t{row.get('baseline_sample_size') or 0}\t"
+            f"{row.get('baseline_markdown_path') or ''}\t{row.get('baseline_updated_at') or ''}"
+            for row in rows
+        ),
+    )
+    return 0
 
 
-    if args.command == "memory" and args.memory_command == "export":
-        db.init_schema()
-        project_ids: list[int] | None = None
-        if getattr(args, "project_id", None) or getattr(args, "group_id", None) or getattr(args, "all_projects", False):
-            project_ids = _resolve_project_scope_ids(args)
-        base_stem = _resolve_export_stem(args).replace("mr_classification", "mr_memory")
-        outputs: list[str] = []
+def _cmd_memory_export(args: argparse.Namespace, db: Database, partial: PartialSettings) -> int:
+    db.init_schema()
+    project_ids: list[int] | None = None
+    if getattr(args, "project_id", None) or getattr(args, "group_id", None) or getattr(args, "all_projects", False):
+        project_ids = _resolve_project_scope_ids(args)
+    base_stem = _resolve_export_stem(args).replace("mr_classification", "mr_memory")
+    outputs: list[Path] = []
+    with db.session():
         if args.format in ("csv", "both"):
-            outputs.append(str(export_memory_csv(db, out_dir=args.out_dir, project_ids=project_ids, filename_stem=base_stem)))
+            outputs.append(export_memory_csv(db, out_dir=args.out_dir, project_ids=project_ids, filename_stem=base_stem))
         if args.format in ("jsonl", "both"):
-            outputs.append(str(export_memory_jsonl(db, out_dir=args.out_dir, project_ids=project_ids, filename_stem=base_stem)))
-        print("Memory exported:\n" + "\n".join(outputs))
-        return 0
+            outputs.append(export_memory_jsonl(db, out_dir=args.out_dir, project_ids=project_ids, filename_stem=base_stem))
+    print("Memory exported:\n" + "\n".join(map(os.fspath, outputs)))
+    return 0
 
-    if args.command == "memory" and args.memory_command == "materialize":
-        db.init_schema()
-        project_ids = _resolve_project_scope_ids(args)
-        print(f"Selected projects ({len(project_ids)}): {project_ids}")
-        total_baseline_written = 0
-        total_runtime_eligible = 0
-        total_runtime_written = 0
-        total_runtime_skipped = 0
-        for project_id in project_ids:
-            result = materialize_project_markdown_from_db(
-                db,
-                project_id,
-                MaterializeOptions(
-                    output_root=args.output_root,
-                    data_source=args.data_source,
-                    compose=args.compose,
-                    only_missing=args.only_missing and not args.force,
-                    force=args.force,
-                    mr_limit=args.mr_limit,
-                ),
-            )
-            total_baseline_written += int(result["baseline_written"])
-            total_runtime_eligible += int(result["runtime_eligible"])
-            total_runtime_written += int(result["runtime_written"])
-            total_runtime_skipped += int(result["runtime_skipped"])
-            print(
+
+_MATERIALIZE_TOTAL_KEYS = ("baseline_written", "runtime_eligible", "runtime_written", "runtime_skipped")
+
+
+def _cmd_memory_materialize(args: argparse.Namespace, db: Database, partial: PartialSettings) -> int:
+    db.init_schema()
+    project_ids = _resolve_project_scope_ids(args)
+    print(f"Selected projects ({len(project_ids)}): {project_ids}")
+    totals: Counter[str] = Counter()
+    opts = MaterializeOptions(
+        output_root=args.output_root,
+        data_source=args.data_source,
+        compose=args.compose,
+        only_missing=args.only_missing and not args.force,
+        force=args.force,
+        mr_limit=args.mr_limit,
+    )
+    results = _map_projects(
+        lambda project_id: materialize_project_markdown_from_db(db, project_id, opts),
+        project_ids,
+        _resolve_project_concurrency(args),
+    )
+    lines: list[str] = []
+    # Sequential runs share one connection; pool workers open their own (sessions are per thread).
+    with db.session():
+        for project_id, result in results:
+            totals.update({key: result[key] for key in _MATERIALIZE_TOTAL_KEYS})
+            lines.append(
                 f"[project {project_id}] Materialize complete: "
                 f"baseline_written={result['baseline_written']} "
                 f"runtime_eligible={result['runtime_eligible']} "
                 f"runtime_written={result['runtime_written']} "
                 f"runtime_skipped={result['runtime_skipped']}"
             )
-        print(
-            f"Materialize total: baseline_written={total_baseline_written} "
-            f"runtime_eligible={total_runtime_eligible} "
-            f"runtime_written={total_runtime_written} "
-            f"runtime_skipped={total_runtime_skipped}"
+    lines.append(
+        f"Materialize total: baseline_written={totals['baseline_written']} "
+        f"runtime_eligible={totals['runtime_eligible']} "
+        f"runtime_written={totals['runtime_written']} "
+        f"runtime_skipped={totals['runtime_skipped']}"
+    )
+    sys.stdout.write("\n".join(lines) + "\n")
+    return 0
+
+
+def _cmd_cleanup(args: argparse.Namespace, db: Database, partial: PartialSettings) -> int:
+    if args.artifacts:
+        return _cleanup_artifacts(target=args.target, yes=args.yes)
+    db.init_schema()
+    with db.connect() as conn:
+        deleted = db.delete_merge_requests_by_source(
+            conn,
+            data_source=args.data_source,
+            project_ids=args.project_id,
         )
-        return 0
+    if not args.project_id:
+        scope = "all projects"
+    elif len(args.project_id) == 1:
+        scope = f"project {args.project_id[0]}"
+    else:
+        scope = f"projects {','.join(str(pid) for pid in args.project_id)}"
+    print(f"Deleted {deleted} merge requests for data_source={args.data_source} in {scope}")
+    return 0
 
-    if args.command == "cleanup":
-        if args.artifacts:
-            return _cleanup_artifacts(target=args.target, yes=args.yes)
-        db.init_schema()
-        with db.connect() as conn:
-            deleted = db.delete_merge_requests_by_source(
-                conn,
-                data_source=args.data_source,
-                project_id=args.project_id,
-            )
-        scope = f"project {args.project_id}" if args.project_id is not None else "all projects"
-        print(f"Deleted {deleted} merge requests for data_source={args.data_source} in {scope}")
+
+CommandHandler = Callable[[argparse.Namespace, Database, PartialSettings], int]
+
+COMMANDS: dict[str, CommandHandler] = {
+    "init-db": _cmd_init_db,
+    "classify": _cmd_classify,
+    "reclassify": _cmd_reclassify,
+    "mr-context": _cmd_mr_context,
+    "export": _cmd_export,
+    "seed": _cmd_seed,
+    "list-projects": _cmd_list_projects,
+    "view": _cmd_view,
+    "cleanup": _cmd_cleanup,
+}
+
+# Commands with a nested subparser: command -> (subcommand dest, subcommand -> handler).
+SUBCOMMANDS: dict[str, tuple[str, dict[str, CommandHandler]]] = {
+    "sync": ("sync_command", {"backfill": _cmd_sync, "refresh": _cmd_sync}),
+    "audit": ("audit_command", {"sample": _cmd_audit_sample}),
+    "demo": ("demo_command", {"seed": _cmd_seed}),
+    "batch": ("batch_command", {"run": _cmd_batch_run}),
+    "projects": (
+        "projects_command",
+        {
+            "list": _cmd_projects_list,
+            "count": _cmd_projects_count,
+        },
+    ),
+    "enrich": (
+        "enrich_command",
+        {
+            "qodo-threshold": _cmd_enrich_qodo_threshold,
+            "qodo": _cmd_enrich_qodo,
+            "status": _cmd_enrich_status,
+        },
+    ),
+    "memory": (
+        "memory_command",
+        {
+            "baseline-build": _cmd_memory_baseline_build,
+            "mr-build": _cmd_memory_mr_build,
+            "status": _cmd_memory_status,
+            "export": _cmd_memory_export,
+            "materialize": _cmd_memory_materialize,
+        },
+    ),
+}
+
+
+def _build_dispatch() -> dict[tuple[str, str | None], CommandHandler]:
+    dispatch: dict[tuple[str, str | None], CommandHandler] = {(command, None): h for command, h in COMMANDS.items()}
+    for command, (_, handlers) in SUBCOMMANDS.items():
+        for subcommand, handler in handlers.items():
+            dispatch[(command, subcommand)] = handler
+    return dispatch
+
+
+# Flat (command, subcommand) -> handler table, built once from the declarative tables above.
+_DISPATCH = _build_dispatch()
+
+
+def _resolve_handler(args: argparse.Namespace) -> CommandHandler | None:
+    dest = SUBCOMMANDS[args.command][0] if args.command in SUBCOMMANDS else None
+    return _DISPATCH.get((args.command, getattr(args, dest, None) if dest else None))
+
+
+def _cache_dir() -> Path:
+    return Path(os.getenv("PRTOOL_CACHE_DIR") or Path.home() / ".cache" / "prtool")
+
+
+def _cached_top_level_help() -> str:
+    # Top-level help needs every subparser; cache the rendered text keyed on what can change it.
+    key = "|".join(
+        [
+            CLASSIFIER_VERSION,
+            str(os.stat(__file__).st_mtime_ns),
+            str(shutil.get_terminal_size().columns),
+            str(sys.stdout.isatty()),
+        ]
+    )
+    path = _cache_dir() / "help.txt"
+    try:
+        header, _, body = path.read_text(encoding="utf-8").partition("\n")
+        if header == key:
+            return body
+    except OSError:
+        pass
+    body = build_parser().format_help()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"{key}\n{body}", encoding="utf-8")
+    except OSError:
+        pass
+    return body
+
+
+def main(argv: list[str] | None = None) -> int:
+    _INVOCATION_CACHE.clear()
+    clear_settings_cache()
+    load_dotenv()
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv in (["--help"], ["-h"]):
+        sys.stdout.write(_cached_top_level_help())
         return 0
+    parser = build_parser(argv)
+    args = parser.parse_args(argv)
+
+    partial = load_partial_settings()
+    db = Database(partial.db_path)
+
+    handler = _resolve_handler(args)
+    if handler is not None:
+        return handler(args, db, partial)
 
     parser.print_help(sys.stderr)
     return 1
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
+from typing import Iterable, TypeVar
 
 
-DEFAULT_INFRA_KEYWORDS = [
+_T = TypeVar("_T", int, str)
+
+DEFAULT_INFRA_KEYWORDS = (
     "terraform",
     "k8s",
     "kubernetes",
@@ -21,10 +26,15 @@ DEFAULT_INFRA_KEYWORDS = [
     "grafana",
     "sre",
     "infra",
-]
+)
+
+
+def _compile_ticket_patterns(patterns: tuple[str, ...]) -> tuple[re.Pattern[str], ...]:
+    # Compiled separately: each regex may carry its own inline flags, and each counts its own matches.
+    return tuple(re.compile(p, flags=re.IGNORECASE) for p in patterns)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Settings:
     gitlab_base_url: str
     gitlab_token: str
@@ -33,29 +43,45 @@ class Settings:
     max_retries: int
     backoff_ms: int
     request_timeout: int
-    infra_ticket_regex: list[str]
-    infra_label_allowlist: list[str]
-    infra_keyword_list: list[str]
+    infra_ticket_regex: tuple[str, ...]
+    infra_label_allowlist: frozenset[str]
+    infra_keyword_list: tuple[str, ...]
     infra_strong_threshold: float
     infra_weak_threshold: float
     classification_needs_review_threshold: float = 0.75
+    infra_ticket_patterns: tuple[re.Pattern[str], ...] = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self) -> None:
+        # Compiled once per settings object; the allowlist is only ever used for membership checks.
+        object.__setattr__(self, "infra_ticket_regex", tuple(self.infra_ticket_regex))
+        object.__setattr__(self, "infra_keyword_list", tuple(self.infra_keyword_list))
+        object.__setattr__(self, "infra_label_allowlist", frozenset(self.infra_label_allowlist))
+        object.__setattr__(self, "infra_ticket_patterns", _compile_ticket_patterns(self.infra_ticket_regex))
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class PartialSettings:
     db_path: str
-    infra_ticket_regex: list[str]
-    infra_label_allowlist: list[str]
-    infra_keyword_list: list[str]
+    infra_ticket_regex: tuple[str, ...]
+    infra_label_allowlist: frozenset[str]
+    infra_keyword_list: tuple[str, ...]
     infra_strong_threshold: float
     infra_weak_threshold: float
     classification_needs_review_threshold: float = 0.75
+    infra_ticket_patterns: tuple[re.Pattern[str], ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # Compiled once per settings object; the allowlist is only ever used for membership checks.
+        object.__setattr__(self, "infra_ticket_regex", tuple(self.infra_ticket_regex))
+        object.__setattr__(self, "infra_keyword_list", tuple(self.infra_keyword_list))
+        object.__setattr__(self, "infra_label_allowlist", frozenset(self.infra_label_allowlist))
+        object.__setattr__(self, "infra_ticket_patterns", _compile_ticket_patterns(self.infra_ticket_regex))
 
 
-def _split_csv(value: str | None, default: list[str]) -> list[str]:
+def _split_csv(value: str | None, default: tuple[str, ...]) -> tuple[str, ...]:
     if not value:
         return default
-    return [v.strip() for v in value.split(",") if v.strip()]
+    return tuple(filter(None, map(str.strip, value.split(","))))
 
 
 def load_dotenv(path: str | None = None) -> None:
@@ -74,16 +100,23 @@ def load_dotenv(path: str | None = None) -> None:
             os.environ[key] = value
 
 
+def _sorted_unique(values: Iterable[_T]) -> list[_T]:
+    # dict.fromkeys dedupes in one pass; the in-place sort is a no-op walk for already-ordered input.
+    unique = list(dict.fromkeys(values))
+    unique.sort()
+    return unique
+
+
 def resolve_project_ids(project_id_overrides: list[int] | None = None) -> list[int]:
     if project_id_overrides:
-        return sorted(set(project_id_overrides))
+        return _sorted_unique(project_id_overrides)
 
     env_many = os.getenv("GITLAB_PROJECT_IDS")
     if env_many:
-        values = [v.strip() for v in env_many.split(",") if v.strip()]
+        values = _split_csv(env_many, ())
         if not values:
             raise ValueError("GITLAB_PROJECT_IDS is set but empty")
-        return sorted(set(int(v) for v in values))
+        return _sorted_unique(map(int, values))
 
     env_one = os.getenv("GITLAB_PROJECT_ID")
     if env_one:
@@ -94,14 +127,14 @@ def resolve_project_ids(project_id_overrides: list[int] | None = None) -> list[i
 
 def resolve_group_ids(group_id_overrides: list[str] | None = None) -> list[str]:
     if group_id_overrides:
-        return sorted(set(g.strip() for g in group_id_overrides if g.strip()))
+        return _sorted_unique(filter(None, map(str.strip, group_id_overrides)))
 
     env_many = os.getenv("GITLAB_GROUP_IDS")
     if env_many:
-        values = [v.strip() for v in env_many.split(",") if v.strip()]
+        values = _split_csv(env_many, ())
         if not values:
             raise ValueError("GITLAB_GROUP_IDS is set but empty")
-        return sorted(set(values))
+        return _sorted_unique(values)
 
     env_one = os.getenv("GITLAB_GROUP_ID")
     if env_one:
@@ -110,18 +143,20 @@ def resolve_group_ids(group_id_overrides: list[str] | None = None) -> list[str]:
     return []
 
 
+@lru_cache(maxsize=1)
 def load_partial_settings() -> PartialSettings:
     return PartialSettings(
         db_path=os.getenv("DB_PATH", "./pr_analysis.db"),
-        infra_ticket_regex=_split_csv(os.getenv("INFRA_TICKET_REGEX"), [r"INFRA-\d+", r"OPS-\d+"]),
-        infra_label_allowlist=[s.lower() for s in _split_csv(os.getenv("INFRA_LABEL_ALLOWLIST"), ["infra", "platform", "devops", "sre"])],
-        infra_keyword_list=[s.lower() for s in _split_csv(os.getenv("INFRA_KEYWORD_LIST"), DEFAULT_INFRA_KEYWORDS)],
+        infra_ticket_regex=_split_csv(os.getenv("INFRA_TICKET_REGEX"), (r"INFRA-\d+", r"OPS-\d+")),
+        infra_label_allowlist=frozenset(s.lower() for s in _split_csv(os.getenv("INFRA_LABEL_ALLOWLIST"), ("infra", "platform", "devops", "sre"))),
+        infra_keyword_list=tuple(s.lower() for s in _split_csv(os.getenv("INFRA_KEYWORD_LIST"), DEFAULT_INFRA_KEYWORDS)),
         infra_strong_threshold=float(os.getenv("INFRA_STRONG_THRESHOLD", "4.0")),
         infra_weak_threshold=float(os.getenv("INFRA_WEAK_THRESHOLD", "1.5")),
         classification_needs_review_threshold=float(os.getenv("CLASSIFICATION_NEEDS_REVIEW_THRESHOLD", "0.75")),
     )
 
 
+@lru_cache(maxsize=1)
 def load_settings() -> Settings:
     partial = load_partial_settings()
     base_url = os.getenv("GITLAB_BASE_URL")
@@ -147,3 +182,9 @@ def load_settings() -> Settings:
         infra_weak_threshold=partial.infra_weak_threshold,
         classification_needs_review_threshold=partial.classification_needs_review_threshold,
     )
+
+
+def clear_settings_cache() -> None:
+    # Settings are memoized per process; the CLI clears them per invocation so env/.env changes apply.
+    load_partial_settings.cache_clear()
+    load_settings.cache_clear()
@@ -2,10 +2,29 @@ from __future__ import annotations
 
 import json
 import sqlite3
+import threading
 from contextlib import contextmanager
 from pathlib import Path
 from typing import Any, Iterator
 
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None
+
+# Bump whenever SCHEMA_SQL or _migrate_schema changes so existing databases re-run them.
+SCHEMA_VERSION = 7
+
+
+def _json_text(value: Any) -> str:
+    # Every upsert serialises several JSON columns per row; orjson keeps that off the write path.
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            pass
+    return json.dumps(value, separators=(",", ":"))
+
 
 SCHEMA_SQL = """
 PRAGMA foreign_keys = ON;
@@ -27,6 +46,14 @@ CREATE TABLE IF NOT EXISTS merge_requests (
   source_branch TEXT,
   target_branch TEXT,
   data_source TEXT NOT NULL DEFAULT 'production',
+  description_empty INTEGER GENERATED ALWAYS AS (CASE WHEN TRIM(COALESCE(description, '')) = '' THEN 1 ELSE 0 END) VIRTUAL,
+  -- Copies of the 1:1 discussion/approval/pipeline summaries so MR reads need no joins.
+  thread_count INTEGER NOT NULL DEFAULT 0,
+  note_count INTEGER NOT NULL DEFAULT 0,
+  unresolved_count INTEGER NOT NULL DEFAULT 0,
+  approvals_required INTEGER NOT NULL DEFAULT 0,
+  approvals_given INTEGER NOT NULL DEFAULT 0,
+  pipeline_failed_count INTEGER NOT NULL DEFAULT 0,
   UNIQUE(project_id, iid)
 );
 
@@ -202,6 +229,7 @@ CREATE TABLE IF NOT EXISTS mr_qodo_artifacts (
   prompt_leak_markers_json TEXT,
   structured_payload_json TEXT,
   updated_at TEXT NOT NULL,
+  tool_rank INTEGER GENERATED ALWAYS AS (CASE tool WHEN 'describe' THEN 1 WHEN 'review' THEN 2 WHEN 'improve' THEN 3 ELSE 4 END) VIRTUAL,
   PRIMARY KEY (mr_id, tool),
   FOREIGN KEY(mr_id) REFERENCES merge_requests(id) ON DELETE CASCADE
 );
@@ -258,7 +286,7 @@ CREATE TABLE IF NOT EXISTS memory_runs (
   error_excerpt TEXT
 );
 
-CREATE INDEX IF NOT EXISTS idx_mrs_project_iid ON merge_requests(project_id, iid);
+CREATE INDEX IF NOT EXISTS idx_mrs_project_iid_updated ON merge_requests(project_id, iid, updated_at);
 CREATE INDEX IF NOT EXISTS idx_mrs_updated_at ON merge_requests(updated_at);
 CREATE INDEX IF NOT EXISTS idx_commits_mr_id ON mr_commits(mr_id);
 CREATE INDEX IF NOT EXISTS idx_files_mr_id ON mr_files(mr_id);
@@ -268,6 +296,258 @@ CREATE INDEX IF NOT EXISTS idx_qodo_artifacts_project_tool ON mr_qodo_artifacts(
 CREATE INDEX IF NOT EXISTS idx_memory_runtime_project_iid ON mr_memory_runtime(project_id, mr_iid);
 CREATE INDEX IF NOT EXISTS idx_memory_runtime_depth_risk ON mr_memory_runtime(review_depth_required, regression_probability DESC);
 CREATE INDEX IF NOT EXISTS idx_memory_runtime_updated ON mr_memory_runtime(updated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_memory_runtime_project_updated ON mr_memory_runtime(project_id, updated_at DESC, mr_iid);
+"""
+
+
+# (table, column, declaration) for columns added after a table first shipped; applied in order when missing.
+_COLUMN_MIGRATIONS: tuple[tuple[str, str, str], ...] = (
+    ("merge_requests", "data_source", "TEXT NOT NULL DEFAULT 'production'"),
+    (
+        "merge_requests",
+        "description_empty",
+        "INTEGER GENERATED ALWAYS AS (CASE WHEN TRIM(COALESCE(description, '')) = '' THEN 1 ELSE 0 END) VIRTUAL",
+    ),
+    ("merge_requests", "thread_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("merge_requests", "note_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("merge_requests", "unresolved_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("merge_requests", "approvals_required", "INTEGER NOT NULL DEFAULT 0"),
+    ("merge_requests", "approvals_given", "INTEGER NOT NULL DEFAULT 0"),
+    ("merge_requests", "pipeline_failed_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("mr_classifications", "capability_tags_json", "TEXT NOT NULL DEFAULT '[]'"),
+    ("mr_classifications", "risk_tags_json", "TEXT NOT NULL DEFAULT '[]'"),
+    ("mr_classifications", "classification_confidence", "REAL NOT NULL DEFAULT 0.5"),
+    ("mr_classifications", "confidence_band", "TEXT NOT NULL DEFAULT 'medium'"),
+    ("mr_classifications", "needs_review", "INTEGER NOT NULL DEFAULT 0"),
+    ("mr_classifications", "classifier_version", "TEXT NOT NULL DEFAULT 'v1.0'"),
+    ("mr_qodo_describe", "raw_output_path", "TEXT"),
+    ("mr_qodo_describe", "parser_version", "TEXT"),
+    ("mr_qodo_describe", "quality_status", "TEXT"),
+    ("mr_qodo_describe", "reviewer_summary", "TEXT"),
+    ("mr_qodo_describe", "reviewer_summary_status", "TEXT NOT NULL DEFAULT 'missing'"),
+    ("mr_qodo_describe", "context_quality_score", "REAL NOT NULL DEFAULT 0.0"),
+    ("mr_qodo_describe", "prompt_leak_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("mr_qodo_describe", "prompt_leak_markers_json", "TEXT"),
+    ("mr_qodo_describe", "structured_payload_json", "TEXT"),
+    ("mr_qodo_artifacts", "reviewer_summary", "TEXT"),
+    ("mr_qodo_artifacts", "reviewer_summary_status", "TEXT NOT NULL DEFAULT 'missing'"),
+    ("mr_qodo_artifacts", "context_quality_score", "REAL NOT NULL DEFAULT 0.0"),
+    (
+        "mr_qodo_artifacts",
+        "tool_rank",
+        "INTEGER GENERATED ALWAYS AS ("
+        "CASE tool WHEN 'describe' THEN 1 WHEN 'review' THEN 2 WHEN 'improve' THEN 3 ELSE 4 END"
+        ") VIRTUAL",
+    ),
+    ("mr_qodo_runs", "tool", "TEXT NOT NULL DEFAULT 'describe'"),
+    ("mr_memory_runtime", "memory_score_version", "TEXT NOT NULL DEFAULT 'memory-v1'"),
+    ("mr_memory_runtime", "mr_achieved_outcome", "TEXT"),
+    ("mr_memory_runtime", "mr_achieved_outcome_bullets_json", "TEXT NOT NULL DEFAULT '[]'"),
+    ("mr_memory_runtime", "outcome_source", "TEXT NOT NULL DEFAULT 'heuristic'"),
+    ("mr_memory_runtime", "outcome_mode", "TEXT NOT NULL DEFAULT 'template'"),
+    ("mr_memory_runtime", "outcome_quality_score", "REAL NOT NULL DEFAULT 0.0"),
+    ("mr_memory_runtime", "topic_labels_json", "TEXT NOT NULL DEFAULT '[]'"),
+    ("mr_memory_runtime", "similarity_strategy", "TEXT NOT NULL DEFAULT 'lexical'"),
+)
+
+
+_MR_UPSERT_SQL = """
+INSERT INTO merge_requests (
+  id, project_id, iid, title, description, state, author_username, labels_json,
+  web_url, created_at, updated_at, merged_at, closed_at, source_branch, target_branch, data_source
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(project_id, iid) DO UPDATE SET
+  id=excluded.id,
+  title=excluded.title,
+  description=excluded.description,
+  state=excluded.state,
+  author_username=excluded.author_username,
+  labels_json=excluded.labels_json,
+  web_url=excluded.web_url,
+  created_at=excluded.created_at,
+  updated_at=excluded.updated_at,
+  merged_at=excluded.merged_at,
+  closed_at=excluded.closed_at,
+  source_branch=excluded.source_branch,
+  target_branch=excluded.target_branch,
+  data_source=excluded.data_source
+"""
+
+
+def _mr_upsert_params(mr: dict[str, Any]) -> tuple[Any, ...]:
+    return (
+        mr["id"],
+        mr["project_id"],
+        mr["iid"],
+        mr.get("title", ""),
+        mr.get("description"),
+        mr.get("state"),
+        mr.get("author_username"),
+        _json_text(mr.get("labels", [])),
+        mr.get("web_url"),
+        mr.get("created_at"),
+        mr.get("updated_at"),
+        mr.get("merged_at"),
+        mr.get("closed_at"),
+        mr.get("source_branch"),
+        mr.get("target_branch"),
+        mr.get("data_source", "production"),
+    )
+
+
+def _commit_rows(mr_id: int, commits: list[dict[str, Any]]) -> list[tuple[Any, ...]]:
+    return [
+        (mr_id, c.get("id") or c.get("sha"), c.get("title"), c.get("authored_date"))
+        for c in commits
+        if c.get("id") or c.get("sha")
+    ]
+
+
+def _file_rows(mr_id: int, files: list[dict[str, Any]]) -> list[tuple[Any, ...]]:
+    return [
+        (
+            mr_id,
+            f.get("new_path") or f.get("old_path") or "unknown",
+            int(f.get("additions", 0)),
+            int(f.get("deletions", 0)),
+        )
+        for f in files
+    ]
+
+
+# Ingest/classify write statements; one constant each so the per-connection statement cache always hits.
+_COMMIT_UPSERT_SQL = """
+INSERT INTO mr_commits (mr_id, commit_sha, title, authored_date)
+VALUES (?, ?, ?, ?)
+ON CONFLICT(mr_id, commit_sha) DO UPDATE SET
+  title=excluded.title,
+  authored_date=excluded.authored_date
+WHERE title IS NOT excluded.title OR authored_date IS NOT excluded.authored_date
+"""
+
+
+_COMMIT_PRUNE_SQL = "DELETE FROM mr_commits WHERE mr_id = ? AND commit_sha NOT IN (SELECT value FROM json_each(?))"
+
+
+_FILE_UPSERT_SQL = """
+INSERT INTO mr_files (mr_id, path, additions, deletions)
+VALUES (?, ?, ?, ?)
+ON CONFLICT(mr_id, path) DO UPDATE SET
+  additions=excluded.additions,
+  deletions=excluded.deletions
+WHERE additions != excluded.additions OR deletions != excluded.deletions
+"""
+
+
+_FILE_PRUNE_SQL = "DELETE FROM mr_files WHERE mr_id = ? AND path NOT IN (SELECT value FROM json_each(?))"
+
+
+_DISCUSSIONS_UPSERT_SQL = """
+INSERT INTO mr_discussions (mr_id, thread_count, note_count, unresolved_count)
+VALUES (?, ?, ?, ?)
+ON CONFLICT(mr_id) DO UPDATE SET
+  thread_count=excluded.thread_count,
+  note_count=excluded.note_count,
+  unresolved_count=excluded.unresolved_count
+"""
+
+
+_MR_DISCUSSION_COUNTS_SQL = "UPDATE merge_requests SET thread_count = ?, note_count = ?, unresolved_count = ? WHERE id = ?"
+
+
+_APPROVALS_UPSERT_SQL = """
+INSERT INTO mr_approvals (mr_id, approvals_required, approvals_given)
+VALUES (?, ?, ?)
+ON CONFLICT(mr_id) DO UPDATE SET
+  approvals_required=excluded.approvals_required,
+  approvals_given=excluded.approvals_given
+"""
+
+
+_MR_APPROVAL_COUNTS_SQL = "UPDATE merge_requests SET approvals_required = ?, approvals_given = ? WHERE id = ?"
+
+
+_PIPELINES_UPSERT_SQL = """
+INSERT INTO mr_pipelines (mr_id, pipeline_count, failed_count, success_count, retry_count)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(mr_id) DO UPDATE SET
+  pipeline_count=excluded.pipeline_count,
+  failed_count=excluded.failed_count,
+  success_count=excluded.success_count,
+  retry_count=excluded.retry_count
+"""
+
+
+_MR_PIPELINE_COUNTS_SQL = "UPDATE merge_requests SET pipeline_failed_count = ? WHERE id = ?"
+
+
+_FEATURE_UPSERT_SQL = """
+INSERT INTO mr_features (
+  mr_id, files_changed, additions, deletions, churn, commit_count,
+  review_comment_count, review_thread_count, unresolved_thread_count,
+  pipeline_failed_count, infra_ticket_match_count, infra_keyword_score,
+  infra_label_match_count, infra_signal_score, infra_signal_level, feature_json
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(mr_id) DO UPDATE SET
+  files_changed=excluded.files_changed,
+  additions=excluded.additions,
+  deletions=excluded.deletions,
+  churn=excluded.churn,
+  commit_count=excluded.commit_count,
+  review_comment_count=excluded.review_comment_count,
+  review_thread_count=excluded.review_thread_count,
+  unresolved_thread_count=excluded.unresolved_thread_count,
+  pipeline_failed_count=excluded.pipeline_failed_count,
+  infra_ticket_match_count=excluded.infra_ticket_match_count,
+  infra_keyword_score=excluded.infra_keyword_score,
+  infra_label_match_count=excluded.infra_label_match_count,
+  infra_signal_score=excluded.infra_signal_score,
+  infra_signal_level=excluded.infra_signal_level,
+  feature_json=excluded.feature_json
+"""
+
+
+_CLASSIFICATION_UPSERT_SQL = """
+INSERT INTO mr_classifications (
+  mr_id, base_type, final_type, is_infra_related, infra_override_applied,
+  complexity_level, complexity_score, capability_tags_json, risk_tags_json,
+  classification_confidence, confidence_band, needs_review, classifier_version, classification_rationale_json, classified_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(mr_id) DO UPDATE SET
+  base_type=excluded.base_type,
+  final_type=excluded.final_type,
+  is_infra_related=excluded.is_infra_related,
+  infra_override_applied=excluded.infra_override_applied,
+  complexity_level=excluded.complexity_level,
+  complexity_score=excluded.complexity_score,
+  capability_tags_json=excluded.capability_tags_json,
+  risk_tags_json=excluded.risk_tags_json,
+  classification_confidence=excluded.classification_confidence,
+  confidence_band=excluded.confidence_band,
+  needs_review=excluded.needs_review,
+  classifier_version=excluded.classifier_version,
+  classification_rationale_json=excluded.classification_rationale_json,
+  classified_at=excluded.classified_at
+"""
+
+
+_RAW_SNAPSHOT_UPSERT_SQL = """
+INSERT INTO raw_snapshots (project_id, entity_type, entity_key, payload_json, fetched_at)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(project_id, entity_type, entity_key) DO UPDATE SET
+  payload_json=excluded.payload_json,
+  fetched_at=excluded.fetched_at
+"""
+
+
+# Per-connection tuning; WAL itself is persistent in the file, so it is switched on once per Database.
+_CONNECTION_PRAGMAS = """
+PRAGMA synchronous = NORMAL;
+PRAGMA busy_timeout = 5000;
+PRAGMA cache_size = -64000;
+PRAGMA temp_store = MEMORY;
+PRAGMA mmap_size = 268435456;
+PRAGMA foreign_keys = ON;
 """
 
 
@@ -275,27 +555,101 @@ class Database:
     def __init__(self, path: str) -> None:
         self.path = Path(path)
         self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._schema_ready = False
+        self._wal_ready = False
+
+    @contextmanager
+    def session(self) -> Iterator[sqlite3.Connection]:
+        # Pin one connection for this thread; nested connect() calls reuse it instead of reopening.
+        # Multi-project write commands run under a session so each project does not reopen the file.
+        pinned = getattr(self._local, "conn", None)
+        if pinned is not None:
+            yield pinned
+            return
+        with self.connect() as conn:
+            # A session outlives many statements, so give it a larger page cache and mmap window.
+            conn.execute("PRAGMA cache_size = -262144")
+            conn.execute("PRAGMA mmap_size = 1073741824")
+            self._local.conn = conn
+            try:
+                yield conn
+            finally:
+                self._local.conn = None
 
     @contextmanager
     def connect(self) -> Iterator[sqlite3.Connection]:
-        conn = sqlite3.connect(self.path)
+        pinned = getattr(self._local, "conn", None)
+        if pinned is not None:
+            try:
+                yield pinned
+            except BaseException:
+                pinned.rollback()
+                raise
+            pinned.commit()
+            return
+        # IMMEDIATE takes the write lock when the implicit transaction opens, so it never upgrades mid-way.
+        conn = sqlite3.connect(self.path, cached_statements=256, isolation_level="IMMEDIATE")
         conn.row_factory = sqlite3.Row
         try:
-            conn.execute("PRAGMA foreign_keys = ON")
+            conn.executescript(_CONNECTION_PRAGMAS)
+            if not self._wal_ready:
+                conn.execute("PRAGMA journal_mode = WAL")
+                self._wal_ready = True
             yield conn
             conn.commit()
+        finally:
+            try:
+                # Keep planner stats fresh as tables grow unevenly; analysis_limit bounds the work.
+                conn.execute("PRAGMA analysis_limit = 1000")
+                conn.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
+            conn.close()
+
+    @contextmanager
+    def connect_read(self) -> Iterator[sqlite3.Connection]:
+        # Read-only connection for pure reads; under WAL it neither blocks nor waits on an ingest's writer.
+        pinned = getattr(self._local, "conn", None)
+        if pinned is not None:
+            yield pinned
+            return
+        if str(self.path) == ":memory:":
+            with self.connect() as conn:
+                yield conn
+            return
+        conn = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.executescript(_CONNECTION_PRAGMAS)
+            conn.execute("PRAGMA query_only = ON")
+            yield conn
         finally:
             conn.close()
 
     def init_schema(self) -> None:
+        # Commands and the enrich/memory helpers they call each ensure the schema; only the first call does work.
+        if self._schema_ready:
+            return
         with self.connect() as conn:
-            conn.executescript(SCHEMA_SQL)
-            self._migrate_schema(conn)
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                conn.executescript(SCHEMA_SQL)
+                self._migrate_schema(conn)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._schema_ready = True
 
     def _migrate_schema(self, conn: sqlite3.Connection) -> None:
-        columns = {r["name"] for r in conn.execute("PRAGMA table_info(merge_requests)").fetchall()}
-        if "data_source" not in columns:
-            conn.execute("ALTER TABLE merge_requests ADD COLUMN data_source TEXT NOT NULL DEFAULT 'production'")
+        # One table_xinfo read per table (xinfo also lists generated columns), then only the missing ALTERs.
+        existing: dict[str, set[str]] = {}
+        added: set[tuple[str, str]] = set()
+        for table, column, decl in _COLUMN_MIGRATIONS:
+            if table not in existing:
+                existing[table] = {r["name"] for r in conn.execute(f"PRAGMA table_xinfo({table})").fetchall()}
+            if existing[table] and column not in existing[table]:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+                added.add((table, column))
+
+        if ("merge_requests", "data_source") in added:
             # Existing seeded demo data uses example.local URLs; mark as test for filtering.
             conn.execute(
                 """
@@ -304,67 +658,44 @@ class Database:
                 WHERE web_url LIKE 'https://example.local/%'
                 """
             )
-
-        class_cols = {r["name"] for r in conn.execute("PRAGMA table_info(mr_classifications)").fetchall()}
-        if "capability_tags_json" not in class_cols:
-            conn.execute("ALTER TABLE mr_classifications ADD COLUMN capability_tags_json TEXT NOT NULL DEFAULT '[]'")
-        if "risk_tags_json" not in class_cols:
-            conn.execute("ALTER TABLE mr_classifications ADD COLUMN risk_tags_json TEXT NOT NULL DEFAULT '[]'")
-        if "classification_confidence" not in class_cols:
-            conn.execute("ALTER TABLE mr_classifications ADD COLUMN classification_confidence REAL NOT NULL DEFAULT 0.5")
-        if "confidence_band" not in class_cols:
-            conn.execute("ALTER TABLE mr_classifications ADD COLUMN confidence_band TEXT NOT NULL DEFAULT 'medium'")
-        if "needs_review" not in class_cols:
-            conn.execute("ALTER TABLE mr_classifications ADD COLUMN needs_review INTEGER NOT NULL DEFAULT 0")
-        if "classifier_version" not in class_cols:
-            conn.execute("ALTER TABLE mr_classifications ADD COLUMN classifier_version TEXT NOT NULL DEFAULT 'v1.0'")
-
-        qodo_columns = {r["name"] for r in conn.execute("PRAGMA table_info(mr_qodo_describe)").fetchall()}
-        if "raw_output_path" not in qodo_columns:
-            conn.execute("ALTER TABLE mr_qodo_describe ADD COLUMN raw_output_path TEXT")
-        if "parser_version" not in qodo_columns:
-            conn.execute("ALTER TABLE mr_qodo_describe ADD COLUMN parser_version TEXT")
-        if "quality_status" not in qodo_columns:
-            conn.execute("ALTER TABLE mr_qodo_describe ADD COLUMN quality_status TEXT")
-        if "reviewer_summary" not in qodo_columns:
-            conn.execute("ALTER TABLE mr_qodo_describe ADD COLUMN reviewer_summary TEXT")
-        if "reviewer_summary_status" not in qodo_columns:
-            conn.execute("ALTER TABLE mr_qodo_describe ADD COLUMN reviewer_summary_status TEXT NOT NULL DEFAULT 'missing'")
-        if "context_quality_score" not in qodo_columns:
-            conn.execute("ALTER TABLE mr_qodo_describe ADD COLUMN context_quality_score REAL NOT NULL DEFAULT 0.0")
-        if "prompt_leak_count" not in qodo_columns:
-            conn.execute("ALTER TABLE mr_qodo_describe ADD COLUMN prompt_leak_count INTEGER NOT NULL DEFAULT 0")
-        if "prompt_leak_markers_json" not in qodo_columns:
-            conn.execute("ALTER TABLE mr_qodo_describe ADD COLUMN prompt_leak_markers_json TEXT")
-        if "structured_payload_json" not in qodo_columns:
-            conn.execute("ALTER TABLE mr_qodo_describe ADD COLUMN structured_payload_json TEXT")
-        qodo_artifact_columns = {r["name"] for r in conn.execute("PRAGMA table_info(mr_qodo_artifacts)").fetchall()}
-        if qodo_artifact_columns and "reviewer_summary" not in qodo_artifact_columns:
-            conn.execute("ALTER TABLE mr_qodo_artifacts ADD COLUMN reviewer_summary TEXT")
-        if qodo_artifact_columns and "reviewer_summary_status" not in qodo_artifact_columns:
-            conn.execute("ALTER TABLE mr_qodo_artifacts ADD COLUMN reviewer_summary_status TEXT NOT NULL DEFAULT 'missing'")
-        if qodo_artifact_columns and "context_quality_score" not in qodo_artifact_columns:
-            conn.execute("ALTER TABLE mr_qodo_artifacts ADD COLUMN context_quality_score REAL NOT NULL DEFAULT 0.0")
-        qodo_run_columns = {r["name"] for r in conn.execute("PRAGMA table_info(mr_qodo_runs)").fetchall()}
-        if "tool" not in qodo_run_columns:
-            conn.execute("ALTER TABLE mr_qodo_runs ADD COLUMN tool TEXT NOT NULL DEFAULT 'describe'")
-        memory_runtime_columns = {r["name"] for r in conn.execute("PRAGMA table_info(mr_memory_runtime)").fetchall()}
-        if memory_runtime_columns and "memory_score_version" not in memory_runtime_columns:
-            conn.execute("ALTER TABLE mr_memory_runtime ADD COLUMN memory_score_version TEXT NOT NULL DEFAULT 'memory-v1'")
-        if memory_runtime_columns and "mr_achieved_outcome" not in memory_runtime_columns:
-            conn.execute("ALTER TABLE mr_memory_runtime ADD COLUMN mr_achieved_outcome TEXT")
-        if memory_runtime_columns and "mr_achieved_outcome_bullets_json" not in memory_runtime_columns:
-            conn.execute("ALTER TABLE mr_memory_runtime ADD COLUMN mr_achieved_outcome_bullets_json TEXT NOT NULL DEFAULT '[]'")
-        if memory_runtime_columns and "outcome_source" not in memory_runtime_columns:
-            conn.execute("ALTER TABLE mr_memory_runtime ADD COLUMN outcome_source TEXT NOT NULL DEFAULT 'heuristic'")
-        if memory_runtime_columns and "outcome_mode" not in memory_runtime_columns:
-            conn.execute("ALTER TABLE mr_memory_runtime ADD COLUMN outcome_mode TEXT NOT NULL DEFAULT 'template'")
-        if memory_runtime_columns and "outcome_quality_score" not in memory_runtime_columns:
-            conn.execute("ALTER TABLE mr_memory_runtime ADD COLUMN outcome_quality_score REAL NOT NULL DEFAULT 0.0")
-        if memory_runtime_columns and "topic_labels_json" not in memory_runtime_columns:
-            conn.execute("ALTER TABLE mr_memory_runtime ADD COLUMN topic_labels_json TEXT NOT NULL DEFAULT '[]'")
-        if memory_runtime_columns and "similarity_strategy" not in memory_runtime_columns:
-            conn.execute("ALTER TABLE mr_memory_runtime ADD COLUMN similarity_strategy TEXT NOT NULL DEFAULT 'lexical'")
+        if ("merge_requests", "thread_count") in added:
+            # Backfill the denormalized summaries from the child tables they mirror.
+            conn.execute(
+                """
+                UPDATE merge_requests
+                SET (thread_count, note_count, unresolved_count) = (
+                  SELECT d.thread_count, d.note_count, d.unresolved_count FROM mr_discussions d WHERE d.mr_id = merge_requests.id
+                )
+                WHERE id IN (SELECT mr_id FROM mr_discussions)
+                """
+            )
+            conn.execute(
+                """
+                UPDATE merge_requests
+                SET (approvals_required, approvals_given) = (
+                  SELECT a.approvals_required, a.approvals_given FROM mr_approvals a WHERE a.mr_id = merge_requests.id
+                )
+                WHERE id IN (SELECT mr_id FROM mr_approvals)
+                """
+            )
+            conn.execute(
+                """
+                UPDATE merge_requests
+                SET pipeline_failed_count = (SELECT p.failed_count FROM mr_pipelines p WHERE p.mr_id = merge_requests.id)
+                WHERE id IN (SELECT mr_id FROM mr_pipelines)
+                """
+            )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_qodo_artifacts_mr_rank ON mr_qodo_artifacts(mr_id, tool_rank, updated_at DESC)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_mrs_desc_empty ON merge_requests(project_id, description_empty) "
+            "WHERE description_empty = 1"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_mrs_data_source ON merge_requests(data_source, project_id)")
+        # Superseded by the covering idx_mrs_project_iid_updated, which also serves DISTINCT project_id scans.
+        conn.execute("DROP INDEX IF EXISTS idx_mrs_project_iid")
+        conn.execute("DROP INDEX IF EXISTS idx_mrs_project_only")
 
         # Backfill legacy describe rows into tool-specific artifacts table for compatibility.
         conn.execute(
@@ -387,151 +718,55 @@ class Database:
         )
 
     def upsert_merge_request(self, conn: sqlite3.Connection, mr: dict[str, Any]) -> int:
-        conn.execute(
-            """
-            INSERT INTO merge_requests (
-              id, project_id, iid, title, description, state, author_username, labels_json,
-              web_url, created_at, updated_at, merged_at, closed_at, source_branch, target_branch, data_source
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(project_id, iid) DO UPDATE SET
-              id=excluded.id,
-              title=excluded.title,
-              description=excluded.description,
-              state=excluded.state,
-              author_username=excluded.author_username,
-              labels_json=excluded.labels_json,
-              web_url=excluded.web_url,
-              created_at=excluded.created_at,
-              updated_at=excluded.updated_at,
-              merged_at=excluded.merged_at,
-              closed_at=excluded.closed_at,
-              source_branch=excluded.source_branch,
-              target_branch=excluded.target_branch,
-              data_source=excluded.data_source
-            """,
-            (
-                mr["id"],
-                mr["project_id"],
-                mr["iid"],
-                mr.get("title", ""),
-                mr.get("description"),
-                mr.get("state"),
-                mr.get("author_username"),
-                json.dumps(mr.get("labels", [])),
-                mr.get("web_url"),
-                mr.get("created_at"),
-                mr.get("updated_at"),
-                mr.get("merged_at"),
-                mr.get("closed_at"),
-                mr.get("source_branch"),
-                mr.get("target_branch"),
-                mr.get("data_source", "production"),
-            ),
-        )
-        row = conn.execute(
-            "SELECT id FROM merge_requests WHERE project_id = ? AND iid = ?",
-            (mr["project_id"], mr["iid"]),
-        ).fetchone()
-        assert row is not None
-        return int(row["id"])
+        # The conflict branch writes id=excluded.id, so the stored id is always the one we passed in.
+        conn.execute(_MR_UPSERT_SQL, _mr_upsert_params(mr))
+        return int(mr["id"])
+
+    def upsert_merge_requests_bulk(self, conn: sqlite3.Connection, mrs: list[dict[str, Any]]) -> list[int]:
+        # GitLab supplies the primary key and the upsert writes id=excluded.id, so no read-back is needed.
+        conn.executemany(_MR_UPSERT_SQL, [_mr_upsert_params(mr) for mr in mrs])
+        return [int(mr["id"]) for mr in mrs]
 
     def replace_mr_commits(self, conn: sqlite3.Connection, mr_id: int, commits: list[dict[str, Any]]) -> None:
-        conn.execute("DELETE FROM mr_commits WHERE mr_id = ?", (mr_id,))
+        self.replace_mr_commits_bulk(conn, [(mr_id, commits)])
+
+    def replace_mr_commits_bulk(
+        self, conn: sqlite3.Connection, pairs: list[tuple[int, list[dict[str, Any]]]]
+    ) -> None:
+        # Upsert in place and only prune rows that disappeared, so an unchanged re-sync writes nothing.
+        rows_by_mr = [(int(mr_id), _commit_rows(int(mr_id), commits)) for mr_id, commits in pairs]
+        conn.executemany(_COMMIT_UPSERT_SQL, [row for _, rows in rows_by_mr for row in rows])
         conn.executemany(
-            """
-            INSERT INTO mr_commits (mr_id, commit_sha, title, authored_date)
-            VALUES (?, ?, ?, ?)
-            """,
-            [
-                (mr_id, c.get("id") or c.get("sha"), c.get("title"), c.get("authored_date"))
-                for c in commits
-                if c.get("id") or c.get("sha")
-            ],
+            _COMMIT_PRUNE_SQL,
+            [(mr_id, _json_text([row[1] for row in rows])) for mr_id, rows in rows_by_mr],
         )
 
     def replace_mr_files(self, conn: sqlite3.Connection, mr_id: int, files: list[dict[str, Any]]) -> None:
-        conn.execute("DELETE FROM mr_files WHERE mr_id = ?", (mr_id,))
-        conn.executemany(
-            """
-            INSERT INTO mr_files (mr_id, path, additions, deletions)
-            VALUES (?, ?, ?, ?)
-            """,
-            [
-                (
-                    mr_id,
-                    f.get("new_path") or f.get("old_path") or "unknown",
-                    int(f.get("additions", 0)),
-                    int(f.get("deletions", 0)),
-                )
-                for f in files
-            ],
-        )
+        self.replace_mr_files_bulk(conn, [(mr_id, files)])
+
+    def replace_mr_files_bulk(self, conn: sqlite3.Connection, pairs: list[tuple[int, list[dict[str, Any]]]]) -> None:
+        rows_by_mr = [(int(mr_id), _file_rows(int(mr_id), files)) for mr_id, files in pairs]
+        conn.executemany(_FILE_UPSERT_SQL, [row for _, rows in rows_by_mr for row in rows])
+        conn.executemany(_FILE_PRUNE_SQL, [(mr_id, _json_text([row[1] for row in rows])) for mr_id, rows in rows_by_mr])
 
     def upsert_discussions(self, conn: sqlite3.Connection, mr_id: int, d: dict[str, int]) -> None:
-        conn.execute(
-            """
-            INSERT INTO mr_discussions (mr_id, thread_count, note_count, unresolved_count)
-            VALUES (?, ?, ?, ?)
-            ON CONFLICT(mr_id) DO UPDATE SET
-              thread_count=excluded.thread_count,
-              note_count=excluded.note_count,
-              unresolved_count=excluded.unresolved_count
-            """,
-            (mr_id, d["thread_count"], d["note_count"], d["unresolved_count"]),
-        )
+        conn.execute(_DISCUSSIONS_UPSERT_SQL, (mr_id, d["thread_count"], d["note_count"], d["unresolved_count"]))
+        conn.execute(_MR_DISCUSSION_COUNTS_SQL, (d["thread_count"], d["note_count"], d["unresolved_count"], mr_id))
 
     def upsert_approvals(self, conn: sqlite3.Connection, mr_id: int, a: dict[str, int]) -> None:
-        conn.execute(
-            """
-            INSERT INTO mr_approvals (mr_id, approvals_required, approvals_given)
-            VALUES (?, ?, ?)
-            ON CONFLICT(mr_id) DO UPDATE SET
-              approvals_required=excluded.approvals_required,
-              approvals_given=excluded.approvals_given
-            """,
-            (mr_id, a["approvals_required"], a["approvals_given"]),
-        )
+        conn.execute(_APPROVALS_UPSERT_SQL, (mr_id, a["approvals_required"], a["approvals_given"]))
+        conn.execute(_MR_APPROVAL_COUNTS_SQL, (a["approvals_required"], a["approvals_given"], mr_id))
 
     def upsert_pipelines(self, conn: sqlite3.Connection, mr_id: int, p: dict[str, int]) -> None:
         conn.execute(
-            """
-            INSERT INTO mr_pipelines (mr_id, pipeline_count, failed_count, success_count, retry_count)
-            VALUES (?, ?, ?, ?, ?)
-            ON CONFLICT(mr_id) DO UPDATE SET
-              pipeline_count=excluded.pipeline_count,
-              failed_count=excluded.failed_count,
-              success_count=excluded.success_count,
-              retry_count=excluded.retry_count
-            """,
+            _PIPELINES_UPSERT_SQL,
             (mr_id, p["pipeline_count"], p["failed_count"], p["success_count"], p["retry_count"]),
         )
+        conn.execute(_MR_PIPELINE_COUNTS_SQL, (p["failed_count"], mr_id))
 
     def upsert_feature_row(self, conn: sqlite3.Connection, mr_id: int, features: dict[str, Any]) -> None:
         conn.execute(
-            """
-            INSERT INTO mr_features (
-              mr_id, files_changed, additions, deletions, churn, commit_count,
-              review_comment_count, review_thread_count, unresolved_thread_count,
-              pipeline_failed_count, infra_ticket_match_count, infra_keyword_score,
-              infra_label_match_count, infra_signal_score, infra_signal_level, feature_json
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(mr_id) DO UPDATE SET
-              files_changed=excluded.files_changed,
-              additions=excluded.additions,
-              deletions=excluded.deletions,
-              churn=excluded.churn,
-              commit_count=excluded.commit_count,
-              review_comment_count=excluded.review_comment_count,
-              review_thread_count=excluded.review_thread_count,
-              unresolved_thread_count=excluded.unresolved_thread_count,
-              pipeline_failed_count=excluded.pipeline_failed_count,
-              infra_ticket_match_count=excluded.infra_ticket_match_count,
-              infra_keyword_score=excluded.infra_keyword_score,
-              infra_label_match_count=excluded.infra_label_match_count,
-              infra_signal_score=excluded.infra_signal_score,
-              infra_signal_level=excluded.infra_signal_level,
-              feature_json=excluded.feature_json
-            """,
+            _FEATURE_UPSERT_SQL,
             (
                 mr_id,
                 int(features["files_changed"]),
@@ -548,34 +783,13 @@ class Database:
                 int(features["infra_label_match_count"]),
                 float(features["infra_signal_score"]),
                 features["infra_signal_level"],
-                json.dumps(features),
+                _json_text(features),
             ),
         )
 
     def upsert_classification(self, conn: sqlite3.Connection, mr_id: int, c: dict[str, Any]) -> None:
         conn.execute(
-            """
-            INSERT INTO mr_classifications (
-              mr_id, base_type, final_type, is_infra_related, infra_override_applied,
-              complexity_level, complexity_score, capability_tags_json, risk_tags_json,
-              classification_confidence, confidence_band, needs_review, classifier_version, classification_rationale_json, classified_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(mr_id) DO UPDATE SET
-              base_type=excluded.base_type,
-              final_type=excluded.final_type,
-              is_infra_related=excluded.is_infra_related,
-              infra_override_applied=excluded.infra_override_applied,
-              complexity_level=excluded.complexity_level,
-              complexity_score=excluded.complexity_score,
-              capability_tags_json=excluded.capability_tags_json,
-              risk_tags_json=excluded.risk_tags_json,
-              classification_confidence=excluded.classification_confidence,
-              confidence_band=excluded.confidence_band,
-              needs_review=excluded.needs_review,
-              classifier_version=excluded.classifier_version,
-              classification_rationale_json=excluded.classification_rationale_json,
-              classified_at=excluded.classified_at
-            """,
+            _CLASSIFICATION_UPSERT_SQL,
             (
                 mr_id,
                 c["base_type"],
@@ -584,13 +798,13 @@ class Database:
                 1 if c["infra_override_applied"] else 0,
                 c["complexity_level"],
                 float(c["complexity_score"]),
-                json.dumps(c.get("capability_tags", [])),
-                json.dumps(c.get("risk_tags", [])),
+                _json_text(c.get("capability_tags", [])),
+                _json_text(c.get("risk_tags", [])),
                 float(c.get("classification_confidence", 0.5)),
                 str(c.get("confidence_band", "medium")),
                 1 if c.get("needs_review", False) else 0,
                 str(c.get("classifier_version", "v1.0")),
-                json.dumps(c["rationale"]),
+                _json_text(c["rationale"]),
                 c["classified_at"],
             ),
         )
@@ -604,16 +818,7 @@ class Database:
         payload: dict[str, Any],
         fetched_at: str,
     ) -> None:
-        conn.execute(
-            """
-            INSERT INTO raw_snapshots (project_id, entity_type, entity_key, payload_json, fetched_at)
-            VALUES (?, ?, ?, ?, ?)
-            ON CONFLICT(project_id, entity_type, entity_key) DO UPDATE SET
-              payload_json=excluded.payload_json,
-              fetched_at=excluded.fetched_at
-            """,
-            (project_id, entity_type, entity_key, json.dumps(payload), fetched_at),
-        )
+        conn.execute(_RAW_SNAPSHOT_UPSERT_SQL, (project_id, entity_type, entity_key, _json_text(payload), fetched_at))
 
     def load_checkpoint(self, conn: sqlite3.Connection, project_id: int, source: str) -> dict[str, Any] | None:
         row = conn.execute(
@@ -665,15 +870,20 @@ class Database:
     ) -> dict[int, str]:
         if not iids:
             return {}
-        placeholders = ",".join(["?"] * len(iids))
-        rows = conn.execute(
-            f"""
-            SELECT iid, updated_at
-            FROM merge_requests
-            WHERE project_id = ? AND iid IN ({placeholders})
-            """,
-            (project_id, *iids),
-        ).fetchall()
+        # A temp table keeps the statement text constant (cached plan) and avoids the bound-variable limit.
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS _freshness_iids (iid INTEGER PRIMARY KEY)")
+        try:
+            conn.executemany("INSERT OR IGNORE INTO _freshness_iids VALUES (?)", ((int(iid),) for iid in iids))
+            rows = conn.execute(
+                """
+                SELECT m.iid, m.updated_at
+                FROM _freshness_iids t
+                JOIN merge_requests m ON m.project_id = ? AND m.iid = t.iid
+                """,
+                (project_id,),
+            ).fetchall()
+        finally:
+            conn.execute("DROP TABLE _freshness_iids")
         result: dict[int, str] = {}
         for row in rows:
             updated_at = row["updated_at"]
@@ -686,14 +896,17 @@ class Database:
         conn: sqlite3.Connection,
         data_source: str,
         project_id: int | None = None,
+        project_ids: list[int] | None = None,
     ) -> int:
-        if project_id is None:
-            cur = conn.execute("DELETE FROM merge_requests WHERE data_source = ?", (data_source,))
-        else:
-            cur = conn.execute(
-                "DELETE FROM merge_requests WHERE data_source = ? AND project_id = ?",
-                (data_source, project_id),
-            )
+        scope_ids = list(project_ids or [])
+        if project_id is not None:
+            scope_ids.append(int(project_id))
+        sql = "DELETE FROM merge_requests WHERE data_source = ?"
+        params: list[Any] = [data_source]
+        if scope_ids:
+            sql += f" AND project_id IN ({','.join(['?'] * len(scope_ids))})"
+            params.extend(scope_ids)
+        cur = conn.execute(sql, tuple(params))
         return int(cur.rowcount or 0)
 
     def upsert_qodo_describe(self, conn: sqlite3.Connection, row: dict[str, Any]) -> None:
@@ -735,8 +948,8 @@ class Database:
                 row.get("qodo_title"),
                 row.get("qodo_type"),
                 row.get("qodo_summary"),
-                json.dumps(row.get("qodo_sections", {})),
-                json.dumps(row.get("qodo_labels", [])),
+                _json_text(row.get("qodo_sections", {})),
+                _json_text(row.get("qodo_labels", [])),
                 row.get("raw_output_path"),
                 row.get("parser_version"),
                 row.get("quality_status"),
@@ -744,8 +957,8 @@ class Database:
                 row.get("reviewer_summary_status", "missing"),
                 float(row.get("context_quality_score", 0.0)),
                 int(row.get("prompt_leak_count", 0)),
-                json.dumps(row.get("prompt_leak_markers", [])),
-                json.dumps(row.get("structured_payload", {})),
+                _json_text(row.get("prompt_leak_markers", [])),
+                _json_text(row.get("structured_payload", {})),
                 row["updated_at"],
             ),
         )
@@ -812,16 +1025,16 @@ class Database:
                 row.get("qodo_title"),
                 row.get("qodo_type"),
                 row.get("qodo_summary"),
-                json.dumps(row.get("qodo_sections", {})),
-                json.dumps(row.get("qodo_labels", [])),
+                _json_text(row.get("qodo_sections", {})),
+                _json_text(row.get("qodo_labels", [])),
                 row.get("parser_version"),
                 row.get("quality_status"),
                 row.get("reviewer_summary"),
                 row.get("reviewer_summary_status", "missing"),
                 float(row.get("context_quality_score", 0.0)),
                 int(row.get("prompt_leak_count", 0)),
-                json.dumps(row.get("prompt_leak_markers", [])),
-                json.dumps(row.get("structured_payload", {})),
+                _json_text(row.get("prompt_leak_markers", [])),
+                _json_text(row.get("structured_payload", {})),
                 row["updated_at"],
             ),
         )
@@ -873,7 +1086,7 @@ class Database:
                 row.get("group_path"),
                 int(row["history_window_months"]),
                 int(row["sample_size"]),
-                json.dumps(row["baseline_json"]),
+                _json_text(row["baseline_json"]),
                 row["markdown_path"],
                 row["content_sha256"],
                 row["generated_at"],
@@ -919,16 +1132,16 @@ class Database:
                 row["mr_iid"],
                 row["mr_outcome"],
                 row.get("mr_achieved_outcome"),
-                json.dumps(row.get("mr_achieved_outcome_bullets", [])),
+                _json_text(row.get("mr_achieved_outcome_bullets", [])),
                 row.get("outcome_source", "heuristic"),
                 row.get("outcome_mode", "template"),
                 float(row.get("outcome_quality_score", 0.0)),
-                json.dumps(row.get("topic_labels", [])),
+                _json_text(row.get("topic_labels", [])),
                 row.get("similarity_strategy", "lexical"),
                 float(row["regression_probability"]),
                 row["review_depth_required"],
-                json.dumps(row["assessment_json"]),
-                json.dumps(row["similar_mrs_json"]),
+                _json_text(row["assessment_json"]),
+                _json_text(row["similar_mrs_json"]),
                 row["addendum_markdown_path"],
                 row.get("context_markdown_path"),
                 row.get("memory_score_version", "memory-v1"),
@@ -948,7 +1161,7 @@ class Database:
             """,
             (
                 row["run_type"],
-                json.dumps(row.get("scope_json", {})),
+                _json_text(row.get("scope_json", {})),
                 row.get("mode"),
                 int(row.get("eligible_count", 0)),
                 int(row.get("success_count", 0)),
@@ -2,11 +2,19 @@ from __future__ import annotations
 
 import csv
 import json
+import sqlite3
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Iterator
 
 from prtool.db import Database
 
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None
+
+EXPORT_FETCH_SIZE = 1000
+
 
 def _scope_where(project_ids: list[int] | None) -> tuple[str, tuple[Any, ...]]:
     if not project_ids:
@@ -15,13 +23,24 @@ def _scope_where(project_ids: list[int] | None) -> tuple[str, tuple[Any, ...]]:
     return f"WHERE m.project_id IN ({placeholders})", tuple(project_ids)
 
 
+def _fetch_chunks(cursor: sqlite3.Cursor) -> Iterator[list[sqlite3.Row]]:
+    # Bounded memory: rows are pulled EXPORT_FETCH_SIZE at a time instead of fetchall().
+    return iter(lambda: cursor.fetchmany(EXPORT_FETCH_SIZE), [])
+
+
+def _jsonl_line(item: dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(item) + b"\n"
+    return (json.dumps(item, separators=(",", ":")) + "\n").encode("utf-8")
+
+
 def export_csv(db: Database, out_dir: str = "./exports", project_ids: list[int] | None = None, filename_stem: str = "mr_classification") -> Path:
     out = Path(out_dir)
     out.mkdir(parents=True, exist_ok=True)
     target = out / f"{filename_stem}.csv"
     where_sql, params = _scope_where(project_ids)
 
-    with db.connect() as conn, target.open("w", newline="", encoding="utf-8") as f:
+    with db.connect_read() as conn, target.open("w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
         writer.writerow(
             [
@@ -51,7 +70,8 @@ def export_csv(db: Database, out_dir: str = "./exports", project_ids: list[int]
                 "topic_labels",
             ]
         )
-        rows = conn.execute(
+        # Column order matches the header so chunks go straight to writerows.
+        cursor = conn.execute(
             f"""
             SELECT m.project_id, m.iid, m.title, c.base_type, c.final_type,
                    c.is_infra_related, c.infra_override_applied,
@@ -68,18 +88,9 @@ def export_csv(db: Database, out_dir: str = "./exports", project_ids: list[int]
             ORDER BY m.updated_at ASC
             """,
             params,
-        ).fetchall()
-        for r in rows:
-            writer.writerow([
-                r["project_id"], r["iid"], r["title"], r["base_type"], r["final_type"],
-                r["is_infra_related"], r["infra_override_applied"],
-                r["complexity_level"], r["complexity_score"],
-                r["capability_tags_json"], r["risk_tags_json"],
-                r["classification_confidence"], r["confidence_band"], r["needs_review"], r["classifier_version"],
-                r["mr_outcome"], r["regression_probability"], r["review_depth_required"],
-                r["memory_score_version"], r["memory_updated_at"],
-                r["mr_achieved_outcome"], r["outcome_mode"], r["outcome_quality_score"], r["topic_labels_json"],
-            ])
+        )
+        for rows in _fetch_chunks(cursor):
+            writer.writerows(rows)
 
     return target
 
@@ -90,8 +101,8 @@ def export_jsonl(db: Database, out_dir: str = "./exports", project_ids: list[int
     target = out / f"{filename_stem}.jsonl"
     where_sql, params = _scope_where(project_ids)
 
-    with db.connect() as conn, target.open("w", encoding="utf-8") as f:
-        rows = conn.execute(
+    with db.connect_read() as conn, target.open("wb", buffering=1 << 20) as f:
+        cursor = conn.execute(
             f"""
             SELECT m.project_id, m.iid, m.title, c.base_type, c.final_type,
                    c.is_infra_related, c.infra_override_applied,
@@ -109,13 +120,14 @@ def export_jsonl(db: Database, out_dir: str = "./exports", project_ids: list[int
             ORDER BY m.updated_at ASC
             """,
             params,
-        ).fetchall()
-        for r in rows:
-            row = dict(r)
-            row["classification_rationale"] = json.loads(row.pop("classification_rationale_json"))
-            row["capability_tags"] = json.loads(row.pop("capability_tags_json") or "[]")
-            row["risk_tags"] = json.loads(row.pop("risk_tags_json") or "[]")
-            f.write(json.dumps(row) + "\n")
+        )
+        for rows in _fetch_chunks(cursor):
+            for r in rows:
+                row = dict(r)
+                row["classification_rationale"] = json.loads(row.pop("classification_rationale_json"))
+                row["capability_tags"] = json.loads(row.pop("capability_tags_json") or "[]")
+                row["risk_tags"] = json.loads(row.pop("risk_tags_json") or "[]")
+                f.write(_jsonl_line(row))
 
     return target
 
@@ -131,7 +143,7 @@ def export_memory_csv(
     target = out / f"{filename_stem}.csv"
     where_sql, params = _scope_where(project_ids)
 
-    with db.connect() as conn, target.open("w", newline="", encoding="utf-8") as f:
+    with db.connect_read() as conn, target.open("w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
         writer.writerow(
             [
@@ -153,7 +165,8 @@ def export_memory_csv(
                 "context_markdown_path",
             ]
         )
-        rows = conn.execute(
+        # Column order matches the header so chunks go straight to writerows.
+        cursor = conn.execute(
             f"""
             SELECT
               m.project_id,
@@ -164,12 +177,12 @@ def export_memory_csv(
               r.mr_outcome,
               r.regression_probability,
               r.review_depth_required,
+              r.memory_score_version,
+              r.updated_at as memory_updated_at,
               r.mr_achieved_outcome,
               r.outcome_mode,
               r.outcome_quality_score,
               r.topic_labels_json,
-              r.memory_score_version,
-              r.updated_at as memory_updated_at,
               r.addendum_markdown_path,
               r.context_markdown_path
             FROM mr_memory_runtime r
@@ -179,46 +192,18 @@ def export_memory_csv(
             ORDER BY r.updated_at DESC, m.project_id ASC, m.iid ASC
             """,
             params,
-        ).fetchall()
-
-        for r in rows:
-            writer.writerow(
-                [
-                    r["project_id"],
-                    r["iid"],
-                    r["title"],
-                    r["final_type"],
-                    r["complexity_score"],
-                    r["mr_outcome"],
-                    r["regression_probability"],
-                    r["review_depth_required"],
-                    r["memory_score_version"],
-                    r["memory_updated_at"],
-                    r["mr_achieved_outcome"],
-                    r["outcome_mode"],
-                    r["outcome_quality_score"],
-                    r["topic_labels_json"],
-                    r["addendum_markdown_path"],
-                    r["context_markdown_path"],
-                ]
-            )
+        )
+        for rows in _fetch_chunks(cursor):
+            writer.writerows(rows)
 
     return target
 
 
-def export_memory_jsonl(
-    db: Database,
-    out_dir: str = "./exports",
-    project_ids: list[int] | None = None,
-    filename_stem: str = "mr_memory",
-) -> Path:
-    out = Path(out_dir)
-    out.mkdir(parents=True, exist_ok=True)
-    target = out / f"{filename_stem}.jsonl"
+def write_memory_jsonl(db: Database, fh: BinaryIO, project_ids: list[int] | None = None) -> int:
     where_sql, params = _scope_where(project_ids)
-
-    with db.connect() as conn, target.open("w", encoding="utf-8") as f:
-        rows = conn.execute(
+    written = 0
+    with db.connect_read() as conn:
+        cursor = conn.execute(
             f"""
             SELECT
               m.project_id,
@@ -246,12 +231,27 @@ def export_memory_jsonl(
             ORDER BY r.updated_at DESC, m.project_id ASC, m.iid ASC
             """,
             params,
-        ).fetchall()
-        for row in rows:
-            item = dict(row)
-            item["assessment"] = json.loads(item.pop("assessment_json") or "{}")
-            item["similar_mrs"] = json.loads(item.pop("similar_mrs_json") or "[]")
-            item["topic_labels"] = json.loads(item.pop("topic_labels_json") or "[]")
-            f.write(json.dumps(item) + "\n")
+        )
+        for rows in _fetch_chunks(cursor):
+            for row in rows:
+                item = dict(row)
+                item["assessment"] = json.loads(item.pop("assessment_json") or "{}")
+                item["similar_mrs"] = json.loads(item.pop("similar_mrs_json") or "[]")
+                item["topic_labels"] = json.loads(item.pop("topic_labels_json") or "[]")
+                fh.write(_jsonl_line(item))
+            written += len(rows)
+    return written
 
+
+def export_memory_jsonl(
+    db: Database,
+    out_dir: str = "./exports",
+    project_ids: list[int] | None = None,
+    filename_stem: str = "mr_memory",
+) -> Path:
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    target = out / f"{filename_stem}.jsonl"
+    with target.open("wb", buffering=1 << 20) as f:
+        write_memory_jsonl(db, f, project_ids=project_ids)
     return target
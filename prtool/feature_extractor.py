@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import re
 from dataclasses import dataclass
 from typing import Any
 
@@ -22,7 +21,7 @@ class InfraSignals:
 class FeatureExtractor:
     def __init__(self, settings: PartialSettings) -> None:
         self.settings = settings
-        self.ticket_patterns = [re.compile(p, flags=re.IGNORECASE) for p in settings.infra_ticket_regex]
+        self.ticket_patterns = settings.infra_ticket_patterns
 
     def _extract_infra_signals(self, title: str, description: str, labels: list[str]) -> InfraSignals:
         text = f"{title}\n{description}".lower()
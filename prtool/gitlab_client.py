@@ -5,20 +5,26 @@ import time
 import urllib.error
 import urllib.parse
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Iterable
 
 from prtool.config import Settings
 
-try:
-    import gitlab  # type: ignore
-except Exception:  # pragma: no cover
-    gitlab = None
+
+def _import_gitlab() -> Any:
+    # python-gitlab (and requests) are only loaded once a client is actually constructed.
+    try:
+        import gitlab  # type: ignore
+    except Exception:  # pragma: no cover
+        return None
+    return gitlab
 
 
 class GitLabSourceClient:
     def __init__(self, settings: Settings) -> None:
         self.settings = settings
         self._gl = None
+        gitlab = _import_gitlab()
         if gitlab is not None:
             self._gl = gitlab.Gitlab(
                 url=self.settings.gitlab_base_url,
@@ -59,8 +65,28 @@ class GitLabSourceClient:
 
         raise RuntimeError("request retry loop ended unexpectedly")
 
-    def _paginated(self, path: str, params: dict[str, Any]) -> Iterable[dict[str, Any]]:
+    def _paginated(self, path: str, params: dict[str, Any], page_concurrency: int = 1) -> Iterable[dict[str, Any]]:
         page = 1
+        if page_concurrency > 1:
+            # Page 1 tells us the page count; fetch the rest in parallel when GitLab reports it.
+            payload, headers = self._request(
+                path, {**params, "per_page": self.settings.page_size, "page": 1}, return_headers=True
+            )
+            yield from payload
+            if len(payload) < self.settings.page_size:
+                return
+            total_pages = headers.get("X-Total-Pages") or headers.get("x-total-pages")
+            if total_pages and int(total_pages) > 1:
+                pages = range(2, int(total_pages) + 1)
+                with ThreadPoolExecutor(max_workers=min(page_concurrency, len(pages))) as pool:
+                    for chunk in pool.map(
+                        lambda n: self._request(path, {**params, "per_page": self.settings.page_size, "page": n}),
+                        pages,
+                    ):
+                        yield from chunk
+                return
+            # Large result sets omit X-Total-Pages; keep walking sequentially.
+            page = 2
         while True:
             payload = self._request(
                 path,
@@ -84,8 +110,9 @@ class GitLabSourceClient:
     def list_group_project_ids(self, group_ref: str) -> list[int]:
         return [int(p["id"]) for p in self.list_group_projects(group_ref)]
 
-    def list_accessible_projects(self) -> list[dict[str, Any]]:
-        if self._gl is not None:
+    def list_accessible_projects(self, page_concurrency: int = 1) -> list[dict[str, Any]]:
+        # python-gitlab walks pages one by one, so concurrent listing goes through the REST path.
+        if self._gl is not None and page_concurrency <= 1:
             projects = self._gl.projects.list(archived=False, simple=True, all=True)
             payload = []
             for p in projects:
@@ -105,7 +132,7 @@ class GitLabSourceClient:
             "sort": "asc",
         }
         payload = []
-        for p in self._paginated("/projects", params):
+        for p in self._paginated("/projects", params, page_concurrency=page_concurrency):
             payload.append(
                 {
                     "id": int(p["id"]),
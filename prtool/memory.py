@@ -7,7 +7,7 @@ import re
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, TypedDict
 
 from prtool.db import Database
 
@@ -54,6 +54,14 @@ class MaterializeOptions:
     mr_limit: int | None = None
 
 
+class MaterializeResult(TypedDict):
+    project_id: int
+    baseline_written: int
+    runtime_eligible: int
+    runtime_written: int
+    runtime_skipped: int
+
+
 def _now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
@@ -850,7 +858,7 @@ def _ensure_parent(path: Path) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
 
 
-def materialize_project_markdown_from_db(db: Database, project_id: int, opts: MaterializeOptions) -> dict[str, Any]:
+def materialize_project_markdown_from_db(db: Database, project_id: int, opts: MaterializeOptions) -> MaterializeResult:
     started = _now_iso()
     baseline_written = 0
     runtime_eligible = 0
@@ -867,20 +875,29 @@ def materialize_project_markdown_from_db(db: Database, project_id: int, opts: Ma
             (project_id,),
         ).fetchone()
 
-        baseline_text = "# Project Cognitive Memory\n\nbaseline_missing=true\n"
         baseline_path = _default_baseline_path(opts.output_root, project_id)
+        baseline_text: str | None = None
+
+        def _baseline_text() -> str:
+            # Rendered on first use so fully materialized projects skip JSON decoding and rendering.
+            nonlocal baseline_text
+            if baseline_text is None:
+                if not baseline_row:
+                    baseline_text = "# Project Cognitive Memory\n\nbaseline_missing=true\n"
+                else:
+                    try:
+                        baseline_json = json.loads(baseline_row["baseline_json"] or "{}")
+                    except Exception:
+                        baseline_json = {}
+                    baseline_text = _render_project_memory_markdown(
+                        project_id,
+                        baseline_row["group_path"],
+                        baseline_json,
+                        str(baseline_row["updated_at"] or _now_iso()),
+                    )
+            return baseline_text
 
         if baseline_row:
-            try:
-                baseline_json = json.loads(baseline_row["baseline_json"] or "{}")
-            except Exception:
-                baseline_json = {}
-            baseline_text = _render_project_memory_markdown(
-                project_id,
-                baseline_row["group_path"],
-                baseline_json,
-                str(baseline_row["updated_at"] or _now_iso()),
-            )
             baseline_path = Path(baseline_row["markdown_path"] or str(baseline_path))
             if not baseline_path.is_absolute():
                 baseline_path = Path.cwd() / baseline_path
@@ -888,10 +905,11 @@ def materialize_project_markdown_from_db(db: Database, project_id: int, opts: Ma
             should_write_baseline = opts.force or (not opts.only_missing) or (not baseline_path.exists())
             if should_write_baseline:
                 _ensure_parent(baseline_path)
-                baseline_path.write_text(baseline_text, encoding="utf-8")
+                baseline_path.write_text(_baseline_text(), encoding="utf-8")
                 baseline_written = 1
 
-        clauses = ["m.project_id = ?"]
+        # Filter on the runtime table's own project_id so idx_memory_runtime_project_updated serves the ORDER BY.
+        clauses = ["r.project_id = ?"]
         params: list[Any] = [project_id]
         if opts.data_source != "all":
             clauses.append("m.data_source = ?")
@@ -930,6 +948,20 @@ def materialize_project_markdown_from_db(db: Database, project_id: int, opts: Ma
 
         for row in rows:
             item = dict(row)
+            addendum_path = Path(item.get("addendum_markdown_path") or str(_default_addendum_path(opts.output_root, project_id, int(item["iid"]))))
+            if not addendum_path.is_absolute():
+                addendum_path = Path.cwd() / addendum_path
+            context_path = Path(item.get("context_markdown_path") or str(_default_context_path(opts.output_root, project_id, int(item["iid"]))))
+            if not context_path.is_absolute():
+                context_path = Path.cwd() / context_path
+
+            should_write_addendum = opts.force or (not opts.only_missing) or (not addendum_path.exists())
+            should_write_context = opts.compose and (opts.force or (not opts.only_missing) or (not context_path.exists()))
+
+            if not should_write_addendum and not should_write_context:
+                runtime_skipped += 1
+                continue
+
             try:
                 assessment = json.loads(item.get("assessment_json") or "{}")
             except Exception:
@@ -951,27 +983,13 @@ def materialize_project_markdown_from_db(db: Database, project_id: int, opts: Ma
             except Exception:
                 similar = []
 
-            addendum_path = Path(item.get("addendum_markdown_path") or str(_default_addendum_path(opts.output_root, project_id, int(item["iid"]))))
-            if not addendum_path.is_absolute():
-                addendum_path = Path.cwd() / addendum_path
-            context_path = Path(item.get("context_markdown_path") or str(_default_context_path(opts.output_root, project_id, int(item["iid"]))))
-            if not context_path.is_absolute():
-                context_path = Path.cwd() / context_path
-
-            should_write_addendum = opts.force or (not opts.only_missing) or (not addendum_path.exists())
-            should_write_context = opts.compose and (opts.force or (not opts.only_missing) or (not context_path.exists()))
-
-            if not should_write_addendum and not should_write_context:
-                runtime_skipped += 1
-                continue
-
             addendum_md = _render_addendum(item, assessment, similar)
             if should_write_addendum:
                 _ensure_parent(addendum_path)
                 addendum_path.write_text(addendum_md, encoding="utf-8")
 
             if should_write_context:
-                composed = baseline_text + "\n---\n\n## MR Runtime Addendum\n\n" + addendum_md
+                composed = _baseline_text() + "\n---\n\n## MR Runtime Addendum\n\n" + addendum_md
                 _ensure_parent(context_path)
                 context_path.write_text(composed, encoding="utf-8")
 
@@ -3,7 +3,9 @@ from __future__ import annotations
 import json
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
-from typing import Any
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Mapping, Sequence
 
 from prtool.classifier import CLASSIFIER_VERSION, ClassificationConfig, classify
 from prtool.config import PartialSettings, Settings
@@ -124,7 +126,7 @@ def sync_refresh(
     light_mode: bool = False,
 ) -> int:
     client = GitLabSourceClient(settings)
-    with db.connect() as conn:
+    with db.connect_read() as conn:
         cp = db.load_checkpoint(conn, project_id, "refresh")
     updated_after = cp["watermark_updated_at"] if cp else None
     fetched = client.list_merge_requests(project_id, updated_after=updated_after)
@@ -139,6 +141,27 @@ def sync_refresh(
     )
 
 
+# Fetched MRs are written in groups so the MR, commit and file rows go through executemany.
+_INGEST_WRITE_BATCH = 50
+
+
+def _write_mr_batch(
+    db: Database,
+    conn: Any,
+    project_id: int,
+    batch: list[tuple[dict[str, Any], dict[str, Any]]],
+    now: str,
+) -> None:
+    mr_ids = db.upsert_merge_requests_bulk(conn, [_to_mr_record(project_id, mr) for mr, _ in batch])
+    db.replace_mr_commits_bulk(conn, [(mr_id, details["commits"]) for mr_id, (_, details) in zip(mr_ids, batch)])
+    db.replace_mr_files_bulk(conn, [(mr_id, details["files"]) for mr_id, (_, details) in zip(mr_ids, batch)])
+    for mr_id, (mr, details) in zip(mr_ids, batch):
+        db.upsert_discussions(conn, mr_id, _summarize_discussions(details["discussions"]))
+        db.upsert_approvals(conn, mr_id, _summarize_approvals(details["approvals"]))
+        db.upsert_pipelines(conn, mr_id, _summarize_pipelines(details["pipelines"]))
+        db.upsert_raw_snapshot(conn, project_id, "merge_request", str(int(mr["iid"])), mr, now)
+
+
 def _ingest_mrs(
     db: Database,
     settings: Settings,
@@ -183,27 +206,13 @@ def _ingest_mrs(
                 future = executor.submit(_fetch_mr_details, client, project_id, mr_iid, light_mode)
                 future_map[future] = mr
 
+            pending: list[tuple[dict[str, Any], dict[str, Any]]] = []
             for future in as_completed(future_map):
-                mr = future_map[future]
-                mr_iid = int(mr["iid"])
-                details = future.result()
-                mr_record = _to_mr_record(project_id, mr)
-                mr_id = db.upsert_merge_request(conn, mr_record)
-
-                commits = details["commits"]
-                files = details["files"]
-                discussions = details["discussions"]
-                approvals = details["approvals"]
-                pipelines = details["pipelines"]
-
-                db.replace_mr_commits(conn, mr_id, commits)
-                db.replace_mr_files(conn, mr_id, files)
-                db.upsert_discussions(conn, mr_id, _summarize_discussions(discussions))
-                db.upsert_approvals(conn, mr_id, _summarize_approvals(approvals))
-                db.upsert_pipelines(conn, mr_id, _summarize_pipelines(pipelines))
-                db.upsert_raw_snapshot(conn, project_id, "merge_request", str(mr_iid), mr, now)
-
+                pending.append((future_map[future], future.result()))
                 processed += 1
+                if len(pending) >= _INGEST_WRITE_BATCH or processed == len(to_process):
+                    _write_mr_batch(db, conn, project_id, pending, now)
+                    pending = []
                 if processed == 1 or processed % 10 == 0 or processed == len(to_process):
                     print(f"[project {project_id}] progress {processed}/{len(to_process)} processed")
 
@@ -212,6 +221,86 @@ def _ingest_mrs(
     return len(to_process)
 
 
+def _classifier_for(partial_settings: PartialSettings) -> tuple[FeatureExtractor, ClassificationConfig]:
+    return FeatureExtractor(partial_settings), ClassificationConfig(
+        infra_strong_threshold=partial_settings.infra_strong_threshold,
+        infra_weak_threshold=partial_settings.infra_weak_threshold,
+        needs_review_threshold=partial_settings.classification_needs_review_threshold,
+    )
+
+
+def _classify_mr_row(
+    db: Database,
+    conn: Any,
+    extractor: FeatureExtractor,
+    c_cfg: ClassificationConfig,
+    row: Any,
+) -> None:
+    mr_id = int(row["id"])
+    commits = conn.execute("SELECT * FROM mr_commits WHERE mr_id = ?", (mr_id,)).fetchall()
+    files = conn.execute("SELECT * FROM mr_files WHERE mr_id = ?", (mr_id,)).fetchall()
+    pipelines = conn.execute("SELECT * FROM mr_pipelines WHERE mr_id = ?", (mr_id,)).fetchone()
+
+    mr = dict(row)
+    mr["labels"] = []
+    labels_json = row["labels_json"]
+    if labels_json:
+        mr["labels"] = json.loads(labels_json)
+
+    # Use Qodo describe summary as a metadata fallback when MR description is blank.
+    # This increases structured text available for feature extraction/classification.
+    if not str(mr.get("description") or "").strip():
+        qodo = conn.execute(
+            """
+            SELECT reviewer_summary, reviewer_summary_status, qodo_summary
+            FROM mr_qodo_artifacts
+            WHERE mr_id = ? AND tool = 'describe'
+            """,
+            (mr_id,),
+        ).fetchone()
+        if qodo is None:
+            qodo = conn.execute(
+                """
+                SELECT reviewer_summary, reviewer_summary_status, qodo_summary
+                FROM mr_qodo_describe
+                WHERE mr_id = ?
+                """,
+                (mr_id,),
+            ).fetchone()
+        if qodo:
+            reviewer_summary = str(qodo["reviewer_summary"] or "").strip()
+            reviewer_summary_status = str(qodo["reviewer_summary_status"] or "").strip().lower()
+            qodo_summary = str(qodo["qodo_summary"] or "").strip()
+            if reviewer_summary and reviewer_summary_status in {"clean", "ok"}:
+                mr["description"] = reviewer_summary
+            elif qodo_summary:
+                mr["description"] = qodo_summary
+
+    # Discussion counts are denormalized onto merge_requests, so the row already carries them.
+    discussion_map = {
+        "thread_count": int(row["thread_count"]),
+        "note_count": int(row["note_count"]),
+        "unresolved_count": int(row["unresolved_count"]),
+    }
+    pipeline_map = {
+        "pipeline_count": int(pipelines["pipeline_count"]) if pipelines else 0,
+        "failed_count": int(pipelines["failed_count"]) if pipelines else 0,
+        "success_count": int(pipelines["success_count"]) if pipelines else 0,
+        "retry_count": int(pipelines["retry_count"]) if pipelines else 0,
+    }
+
+    feature_row = extractor.extract(
+        mr=mr,
+        commits=[dict(c) for c in commits],
+        files=[dict(f) for f in files],
+        discussions=discussion_map,
+        pipelines=pipeline_map,
+    )
+    db.upsert_feature_row(conn, mr_id, feature_row)
+    classification = classify(mr, [dict(f) for f in files], feature_row, c_cfg)
+    db.upsert_classification(conn, mr_id, classification)
+
+
 def classify_project(
     db: Database,
     partial_settings: PartialSettings,
@@ -221,12 +310,7 @@ def classify_project(
     target_classifier_version: str | None = None,
     mr_ids: list[int] | None = None,
 ) -> int:
-    extractor = FeatureExtractor(partial_settings)
-    c_cfg = ClassificationConfig(
-        infra_strong_threshold=partial_settings.infra_strong_threshold,
-        infra_weak_threshold=partial_settings.infra_weak_threshold,
-        needs_review_threshold=partial_settings.classification_needs_review_threshold,
-    )
+    extractor, c_cfg = _classifier_for(partial_settings)
 
     with db.connect() as conn:
         if only_stale:
@@ -265,70 +349,46 @@ def classify_project(
 
         total = len(rows)
         for idx, row in enumerate(rows, start=1):
-            mr_id = int(row["id"])
-            commits = conn.execute("SELECT * FROM mr_commits WHERE mr_id = ?", (mr_id,)).fetchall()
-            files = conn.execute("SELECT * FROM mr_files WHERE mr_id = ?", (mr_id,)).fetchall()
-            discussion = conn.execute("SELECT * FROM mr_discussions WHERE mr_id = ?", (mr_id,)).fetchone()
-            pipelines = conn.execute("SELECT * FROM mr_pipelines WHERE mr_id = ?", (mr_id,)).fetchone()
-
-            mr = dict(row)
-            mr["labels"] = []
-            labels_json = row["labels_json"]
-            if labels_json:
-                mr["labels"] = json.loads(labels_json)
-
-            # Use Qodo describe summary as a metadata fallback when MR description is blank.
-            # This increases structured text available for feature extraction/classification.
-            if not str(mr.get("description") or "").strip():
-                qodo = conn.execute(
-                    """
-                    SELECT reviewer_summary, reviewer_summary_status, qodo_summary
-                    FROM mr_qodo_artifacts
-                    WHERE mr_id = ? AND tool = 'describe'
-                    """,
-                    (mr_id,),
-                ).fetchone()
-                if qodo is None:
-                    qodo = conn.execute(
-                        """
-                        SELECT reviewer_summary, reviewer_summary_status, qodo_summary
-                        FROM mr_qodo_describe
-                        WHERE mr_id = ?
-                        """,
-                        (mr_id,),
-                    ).fetchone()
-                if qodo:
-                    reviewer_summary = str(qodo["reviewer_summary"] or "").strip()
-                    reviewer_summary_status = str(qodo["reviewer_summary_status"] or "").strip().lower()
-                    qodo_summary = str(qodo["qodo_summary"] or "").strip()
-                    if reviewer_summary and reviewer_summary_status in {"clean", "ok"}:
-                        mr["description"] = reviewer_summary
-                    elif qodo_summary:
-                        mr["description"] = qodo_summary
-
-            discussion_map = {
-                "thread_count": int(discussion["thread_count"]) if discussion else 0,
-                "note_count": int(discussion["note_count"]) if discussion else 0,
-                "unresolved_count": int(discussion["unresolved_count"]) if discussion else 0,
-            }
-            pipeline_map = {
-                "pipeline_count": int(pipelines["pipeline_count"]) if pipelines else 0,
-                "failed_count": int(pipelines["failed_count"]) if pipelines else 0,
-                "success_count": int(pipelines["success_count"]) if pipelines else 0,
-                "retry_count": int(pipelines["retry_count"]) if pipelines else 0,
-            }
-
-            feature_row = extractor.extract(
-                mr=mr,
-                commits=[dict(c) for c in commits],
-                files=[dict(f) for f in files],
-                discussions=discussion_map,
-                pipelines=pipeline_map,
-            )
-            db.upsert_feature_row(conn, mr_id, feature_row)
-            classification = classify(mr, [dict(f) for f in files], feature_row, c_cfg)
-            db.upsert_classification(conn, mr_id, classification)
+            _classify_mr_row(db, conn, extractor, c_cfg, row)
             if idx == 1 or idx % 25 == 0 or idx == total:
                 print(f"[project {project_id}] classify progress {idx}/{total}")
 
     return len(rows)
+
+
+def classify_merge_requests(
+    db: Database,
+    partial_settings: PartialSettings,
+    mr_ids_by_project: Mapping[int, Sequence[int]],
+) -> dict[int, int]:
+    # Targeted reclassification across projects: one temp-table join selects every MR instead of a
+    # project-scoped IN (...) query per project. Returns processed counts keyed by project.
+    extractor, c_cfg = _classifier_for(partial_settings)
+    counts: dict[int, int] = {}
+    with db.connect() as conn:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS _classify_targets (project_id INTEGER NOT NULL, mr_id INTEGER PRIMARY KEY)")
+        try:
+            conn.executemany(
+                "INSERT OR IGNORE INTO _classify_targets VALUES (?, ?)",
+                ((int(pid), int(mr_id)) for pid, ids in mr_ids_by_project.items() for mr_id in ids),
+            )
+            rows = conn.execute(
+                """
+                SELECT m.*
+                FROM _classify_targets t
+                JOIN merge_requests m ON m.id = t.mr_id AND m.project_id = t.project_id
+                ORDER BY m.project_id, m.updated_at ASC
+                """
+            ).fetchall()
+        finally:
+            conn.execute("DROP TABLE _classify_targets")
+
+        for project_id, group in groupby(rows, key=itemgetter("project_id")):
+            project_rows = list(group)
+            total = len(project_rows)
+            for idx, row in enumerate(project_rows, start=1):
+                _classify_mr_row(db, conn, extractor, c_cfg, row)
+                if idx == 1 or idx % 25 == 0 or idx == total:
+                    print(f"[project {project_id}] classify progress {idx}/{total}")
+            counts[int(project_id)] = total
+    return counts
@@ -4,6 +4,9 @@ from pathlib import Path
 
 import pytest
 
+from prtool import cli
+from prtool.config import clear_settings_cache
+
 
 @pytest.fixture(autouse=True)
 def isolate_test_environment(monkeypatch, tmp_path: Path):
@@ -15,3 +18,6 @@ def isolate_test_environment(monkeypatch, tmp_path: Path):
     monkeypatch.delenv("GITLAB_BASE_URL", raising=False)
     monkeypatch.delenv("GITLAB_TOKEN", raising=False)
     monkeypatch.setenv("PRTOOL_ENV_FILE", str(tmp_path / ".nonexistent"))
+    monkeypatch.setenv("PRTOOL_CACHE_DIR", str(tmp_path / "cache"))
+    cli._INVOCATION_CACHE.clear()
+    clear_settings_cache()
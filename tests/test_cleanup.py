@@ -51,3 +51,40 @@ def test_delete_merge_requests_by_source(tmp_path) -> None:
     assert len(remaining) == 1
     assert remaining[0][0] == "production"
     assert remaining[0][1] == 1
+
+
+def test_delete_merge_requests_by_source_project_scope(tmp_path) -> None:
+    db_path = str(tmp_path / "cleanup_scope.db")
+    db = Database(db_path)
+    for project_id in (7001, 7002, 7003):
+        seed_demo_data(db, project_id=project_id, settings=_settings(db_path), run_classify=False)
+
+    with db.connect() as conn:
+        deleted = db.delete_merge_requests_by_source(conn, data_source="test", project_ids=[7001, 7003])
+        assert deleted == 8
+
+        remaining = conn.execute("SELECT DISTINCT project_id FROM merge_requests").fetchall()
+
+    assert [r[0] for r in remaining] == [7002]
+
+
+def test_cleanup_artifacts_empties_roots(monkeypatch, tmp_path, capsys) -> None:
+    from prtool import cli
+
+    qodo_root = tmp_path / "outputs" / "qodo"
+    memory_root = tmp_path / "outputs" / "memory"
+    (qodo_root / "projects" / "1" / "mrs" / "2").mkdir(parents=True)
+    (qodo_root / "projects" / "1" / "mrs" / "2" / "describe.md").write_text("x", encoding="utf-8")
+    (qodo_root / "projects" / "1" / "compact.md").write_text("x", encoding="utf-8")
+    (memory_root / "projects" / "1").mkdir(parents=True)
+    (memory_root / "projects" / "1" / "memory.md").write_text("x", encoding="utf-8")
+    monkeypatch.setattr(cli, "DEFAULT_QODO_OUTPUT_ROOT", str(qodo_root))
+    monkeypatch.setattr(cli, "DEFAULT_MEMORY_OUTPUT_ROOT", str(memory_root))
+
+    rc = cli.main(["cleanup", "--artifacts", "--target", "outputs", "--yes"])
+    out = capsys.readouterr().out
+
+    assert rc == 0
+    assert "Deleted artifact roots (3 files):" in out
+    assert qodo_root.is_dir() and not any(qodo_root.iterdir())
+    assert memory_root.is_dir() and not any(memory_root.iterdir())
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import argparse
+
+from prtool import cli
+
+
+def _subparser_choices(parser: argparse.ArgumentParser) -> dict[str, argparse.ArgumentParser]:
+    for action in parser._actions:
+        if isinstance(action, argparse._SubParsersAction):
+            return dict(action.choices)
+    return {}
+
+
+def test_every_cli_command_has_a_handler() -> None:
+    for command, command_parser in _subparser_choices(cli.build_parser()).items():
+        nested = _subparser_choices(command_parser)
+        if not nested:
+            assert command in cli.COMMANDS, command
+            continue
+        if command not in cli.SUBCOMMANDS:
+            assert command in cli.COMMANDS, command
+            continue
+        _, handlers = cli.SUBCOMMANDS[command]
+        assert set(handlers) == set(nested), command
+
+
+def test_build_parser_only_registers_requested_command() -> None:
+    parser = cli.build_parser(["memory", "status", "--project-id", "1"])
+    assert list(_subparser_choices(parser)) == ["memory"]
+
+    args = parser.parse_args(["memory", "status", "--project-id", "1"])
+    assert args.memory_command == "status"
+    assert args.project_id == [1]
+
+    assert len(_subparser_choices(cli.build_parser(["--help"]))) == len(cli._PARSER_BUILDERS)
+
+
+def test_fast_parser_reuses_validation_formatter() -> None:
+    parser = cli._FastParser(prog="prtool")
+    parser.add_argument("--project-id", type=int, metavar="ID", help="project %(metavar)s")
+    first = parser._validation_formatter
+    parser.add_argument("--limit", type=int, metavar="N", help="limit %(default)s", default=5)
+    assert parser._validation_formatter is first
+
+    # Help rendering still gets a fresh formatter.
+    assert parser._get_formatter() is not first
+    assert "--project-id ID" in parser.format_help()
+
+
+def test_project_and_group_id_lists_merge_with_repeated_flags() -> None:
+    argv = ["sync", "refresh", "--project-ids", "1", "2", "--project-id", "3", "--group-ids", "a", "b"]
+    args = cli.build_parser(argv).parse_args(argv)
+    assert args.project_id == [1, 2, 3]
+    assert args.group_id == ["a", "b"]
+
+
+def test_resolve_handler_uses_flat_dispatch_table() -> None:
+    args = argparse.Namespace(command="sync", sync_command="refresh")
+    assert cli._resolve_handler(args) is cli._cmd_sync
+    assert cli._resolve_handler(argparse.Namespace(command="init-db")) is cli._cmd_init_db
+    assert cli._resolve_handler(argparse.Namespace(command="memory", memory_command="nope")) is None
+    assert ("memory", "materialize") in cli._DISPATCH
+
+
+def test_top_level_help_is_cached(monkeypatch, capsys) -> None:
+    assert cli.main(["--help"]) == 0
+    first = capsys.readouterr().out
+    assert "memory" in first and "usage: prtool" in first
+
+    monkeypatch.setattr(cli, "build_parser", lambda argv=None: (_ for _ in ()).throw(AssertionError("rebuilt")))
+    assert cli.main(["-h"]) == 0
+    assert capsys.readouterr().out == first
@@ -4,6 +4,7 @@ import argparse
 
 import pytest
 
+from prtool import cli
 from prtool.cli import _resolve_concurrency
 
 
@@ -16,3 +17,31 @@ def test_resolve_concurrency_invalid() -> None:
     args = argparse.Namespace(concurrency=0)
     with pytest.raises(ValueError):
         _resolve_concurrency(args)
+
+
+def test_env_defaults_snapshot_feeds_parser(monkeypatch) -> None:
+    monkeypatch.setenv("QODO_INLINE_ENABLED", "yes")
+    monkeypatch.setenv("QODO_INLINE_TIMEOUT_SEC", "42")
+
+    args = cli.build_parser(["reclassify"]).parse_args(["reclassify"])
+    assert args.qodo_inline is True
+    assert args.qodo_timeout_sec == 42
+    assert args.qodo_only_missing is True
+
+    # The snapshot is reused until the next invocation clears the cache.
+    monkeypatch.setenv("QODO_INLINE_TIMEOUT_SEC", "7")
+    assert cli._env_defaults().qodo_inline_timeout_sec == 42
+
+
+def test_build_parser_defers_env_defaults(monkeypatch) -> None:
+    calls = {"n": 0}
+    real = cli._load_env_defaults
+
+    def _counting():
+        calls["n"] += 1
+        return real()
+
+    monkeypatch.setattr(cli, "_load_env_defaults", _counting)
+    cli.build_parser()
+    cli.build_parser(["memory"]).parse_args(["memory", "status", "--project-id", "1"])
+    assert calls["n"] == 0
@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import sqlite3
+
+import pytest
+
 from prtool.db import Database
 
 
@@ -51,3 +55,147 @@ def test_list_ingested_project_ids(tmp_path) -> None:
         ids = db.list_ingested_project_ids(conn)
 
     assert ids == [10, 20]
+
+
+def test_session_reuses_connection_for_nested_connect(tmp_path) -> None:
+    db = Database(str(tmp_path / "t.db"))
+    db.init_schema()
+
+    with db.session() as pinned:
+        with db.connect() as first:
+            first.execute("CREATE TABLE scratch (v INTEGER)")
+            first.execute("INSERT INTO scratch (v) VALUES (1)")
+        with db.connect() as second:
+            assert second is pinned
+            assert first is pinned
+            assert second.execute("SELECT COUNT(*) FROM scratch").fetchone()[0] == 1
+
+    with db.connect() as conn:
+        assert conn is not pinned
+        assert conn.execute("SELECT COUNT(*) FROM scratch").fetchone()[0] == 1
+
+
+def test_classify_all_projects_reads_ingested_ids_once(tmp_path, monkeypatch) -> None:
+    from argparse import Namespace
+
+    from prtool import cli
+
+    db = Database(str(tmp_path / "t.db"))
+    db.init_schema()
+    calls = {"n": 0}
+
+    def _fake_list(conn):
+        calls["n"] += 1
+        return [10, 20]
+
+    monkeypatch.setattr(db, "list_ingested_project_ids", _fake_list)
+    args = Namespace(project_id=None, group_id=None, all_projects=True, project_start_index=1, project_count=None)
+    monkeypatch.setattr(cli, "resolve_group_ids", lambda _: [])
+
+    assert cli._resolve_classify_project_ids(args, db) == [10, 20]
+    assert cli._resolve_classify_project_ids(args, db) == [10, 20]
+    assert calls["n"] == 1
+
+
+def test_session_applies_tuning_pragmas_once(tmp_path) -> None:
+    db = Database(str(tmp_path / "t.db"))
+    db.init_schema()
+
+    with db.session() as pinned:
+        assert pinned.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert pinned.execute("PRAGMA cache_size").fetchone()[0] == -262144
+        assert pinned.execute("PRAGMA temp_store").fetchone()[0] == 2
+
+
+def test_connect_applies_connection_pragmas(tmp_path) -> None:
+    db = Database(str(tmp_path / "t.db"))
+    with db.connect() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    # WAL persists in the file, so later connections only re-apply the per-connection settings.
+    assert db._wal_ready
+
+
+def test_read_connection_is_query_only_and_does_not_wait_on_writer(tmp_path) -> None:
+    db = Database(str(tmp_path / "t.db"))
+    db.init_schema()
+
+    with db.connect() as writer:
+        writer.execute("INSERT INTO merge_requests (id, project_id, iid, title, labels_json) VALUES (1, 10, 1, 't', '[]')")
+        assert writer.in_transaction
+        # The writer holds the write lock, yet a reader still sees the last committed state.
+        with db.connect_read() as reader:
+            assert db.list_ingested_project_ids(reader) == []
+            with pytest.raises(sqlite3.OperationalError):
+                reader.execute("DELETE FROM merge_requests")
+
+    with db.connect_read() as reader:
+        assert db.list_ingested_project_ids(reader) == [10]
+
+
+def test_bulk_upserts_replace_child_rows(tmp_path) -> None:
+    db = Database(str(tmp_path / "t.db"))
+    db.init_schema()
+    mrs = [
+        {"id": 100 + iid, "project_id": 10, "iid": iid, "title": f"MR {iid}", "updated_at": "2026-01-01T00:00:00Z"}
+        for iid in (1, 2)
+    ]
+
+    with db.connect() as conn:
+        assert db.upsert_merge_requests_bulk(conn, mrs) == [101, 102]
+        db.replace_mr_commits_bulk(conn, [(101, [{"id": "a"}, {"id": "b"}]), (102, [{"sha": "c"}])])
+        db.replace_mr_files_bulk(conn, [(101, [{"new_path": "x.py", "additions": 1}]), (102, [])])
+        # Replacing one MR's commits leaves the other MR's rows alone.
+        db.replace_mr_commits_bulk(conn, [(101, [{"id": "z"}])])
+
+        commits = conn.execute("SELECT mr_id, commit_sha FROM mr_commits ORDER BY mr_id, commit_sha").fetchall()
+        files = conn.execute("SELECT mr_id, path FROM mr_files").fetchall()
+        titles = [r[0] for r in conn.execute("SELECT title FROM merge_requests ORDER BY iid")]
+
+    assert [tuple(r) for r in commits] == [(101, "z"), (102, "c")]
+    assert [tuple(r) for r in files] == [(101, "x.py")]
+    assert titles == ["MR 1", "MR 2"]
+
+
+def test_get_mr_updated_at_map_handles_more_iids_than_bound_variables(tmp_path) -> None:
+    db = Database(str(tmp_path / "t.db"))
+    db.init_schema()
+    mrs = [
+        {"id": pid * 100 + iid, "project_id": pid, "iid": iid, "title": "t", "updated_at": f"2026-01-0{iid}T00:00:00Z"}
+        for pid in (10, 11)
+        for iid in (1, 2)
+    ]
+
+    with db.connect() as conn:
+        db.upsert_merge_requests_bulk(conn, mrs)
+        result = db.get_mr_updated_at_map(conn, 10, [1, 2, *range(3, 40000)])
+
+    assert result == {1: "2026-01-01T00:00:00Z", 2: "2026-01-02T00:00:00Z"}
+
+
+def test_replacing_unchanged_child_rows_writes_nothing(tmp_path) -> None:
+    db = Database(str(tmp_path / "t.db"))
+    db.init_schema()
+    commits = [{"id": "a", "title": "one"}, {"id": "b", "title": "two"}]
+    files = [{"new_path": "x.py", "additions": 1}, {"new_path": "y.py", "deletions": 2}]
+
+    with db.connect() as conn:
+        db.upsert_merge_requests_bulk(conn, [{"id": 101, "project_id": 10, "iid": 1, "title": "MR"}])
+        db.replace_mr_commits_bulk(conn, [(101, commits)])
+        db.replace_mr_files_bulk(conn, [(101, files)])
+
+        before = conn.total_changes
+        db.replace_mr_commits_bulk(conn, [(101, commits)])
+        db.replace_mr_files_bulk(conn, [(101, files)])
+        unchanged_writes = conn.total_changes - before
+
+        db.replace_mr_commits_bulk(conn, [(101, [{"id": "b", "title": "two!"}])])
+        db.replace_mr_files_bulk(conn, [(101, files[:1])])
+        commit_rows = [tuple(r) for r in conn.execute("SELECT commit_sha, title FROM mr_commits")]
+        paths = [r[0] for r in conn.execute("SELECT path FROM mr_files")]
+
+    assert unchanged_writes == 0
+    assert commit_rows == [("b", "two!")]
+    assert paths == ["x.py"]
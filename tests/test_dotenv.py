@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import os
 
-from prtool.config import load_dotenv
+from prtool.config import clear_settings_cache, load_dotenv, load_partial_settings
 
 
 def test_load_dotenv_sets_missing_vars(tmp_path, monkeypatch) -> None:
@@ -25,3 +25,30 @@ def test_load_dotenv_does_not_override_existing(monkeypatch, tmp_path) -> None:
     load_dotenv(str(env_file))
 
     assert os.environ["FOO"] == "existing"
+
+
+def test_load_dotenv_reloads_on_every_call(tmp_path, monkeypatch) -> None:
+    env_file = tmp_path / ".env"
+    env_file.write_text("FOO=bar\n", encoding="utf-8")
+    monkeypatch.setenv("PRTOOL_ENV_FILE", str(env_file))
+    monkeypatch.delenv("FOO", raising=False)
+
+    load_dotenv()
+    monkeypatch.delenv("FOO")
+    load_dotenv()
+
+    assert os.environ["FOO"] == "bar"
+
+
+def test_partial_settings_are_memoized_until_cleared(monkeypatch) -> None:
+    monkeypatch.setenv("INFRA_TICKET_REGEX", r"INFRA-\d+")
+    monkeypatch.setenv("INFRA_LABEL_ALLOWLIST", "Infra,SRE")
+    first = load_partial_settings()
+
+    monkeypatch.setenv("INFRA_TICKET_REGEX", r"OPS-\d+")
+    assert load_partial_settings() is first
+    assert first.infra_label_allowlist == frozenset({"infra", "sre"})
+    assert first.infra_ticket_patterns[0].search("fixes infra-12")
+
+    clear_settings_cache()
+    assert load_partial_settings().infra_ticket_regex == (r"OPS-\d+",)
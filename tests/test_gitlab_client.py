@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from prtool import gitlab_client
+from prtool.config import Settings
+from prtool.gitlab_client import GitLabSourceClient
+
+
+def _settings(page_size: int = 2) -> Settings:
+    return Settings(
+        gitlab_base_url="https://gitlab.example",
+        gitlab_token="t",
+        db_path=":memory:",
+        page_size=page_size,
+        max_retries=0,
+        backoff_ms=0,
+        request_timeout=1,
+        infra_ticket_regex=(),
+        infra_label_allowlist=(),
+        infra_keyword_list=(),
+        infra_strong_threshold=4.0,
+        infra_weak_threshold=1.5,
+    )
+
+
+def _client(monkeypatch, pages: dict[int, list[dict]], headers: dict[str, str]) -> tuple[GitLabSourceClient, list[int]]:
+    monkeypatch.setattr(gitlab_client, "_import_gitlab", lambda: None)
+    client = GitLabSourceClient(_settings())
+    requested: list[int] = []
+
+    def _request(path, params=None, return_headers=False):
+        requested.append(params["page"])
+        payload = pages.get(params["page"], [])
+        return (payload, headers) if return_headers else payload
+
+    monkeypatch.setattr(client, "_request", _request)
+    return client, requested
+
+
+def test_list_accessible_projects_fans_out_pages_from_total_pages_header(monkeypatch) -> None:
+    pages = {n: [{"id": 2 * n - 1}, {"id": 2 * n}] for n in range(1, 4)}
+    client, requested = _client(monkeypatch, pages, {"X-Total-Pages": "3"})
+
+    projects = client.list_accessible_projects(page_concurrency=4)
+
+    assert [p["id"] for p in projects] == [1, 2, 3, 4, 5, 6]
+    assert sorted(requested) == [1, 2, 3]
+
+
+def test_list_accessible_projects_walks_sequentially_without_total_pages(monkeypatch) -> None:
+    pages = {1: [{"id": 1}, {"id": 2}], 2: [{"id": 3}]}
+    client, requested = _client(monkeypatch, pages, {})
+
+    projects = client.list_accessible_projects(page_concurrency=4)
+
+    assert [p["id"] for p in projects] == [1, 2, 3]
+    assert requested == [1, 2]
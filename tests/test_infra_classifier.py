@@ -314,3 +314,21 @@ def test_fix_prefix_biases_to_bugfix_over_feature_signals() -> None:
     )
     result = classify(mr, files, features, ClassificationConfig(4.0, 1.5))
     assert result["base_type"] == "bugfix"
+
+
+def test_ticket_patterns_are_compiled_separately_and_count_per_pattern() -> None:
+    settings = PartialSettings(
+        db_path=":memory:",
+        infra_ticket_regex=[r"(?i)infra-\d+", r"OPS-\d+", r"OPS-7"],
+        infra_label_allowlist=[],
+        infra_keyword_list=[],
+        infra_strong_threshold=4.0,
+        infra_weak_threshold=1.5,
+    )
+    extractor = FeatureExtractor(settings)
+    mr = {"title": "OPS-7 follow-up", "description": "relates to infra-12 and OPS-8", "labels": []}
+    features = extractor.extract(mr, commits=[], files=[], discussions={"thread_count": 0, "note_count": 0, "unresolved_count": 0}, pipelines={"failed_count": 0})
+
+    # A leading global flag stays valid, and overlapping patterns each contribute their own hit.
+    assert features["infra_ticket_match_count"] == 4
+    assert features["matched_infra_tickets"] == ["infra-12", "OPS-7", "OPS-8", "OPS-7"]
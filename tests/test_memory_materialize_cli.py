@@ -27,3 +27,43 @@ def test_memory_materialize_cli(monkeypatch, capsys) -> None:
     assert "Selected projects (2): [111, 222]" in out
     assert "Materialize total:" in out
     assert [c[0] for c in calls] == [111, 222]
+
+
+def test_memory_materialize_cli_project_concurrency(monkeypatch, capsys) -> None:
+    monkeypatch.setattr(cli, "_resolve_project_scope_ids", lambda args: [111, 222, 333])
+    monkeypatch.setattr(
+        cli,
+        "materialize_project_markdown_from_db",
+        lambda db, project_id, opts: {
+            "project_id": project_id,
+            "baseline_written": 1,
+            "runtime_eligible": 2,
+            "runtime_written": 1,
+            "runtime_skipped": 1,
+        },
+    )
+
+    rc = cli.main(["memory", "materialize", "--all-projects", "--project-concurrency", "3"])
+    out = capsys.readouterr().out
+
+    assert rc == 0
+    lines = [line for line in out.splitlines() if line.startswith("[project ")]
+    assert [line.split("]")[0] for line in lines] == ["[project 111", "[project 222", "[project 333"]
+    assert "Materialize total: baseline_written=3 runtime_eligible=6 runtime_written=3 runtime_skipped=3" in out
+
+
+def test_memory_mr_build_cli_project_concurrency(monkeypatch, capsys) -> None:
+    monkeypatch.setattr(cli, "_resolve_project_scope_ids", lambda args: [111, 222, 333])
+    monkeypatch.setattr(
+        cli,
+        "build_runtime_for_project",
+        lambda db, project_id, opts: {"eligible": 2, "success": 1, "failed": 0, "skipped": 1},
+    )
+
+    rc = cli.main(["memory", "mr-build", "--all-projects", "--project-concurrency", "3"])
+    out = capsys.readouterr().out
+
+    assert rc == 0
+    lines = [line for line in out.splitlines() if line.startswith("[project ")]
+    assert [line.split("]")[0] for line in lines] == ["[project 111", "[project 222", "[project 333"]
+    assert "Memory runtime total: eligible=6 success=3 failed=0 skipped=3" in out
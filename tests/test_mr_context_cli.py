@@ -121,6 +121,44 @@ def test_mr_context_writes_markdown_without_qodo(monkeypatch, tmp_path, capsys)
     assert "why_needs_review: low_top2_margin" in text
 
 
+def test_mr_context_skips_rewrite_when_bundle_unchanged(monkeypatch, tmp_path, capsys) -> None:
+    db_path = tmp_path / "mr_context_sig.db"
+    monkeypatch.setattr(cli, "load_partial_settings", lambda: type("P", (), {"db_path": str(db_path)})())
+    _seed_minimal_mr(db_path)
+
+    out_path = tmp_path / "context.md"
+    argv = [
+        "mr-context",
+        "--project-id",
+        "55",
+        "--mr-iid",
+        "77",
+        "--out-path",
+        str(out_path),
+        "--no-qodo-inline",
+        "--no-reclassify",
+    ]
+    assert cli.main(argv) == 0
+    first = out_path.read_text(encoding="utf-8")
+    assert first.startswith("<!-- mr-context-sig: ")
+    capsys.readouterr()
+
+    def _no_render(bundle):
+        raise AssertionError("unchanged bundle should not be re-rendered")
+
+    monkeypatch.setattr(cli, "_render_single_mr_context", _no_render)
+    assert cli.main(argv) == 0
+    assert "MR context unchanged" in capsys.readouterr().out
+    monkeypatch.undo()
+
+    monkeypatch.setattr(cli, "load_partial_settings", lambda: type("P", (), {"db_path": str(db_path)})())
+    with Database(str(db_path)).connect() as conn:
+        conn.execute("UPDATE merge_requests SET title = 'Retitled' WHERE id = 1010")
+    assert cli.main(argv) == 0
+    assert "MR context written" in capsys.readouterr().out
+    assert "MR Context: !77 Retitled" in out_path.read_text(encoding="utf-8")
+
+
 def test_mr_context_runs_qodo_and_reclassify(monkeypatch, tmp_path, capsys) -> None:
     db_path = tmp_path / "mr_context_actions.db"
     monkeypatch.setattr(cli, "load_partial_settings", lambda: type("P", (), {"db_path": str(db_path)})())
@@ -248,3 +286,11 @@ def test_mr_context_suppresses_low_quality_qodo_and_hides_paths(monkeypatch, tmp
     assert "context_markdown_path:" not in text
     assert "qodo_low_quality_or_prompt_leak" in text
     assert "classifier_memory_type_mismatch" in text
+
+
+def test_context_json_helpers_match_stdlib_semantics(monkeypatch) -> None:
+    samples = ['["a", "b"]', "[NaN]", '{"why_needs_review": ["x"]}', "not json", "", None, "{}"]
+    fast = [(cli._parse_json_array(s), cli._parse_json_object(s)) for s in samples]
+    monkeypatch.setattr(cli, "orjson", None)
+    slow = [(cli._parse_json_array(s), cli._parse_json_object(s)) for s in samples]
+    assert repr(fast) == repr(slow)
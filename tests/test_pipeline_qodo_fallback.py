@@ -5,7 +5,7 @@ from datetime import datetime, timezone
 
 from prtool.config import PartialSettings
 from prtool.db import Database
-from prtool.pipeline import classify_project
+from prtool.pipeline import classify_merge_requests, classify_project
 
 
 def _settings(db_path: str) -> PartialSettings:
@@ -171,3 +171,7 @@ def test_classify_prefers_clean_reviewer_summary_over_raw_qodo_summary(tmp_path)
     assert feat_row is not None
     feat = json.loads(feat_row["feature_json"])
     assert feat["has_description"] is True
+
+    # Targeted batch path: unknown ids and ids outside their project are ignored.
+    counts = classify_merge_requests(db, _settings(db_path), {project_id: [mr_id, 99999], 4242: [80003]})
+    assert counts == {project_id: 1}
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import pytest
 
+from prtool import cli
 from prtool.cli import _slice_project_ids
 
 
@@ -26,3 +27,15 @@ def test_slice_project_ids_invalid_count() -> None:
 def test_slice_project_ids_empty_selection() -> None:
     with pytest.raises(ValueError):
         _slice_project_ids([10, 20], start_index=5, count=1)
+
+
+def test_list_projects_prints_positional_window(monkeypatch, capsys) -> None:
+    projects = [{"id": pid, "path_with_namespace": f"g/p{pid}", "name": f"p{pid}"} for pid in (30, 10, 20, 40)]
+    monkeypatch.setattr(cli, "load_settings", lambda: object())
+    monkeypatch.setattr(cli, "_resolve_discovery_projects", lambda args, settings: projects)
+
+    rc = cli.main(["list-projects", "--project-start-index", "2", "--project-count", "2"])
+    lines = capsys.readouterr().out.splitlines()
+
+    assert rc == 0
+    assert lines[2:] == ["2\t10\tg/p10\tp10", "3\t20\tg/p20\tp20"]
@@ -54,3 +54,27 @@ def test_projects_count_configured_scope(monkeypatch, capsys):
     assert rc == 0
     assert "total_projects: 2" in out
     assert "scope: configured-project-ids" in out
+
+
+def test_projects_count_reuses_disk_cached_discovery(monkeypatch, capsys):
+    calls: list[int] = []
+
+    class _Client:
+        def __init__(self, _settings):
+            pass
+
+        def list_accessible_projects(self, page_concurrency: int = 1):
+            calls.append(page_concurrency)
+            return [{"id": 7, "path_with_namespace": "g/p7", "name": "p7"}]
+
+    monkeypatch.setenv("GITLAB_BASE_URL", "https://gitlab.example")
+    monkeypatch.setenv("GITLAB_TOKEN", "t")
+    monkeypatch.setattr(cli, "GitLabSourceClient", _Client)
+
+    assert cli.main(["projects", "count", "--all-projects"]) == 0
+    assert cli.main(["projects", "count", "--all-projects"]) == 0
+    assert len(calls) == 1
+
+    assert cli.main(["projects", "count", "--all-projects", "--no-cache"]) == 0
+    assert len(calls) == 2
+    assert capsys.readouterr().out.count("total_projects: 1") == 3
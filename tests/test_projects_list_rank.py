@@ -34,3 +34,67 @@ def test_projects_list_ranked_json(monkeypatch, capsys):
     assert [row["id"] for row in payload] == [20, 30, 10]
     assert [row["rank"] for row in payload] == [1, 2, 3]
     assert [row["mr_count_all_states"] for row in payload] == [12, 12, 5]
+
+
+def test_projects_list_counts_fetched_concurrently(monkeypatch, capsys):
+    import threading
+
+    barrier = threading.Barrier(3, timeout=5)
+
+    class _ConcurrentClient(_DummyClient):
+        def get_project_mr_count_all_states(self, project_id: int) -> int:
+            # Blocks unless all three lookups are in flight at once.
+            barrier.wait()
+            return super().get_project_mr_count_all_states(project_id)
+
+    monkeypatch.setattr(cli, "load_settings", lambda: object())
+    monkeypatch.setattr(
+        cli,
+        "_resolve_discovery_projects",
+        lambda args, settings: [{"id": pid, "path_with_namespace": f"a/p{pid}", "name": f"p{pid}"} for pid in (10, 20, 30)],
+    )
+    monkeypatch.setattr(cli, "GitLabSourceClient", _ConcurrentClient)
+    monkeypatch.setenv("PRTOOL_MR_COUNT_CONCURRENCY", "3")
+
+    rc = cli.main(["projects", "list", "--all-projects", "--format", "json"])
+    payload = json.loads(capsys.readouterr().out.strip())
+
+    assert rc == 0
+    assert [(row["id"], row["mr_count_all_states"]) for row in payload] == [(20, 12), (30, 12), (10, 5)]
+
+
+def test_collect_group_projects_dedupes_across_groups():
+    class _GroupClient:
+        def list_group_projects(self, group_id):
+            return {
+                "g1": [{"id": 30, "name": "p30"}, {"id": 10, "name": "p10"}],
+                "g2": [{"id": 10, "name": "p10"}, {"id": 20, "name": "p20"}],
+            }[group_id]
+
+    projects = cli._collect_group_projects(_GroupClient(), ["g1", "g2"])
+
+    assert [p["id"] for p in projects] == [10, 20, 30]
+
+
+def test_discovery_is_fetched_once_per_invocation(monkeypatch):
+    import argparse
+
+    calls = {"clients": 0, "groups": 0}
+
+    class _CountingClient:
+        def __init__(self, _settings):
+            calls["clients"] += 1
+
+        def list_group_projects(self, group_id):
+            calls["groups"] += 1
+            return [{"id": 10, "name": "p10"}]
+
+    monkeypatch.setattr(cli, "GitLabSourceClient", _CountingClient)
+    settings = object()
+    args = argparse.Namespace(group_id=["g1"], all_projects=False)
+
+    first = cli._resolve_discovery_projects(args, settings)
+    second = cli._resolve_discovery_projects(args, settings)
+
+    assert first == second == [{"id": 10, "name": "p10"}]
+    assert calls == {"clients": 1, "groups": 1}
@@ -18,11 +18,8 @@ def test_qodo_threshold_dry_run_only_selects(monkeypatch, capsys) -> None:
     monkeypatch.setattr(cli, "load_partial_settings", lambda: type("P", (), {"db_path": ":memory:"})())
     monkeypatch.setattr(cli, "Database", _DB)
     monkeypatch.setattr(cli, "_resolve_project_scope_ids", lambda args: [101])
-    monkeypatch.setattr(
-        cli,
-        "_needs_review_stats",
-        lambda db, project_ids, data_source: {"total": 10, "needs_review": 5, "needs_review_pct": 50.0},
-    )
+    snapshot_calls = []
+    monkeypatch.setattr(cli, "_threshold_snapshot", lambda *a: snapshot_calls.append(a) or {})
     monkeypatch.setattr(
         cli,
         "_select_qodo_threshold_candidates",
@@ -45,7 +42,7 @@ def test_qodo_threshold_dry_run_only_selects(monkeypatch, capsys) -> None:
     enrich_calls = []
     class_calls = []
     monkeypatch.setattr(cli, "enrich_qodo_project", lambda *a, **k: enrich_calls.append((a, k)))
-    monkeypatch.setattr(cli, "classify_project", lambda *a, **k: class_calls.append((a, k)))
+    monkeypatch.setattr(cli, "classify_merge_requests", lambda *a, **k: class_calls.append((a, k)))
 
     rc = cli.main(["enrich", "qodo-threshold", "--project-id", "101", "--dry-run"])
     out = capsys.readouterr().out
@@ -55,6 +52,7 @@ def test_qodo_threshold_dry_run_only_selects(monkeypatch, capsys) -> None:
     assert "Dry-run only" in out
     assert not enrich_calls
     assert not class_calls
+    assert not snapshot_calls
 
 
 def test_qodo_threshold_runs_enrich_then_targeted_reclassify(monkeypatch, capsys) -> None:
@@ -62,15 +60,15 @@ def test_qodo_threshold_runs_enrich_then_targeted_reclassify(monkeypatch, capsys
     monkeypatch.setattr(cli, "Database", _DB)
     monkeypatch.setattr(cli, "_resolve_project_scope_ids", lambda args: [101, 102])
 
-    stats_calls = []
+    snapshot_calls = []
 
-    def _fake_stats(db, project_ids, data_source):
-        stats_calls.append((tuple(project_ids), data_source))
-        if len(stats_calls) == 1:
-            return {"total": 20, "needs_review": 10, "needs_review_pct": 50.0}
-        return {"total": 20, "needs_review": 8, "needs_review_pct": 40.0}
+    def _fake_snapshot(db, project_ids, data_source, candidates):
+        snapshot_calls.append((tuple(project_ids), data_source, tuple(int(r["id"]) for r in candidates)))
+        if len(snapshot_calls) == 1:
+            return {"total": 20, "needs_review": 10, "needs_review_pct": 50.0, "improved": 0, "promoted": 0, "conf_delta": 0.0}
+        return {"total": 20, "needs_review": 8, "needs_review_pct": 40.0, "improved": 2, "promoted": 1, "conf_delta": 0.09}
 
-    monkeypatch.setattr(cli, "_needs_review_stats", _fake_stats)
+    monkeypatch.setattr(cli, "_threshold_snapshot", _fake_snapshot)
     monkeypatch.setattr(
         cli,
         "_select_qodo_threshold_candidates",
@@ -107,30 +105,11 @@ def test_qodo_threshold_runs_enrich_then_targeted_reclassify(monkeypatch, capsys
 
     class_calls = []
 
-    def _fake_classify(db, partial, project_id, **kwargs):
-        class_calls.append((project_id, kwargs))
-        return len(kwargs.get("mr_ids") or [])
-
-    monkeypatch.setattr(cli, "classify_project", _fake_classify)
-
-    class _Conn:
-        def __enter__(self):
-            return self
+    def _fake_classify(db, partial, mr_ids_by_project):
+        class_calls.append(mr_ids_by_project)
+        return {pid: len(ids) for pid, ids in mr_ids_by_project.items()}
 
-        def __exit__(self, exc_type, exc, tb):
-            return False
-
-        def execute(self, sql, params=()):
-            class _Cur:
-                def fetchall(self_nonlocal):
-                    return [
-                        {"mr_id": 20001, "classification_confidence": 0.78, "needs_review": 0},
-                        {"mr_id": 20002, "classification_confidence": 0.74, "needs_review": 1},
-                    ]
-
-            return _Cur()
-
-    monkeypatch.setattr(_DB, "connect", lambda self: _Conn())
+    monkeypatch.setattr(cli, "classify_merge_requests", _fake_classify)
 
     rc = cli.main(["enrich", "qodo-threshold", "--project-id", "101"])
     out = capsys.readouterr().out
@@ -138,6 +117,111 @@ def test_qodo_threshold_runs_enrich_then_targeted_reclassify(monkeypatch, capsys
     assert rc == 0
     assert "Threshold enrich total" in out
     assert "delta=-10.00pp" in out
-    assert len(class_calls) == 1
-    assert class_calls[0][0] == 101
-    assert class_calls[0][1]["mr_ids"] == [20001, 20002]
+    assert "promoted_above_threshold=1 improved_confidence=2/2" in out
+    assert "avg_conf_delta=+0.0450" in out
+    assert [c[2] for c in snapshot_calls] == [(20001, 20002), (20001, 20002)]
+    assert class_calls == [{101: [20001, 20002]}]
+    assert "[project 101] Reclassification complete: 2 targeted" in out
+
+
+def test_select_qodo_threshold_candidates_skips_fully_enriched_mrs(tmp_path) -> None:
+    from datetime import datetime, timezone
+
+    from prtool.db import Database
+
+    db = Database(str(tmp_path / "threshold.db"))
+    db.init_schema()
+    now = datetime.now(timezone.utc).isoformat()
+    with db.connect() as conn:
+        for iid in (1, 2, 3):
+            db.upsert_merge_request(
+                conn,
+                {
+                    "id": 5000 + iid,
+                    "project_id": 101,
+                    "iid": iid,
+                    "title": f"MR {iid}",
+                    "description": "",
+                    "state": "merged",
+                    "author_username": "u",
+                    "labels": [],
+                    "web_url": f"https://gitlab.example/mr/{iid}",
+                    "created_at": now,
+                    "updated_at": now,
+                    "merged_at": now,
+                    "closed_at": None,
+                    "source_branch": "a",
+                    "target_branch": "main",
+                    "data_source": "production",
+                },
+            )
+            db.upsert_classification(
+                conn,
+                5000 + iid,
+                {
+                    "base_type": "feature",
+                    "final_type": "feature",
+                    "is_infra_related": False,
+                    "infra_override_applied": False,
+                    "complexity_level": "medium",
+                    "complexity_score": 5.0,
+                    "classification_confidence": 0.7,
+                    "needs_review": True,
+                    "rationale": {"why_needs_review": ["low_confidence"]},
+                    "classified_at": now,
+                },
+            )
+        # MR 1 has both tools, MR 2 only one, MR 3 none.
+        for mr_id, tool in ((5001, "describe"), (5001, "review"), (5002, "describe")):
+            db.upsert_qodo_artifact(
+                conn,
+                {
+                    "mr_id": mr_id,
+                    "project_id": 101,
+                    "mr_iid": mr_id - 5000,
+                    "tool": tool,
+                    "markdown_path": str(tmp_path / f"{mr_id}-{tool}.md"),
+                    "raw_output_path": None,
+                    "content_sha256": "x",
+                    "qodo_title": None,
+                    "qodo_type": None,
+                    "qodo_summary": None,
+                    "qodo_sections": {},
+                    "qodo_labels": [],
+                    "parser_version": "qodo-v2",
+                    "quality_status": "ok",
+                    "prompt_leak_count": 0,
+                    "prompt_leak_markers": [],
+                    "structured_payload": {},
+                    "updated_at": now,
+                },
+            )
+
+    kwargs = dict(
+        project_ids=[101],
+        min_confidence=0.6,
+        max_confidence=0.8,
+        reasons=("low_confidence",),
+        require_empty_description=True,
+        data_source="production",
+        tools=("describe", "review"),
+        force=False,
+        mr_limit=None,
+    )
+    missing = cli._select_qodo_threshold_candidates(db, only_missing=True, **kwargs)
+    assert sorted(int(r["id"]) for r in missing) == [5002, 5003]
+
+    everything = cli._select_qodo_threshold_candidates(db, only_missing=False, **kwargs)
+    assert sorted(int(r["id"]) for r in everything) == [5001, 5002, 5003]
+
+    limited = cli._select_qodo_threshold_candidates(db, only_missing=False, **{**kwargs, "mr_limit": 2})
+    assert len(limited) == 2 and {int(r["project_id"]) for r in limited} == {101}
+
+    with db.connect() as conn:
+        conn.execute("UPDATE mr_classifications SET classification_confidence = 0.9, needs_review = 0 WHERE mr_id = 5002")
+    snapshot = cli._threshold_snapshot(db, [101], "production", missing)
+    assert snapshot["total"] == 3
+    assert snapshot["needs_review"] == 2
+    assert snapshot["improved"] == 1
+    assert snapshot["promoted"] == 1
+    assert round(snapshot["conf_delta"], 6) == 0.2
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import contextlib
+
 from prtool import cli
 
 
@@ -16,6 +18,9 @@ def test_reclassify_only_stale_default(monkeypatch, capsys) -> None:
         def connect(self):
             raise AssertionError("connect should not be used in this test")
 
+        def session(self):
+            return contextlib.nullcontext()
+
     monkeypatch.setattr(cli, "Database", _DB)
     monkeypatch.setattr(cli, "_resolve_classify_project_ids", lambda args, db: [1])
 
@@ -48,6 +53,9 @@ def test_reclassify_force_overrides_only_stale(monkeypatch, capsys) -> None:
         def connect(self):
             raise AssertionError("connect should not be used in this test")
 
+        def session(self):
+            return contextlib.nullcontext()
+
     monkeypatch.setattr(cli, "Database", _DB)
     monkeypatch.setattr(cli, "_resolve_classify_project_ids", lambda args, db: [2])
 
@@ -77,6 +85,9 @@ def test_reclassify_qodo_inline_runs_before_classify(monkeypatch, capsys) -> Non
         def init_schema(self):
             return None
 
+        def session(self):
+            return contextlib.nullcontext()
+
     monkeypatch.setattr(cli, "Database", _DB)
     monkeypatch.setattr(cli, "_resolve_classify_project_ids", lambda args, db: [7])
     monkeypatch.setattr(
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from prtool.db import Database
+from prtool.db import SCHEMA_VERSION, Database
 
 
 def test_schema_contains_infra_columns(tmp_path) -> None:
@@ -54,3 +54,168 @@ def test_schema_contains_infra_columns(tmp_path) -> None:
     assert "topic_labels_json" in mem_runtime_cols
     assert "similarity_strategy" in mem_runtime_cols
     assert "outcome_mode" in mem_runtime_cols
+
+
+def test_init_schema_stamps_version_and_skips_when_current(tmp_path) -> None:
+    db_path = str(tmp_path / "t.db")
+    db = Database(db_path)
+    db.init_schema()
+
+    with db.connect() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        conn.execute("DROP INDEX idx_mrs_updated_at")
+
+    Database(db_path).init_schema()
+    with db.connect() as conn:
+        indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'").fetchall()}
+        assert "idx_mrs_updated_at" not in indexes
+        conn.execute("PRAGMA user_version = 0")
+
+    Database(db_path).init_schema()
+    with db.connect() as conn:
+        indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'").fetchall()}
+    assert "idx_mrs_updated_at" in indexes
+
+
+def test_init_schema_runs_once_per_instance(tmp_path, monkeypatch) -> None:
+    db = Database(str(tmp_path / "t.db"))
+    db.init_schema()
+
+    def _fail():
+        raise AssertionError("init_schema should not reconnect once the schema is ready")
+
+    monkeypatch.setattr(db, "connect", _fail)
+    db.init_schema()
+
+
+def test_qodo_artifacts_gain_indexed_tool_rank_on_upgrade(tmp_path) -> None:
+    db_path = str(tmp_path / "t.db")
+    db = Database(db_path)
+    db.init_schema()
+    with db.connect() as conn:
+        # Simulate a database created before tool_rank existed.
+        conn.execute("DROP INDEX idx_qodo_artifacts_mr_rank")
+        conn.execute("ALTER TABLE mr_qodo_artifacts DROP COLUMN tool_rank")
+        conn.execute("PRAGMA user_version = 1")
+
+    Database(db_path).init_schema()
+    with db.connect() as conn:
+        cols = {r["name"] for r in conn.execute("PRAGMA table_xinfo(mr_qodo_artifacts)").fetchall()}
+        plan = " ".join(
+            str(r["detail"])
+            for r in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT tool FROM mr_qodo_artifacts WHERE mr_id = 1 ORDER BY tool_rank, updated_at DESC"
+            ).fetchall()
+        )
+    assert "tool_rank" in cols
+    assert "idx_qodo_artifacts_mr_rank" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_merge_requests_gain_indexed_description_empty_on_upgrade(tmp_path) -> None:
+    db_path = str(tmp_path / "t.db")
+    db = Database(db_path)
+    db.init_schema()
+    with db.connect() as conn:
+        # Simulate a database created before description_empty existed.
+        conn.execute("DROP INDEX idx_mrs_desc_empty")
+        conn.execute("ALTER TABLE merge_requests DROP COLUMN description_empty")
+        conn.execute("PRAGMA user_version = 2")
+        conn.execute(
+            "INSERT INTO merge_requests (id, project_id, iid, title, description, labels_json) "
+            "VALUES (1, 7, 1, 'a', '  ', '[]'), (2, 7, 2, 'b', 'text', '[]'), (3, 7, 3, 'c', NULL, '[]')"
+        )
+
+    Database(db_path).init_schema()
+    with db.connect() as conn:
+        empty_ids = [r["id"] for r in conn.execute("SELECT id FROM merge_requests WHERE description_empty = 1 ORDER BY id")]
+        plan = " ".join(
+            str(r["detail"])
+            for r in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM merge_requests WHERE project_id = 7 AND description_empty = 1"
+            ).fetchall()
+        )
+    assert empty_ids == [1, 3]
+    assert "idx_mrs_desc_empty" in plan
+
+
+def test_init_schema_rebuilds_database_recreated_at_same_path(tmp_path) -> None:
+    db_path = tmp_path / "t.db"
+    Database(str(db_path)).init_schema()
+    for path in tmp_path.glob("t.db*"):
+        path.unlink()
+
+    db = Database(str(db_path))
+    db.init_schema()
+    with db.connect() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM merge_requests").fetchone()[0] == 0
+
+
+def test_mr_freshness_lookup_uses_covering_index(tmp_path) -> None:
+    db_path = str(tmp_path / "t.db")
+    db = Database(db_path)
+    db.init_schema()
+    with db.connect() as conn:
+        plan = " ".join(
+            str(r["detail"])
+            for r in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT iid, updated_at FROM merge_requests WHERE project_id = 7 AND iid IN (1, 2)"
+            ).fetchall()
+        )
+        distinct_plan = " ".join(
+            str(r["detail"])
+            for r in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT DISTINCT project_id FROM merge_requests ORDER BY project_id ASC"
+            ).fetchall()
+        )
+        indexes = {r["name"] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert "COVERING INDEX idx_mrs_project_iid_updated" in plan
+    # The (project_id, iid) indexes already serve the ingested-project scan without a temp B-tree.
+    assert "COVERING INDEX" in distinct_plan
+    assert "TEMP B-TREE" not in distinct_plan
+    assert "idx_mrs_data_source" in indexes
+    assert "idx_mrs_project_iid" not in indexes
+    assert "idx_mrs_project_only" not in indexes
+
+
+def test_merge_requests_gain_denormalized_review_counts_on_upgrade(tmp_path) -> None:
+    db_path = str(tmp_path / "t.db")
+    db = Database(db_path)
+    db.init_schema()
+    with db.connect() as conn:
+        # Simulate a database created before the 1:1 summaries were copied onto merge_requests.
+        for column in (
+            "thread_count", "note_count", "unresolved_count", "approvals_required", "approvals_given", "pipeline_failed_count"
+        ):
+            conn.execute(f"ALTER TABLE merge_requests DROP COLUMN {column}")
+        conn.execute("PRAGMA user_version = 4")
+        conn.execute("INSERT INTO merge_requests (id, project_id, iid, title, labels_json) VALUES (1, 7, 1, 'a', '[]')")
+        conn.execute("INSERT INTO mr_discussions VALUES (1, 3, 9, 1)")
+        conn.execute("INSERT INTO mr_approvals VALUES (1, 2, 1)")
+        conn.execute("INSERT INTO mr_pipelines VALUES (1, 4, 2, 2, 0)")
+
+    Database(db_path).init_schema()
+    with db.connect() as conn:
+        row = conn.execute(
+            "SELECT thread_count, note_count, unresolved_count, approvals_required, approvals_given, pipeline_failed_count "
+            "FROM merge_requests WHERE id = 1"
+        ).fetchone()
+        db.upsert_discussions(conn, 1, {"thread_count": 5, "note_count": 10, "unresolved_count": 0})
+        refreshed = conn.execute("SELECT thread_count FROM merge_requests WHERE id = 1").fetchone()[0]
+    assert tuple(row) == (3, 9, 1, 2, 1, 2)
+    assert refreshed == 5
+
+
+def test_project_memory_listing_walks_index_in_order(tmp_path) -> None:
+    db = Database(str(tmp_path / "t.db"))
+    db.init_schema()
+    with db.connect() as conn:
+        plan = " ".join(
+            str(r["detail"])
+            for r in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT r.mr_id, r.assessment_json FROM mr_memory_runtime r "
+                "WHERE r.project_id = 7 ORDER BY r.updated_at DESC, r.mr_iid ASC LIMIT 5"
+            ).fetchall()
+        )
+    assert "idx_memory_runtime_project_updated" in plan
+    assert "TEMP B-TREE" not in plan